@@ -12,6 +12,9 @@ from components.github_integration import render_github_integration
 from services.model_service import ModelService
 from services.embedding_service import EmbeddingService
 from services.vector_store_service import VectorStoreService
+from utils.embedding_cache import get_embedding_cache
+from utils.response_cache import ResponseCache
+from models.model_registry import get_model_registry
 from components.project_management import ProjectManagement
 
 # Load environment variables
@@ -30,14 +33,44 @@ def initialize_session_state():
     if 'config' not in st.session_state:
         st.session_state.config = AppConfig()
     
-    if 'model_service' not in st.session_state:
-        st.session_state.model_service = ModelService()
+    # The registry is shared by all sessions, only the first one warms it up
+    registry = get_model_registry(st.session_state.config.model_registry_max_memory_mb)
+    registry.warm_up_in_background(st.session_state.config.warm_up_models)
     
     if 'embedding_service' not in st.session_state:
-        st.session_state.embedding_service = EmbeddingService()
+        config = st.session_state.config
+        embedding_cache = None
+        if config.embedding_cache_enabled:
+            # Shared by all sessions, they must not manage the same files separately
+            embedding_cache = get_embedding_cache(config.embedding_cache_path, config.embedding_cache_max_entries)
+        st.session_state.embedding_service = EmbeddingService(
+            embedding_cache=embedding_cache,
+            micro_batching=config.embedding_micro_batching,
+            max_batch_size=config.embedding_max_batch_size,
+            max_latency_ms=config.embedding_max_latency_ms
+        )
+    
+    if 'model_service' not in st.session_state:
+        config = st.session_state.config
+        response_cache = None
+        if config.response_cache_enabled:
+            response_cache = ResponseCache(
+                config.response_cache_path,
+                ttl=config.response_cache_ttl,
+                max_memory_entries=config.response_cache_memory_entries,
+                embedding_service=st.session_state.embedding_service if config.response_cache_semantic else None,
+                semantic_threshold=config.response_cache_semantic_threshold
+            )
+        st.session_state.model_service = ModelService(response_cache=response_cache)
     
     if 'vector_store' not in st.session_state:
-        st.session_state.vector_store = VectorStoreService()
+        config = st.session_state.config
+        st.session_state.vector_store = VectorStoreService(
+            config.vector_db_path,
+            index_type=config.vector_index_type,
+            max_resident_mb=config.vector_db_max_resident_mb,
+            use_mmap=config.vector_db_mmap
+        )
     
     if 'current_page' not in st.session_state:
         st.session_state.current_page = "Home"
@@ -15,7 +15,9 @@ def render_code_review():
     
     # Initialize code analysis service if not exists
     if 'code_analysis_service' not in st.session_state:
-        st.session_state.code_analysis_service = CodeAnalysisService()
+        st.session_state.code_analysis_service = CodeAnalysisService(
+            cache_path=st.session_state.config.code_analysis_cache_path
+        )
     
     # Code input section
     st.subheader("Code Input")
@@ -17,7 +17,13 @@ def render_github_integration():
     
     # Initialize GitHub service if not exists
     if 'github_service' not in st.session_state:
-        st.session_state.github_service = GitHubService()
+        config = st.session_state.config
+        st.session_state.github_service = GitHubService(
+            cache_path=config.github_cache_path,
+            cache_max_entries=config.github_cache_max_entries,
+            cache_ttl=config.github_cache_ttl,
+            max_workers=config.github_max_workers
+        )
     
     # Authentication section
     st.subheader("GitHub Authentication")
@@ -214,7 +220,9 @@ def render_file_analysis():
         with st.spinner("Analyzing code..."):
             # Initialize code analysis service if not exists
             if 'code_analysis_service' not in st.session_state:
-                st.session_state.code_analysis_service = CodeAnalysisService()
+                st.session_state.code_analysis_service = CodeAnalysisService(
+                    cache_path=st.session_state.config.code_analysis_cache_path
+                )
             
             # Get analysis results
             analysis = st.session_state.code_analysis_service.analyze_code(file['content'])
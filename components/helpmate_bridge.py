@@ -1,52 +1,208 @@
 import os
+import json
+import gzip
+import mimetypes
 import subprocess
 import threading
-import streamlit as st
-from flask import Flask, send_from_directory, jsonify, request
-from flask_cors import CORS
+import uvicorn
+from typing import Optional
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
 
-app = Flask(__name__, static_folder='../Helpmate-AI/dist')
-# Configure CORS to allow embedding in iframe from any origin
-CORS(app, resources={r"/*": {"origins": "*", "allow_headers": "*", "expose_headers": "*"}})
+HELPMATE_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'Helpmate-AI'))
+STATIC_FOLDER = os.path.join(HELPMATE_DIR, 'dist')
 
-@app.route('/')
-def serve_helpmate():
-    """Serve the Helpmate-AI React frontend"""
-    return send_from_directory(app.static_folder, 'index.html')
+# Text assets worth compressing ahead of time
+COMPRESSIBLE_EXTENSIONS = ('.html', '.js', '.mjs', '.css', '.json', '.svg', '.txt', '.map', '.wasm')
 
-@app.route('/<path:path>')
-def serve_static(path):
-    """Serve static files from the React app's build directory"""
-    return send_from_directory(app.static_folder, path)
+class FrameHeadersMiddleware:
+    """Add headers allowing the app to be embedded in an iframe from any origin"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_headers(message):
+            if message['type'] == 'http.response.start':
+                headers = [(k, v) for k, v in message.get('headers', [])
+                           if k.lower() not in (b'x-frame-options', b'content-security-policy')]
+                headers.append((b'x-frame-options', b'ALLOW-FROM *'))
+                headers.append((b'content-security-policy', b'frame-ancestors *'))
+                message['headers'] = headers
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
 
-@app.route('/api/chat', methods=['POST'])
-def chat():
-    """Handle chat requests and integrate with coderAI's backend services"""
-    data = request.json
-    question = data.get('question')
+def precompress_static_files(static_folder: str = STATIC_FOLDER, min_size: int = 1024) -> int:
+    """Write .gz and, when brotli is installed, .br siblings of the text assets
     
-    # Here we'll integrate with coderAI's model service
+    Files whose compressed siblings are newer than the file are skipped.
+    
+    Args:
+        static_folder: The React app's build directory
+        min_size: Files smaller than this many bytes are not worth compressing
+    
+    Returns:
+        Number of files written
+    """
     try:
-        # Access the model service from the imported st session state
-        from streamlit.runtime.scriptrunner import get_script_run_ctx
-        if get_script_run_ctx():
-            model_service = st.session_state.model_service
-            response = model_service.generate_response(question)
-            return jsonify({'answer': response})
-        else:
-            return jsonify({'answer': 'Unable to access Streamlit session state. Please try again.'}), 500
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        import brotli
+    except ImportError:
+        brotli = None
+    
+    encoders = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        encoders.append(('.br', lambda data: brotli.compress(data, quality=11)))
+    
+    written = 0
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            if os.path.getsize(path) < min_size:
+                continue
+            data = None
+            for suffix, encode in encoders:
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    continue
+                if data is None:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                with open(target + '.tmp', 'wb') as f:
+                    f.write(encode(data))
+                os.replace(target + '.tmp', target)
+                written += 1
+    return written
+
+def _cache_control(path: str) -> str:
+    # Vite puts content-hashed bundles under assets/, they never change
+    if path.startswith('assets/'):
+        return 'public, max-age=31536000, immutable'
+    # Everything else, index.html in particular, must be revalidated to pick up new builds
+    return 'no-cache'
+
+def _accepted_encodings(request: Request) -> set:
+    encodings = set()
+    for part in request.headers.get('accept-encoding', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding and params.replace(' ', '') not in ('q=0', 'q=0.0'):
+            encodings.add(coding.lower())
+    return encodings
+
+def _static_response(request: Request, static_folder: str, path: str) -> Response:
+    full_path = os.path.realpath(os.path.join(static_folder, path))
+    # Don't serve anything outside the build directory
+    if os.path.commonpath([full_path, os.path.realpath(static_folder)]) != os.path.realpath(static_folder):
+        return Response('Not Found', status_code=404)
+    if not os.path.isfile(full_path):
+        return Response('Not Found', status_code=404)
+    
+    headers = {'Cache-Control': _cache_control(path), 'Vary': 'Accept-Encoding'}
+    accepted = _accepted_encodings(request)
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if encoding in accepted and os.path.isfile(full_path + suffix):
+            headers['Content-Encoding'] = encoding
+            # The type comes from the original name, the ETag from the compressed file
+            media_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+            return _not_modified(request, FileResponse(full_path + suffix, headers=headers, media_type=media_type,
+                                                         stat_result=os.stat(full_path + suffix)))
+    
+    return _not_modified(request, FileResponse(full_path, headers=headers, stat_result=os.stat(full_path)))
+
+def _not_modified(request: Request, response: FileResponse) -> Response:
+    # The ETag is only known up front because the responses are created with their stat result
+    etag = response.headers.get('etag')
+    if etag and etag in [tag.strip() for tag in request.headers.get('if-none-match', '').split(',')]:
+        return Response(status_code=304, headers={
+            key: value for key, value in response.headers.items()
+            if key in ('etag', 'cache-control', 'vary', 'content-encoding')
+        })
+    return response
+
+def create_app(model_service, static_folder: str = STATIC_FOLDER) -> Starlette:
+    """Create the Helpmate-AI bridge ASGI app
+    
+    Args:
+        model_service: ModelService answering chat requests, shared with the Streamlit app
+        static_folder: The React app's build directory
+    
+    Returns:
+        The ASGI app
+    """
+    async def serve_helpmate(request: Request) -> Response:
+        """Serve the Helpmate-AI React frontend"""
+        return _static_response(request, static_folder, 'index.html')
+    
+    async def serve_static(request: Request) -> Response:
+        """Serve static files from the React app's build directory"""
+        return _static_response(request, static_folder, request.path_params['path'])
+    
+    async def chat(request: Request) -> Response:
+        """Handle chat requests, streaming the answer as server-sent events when asked to
+        
+        The body is {"question": ..., "stream": false}. Streamed answers are sent as
+        `data: {"token": ...}` events followed by `data: {"done": true}`.
+        """
+        try:
+            data = await request.json()
+        except ValueError:
+            return JSONResponse({'error': 'Invalid JSON body'}, status_code=400)
+        question = data.get('question') if isinstance(data, dict) else None
+        if not question:
+            return JSONResponse({'error': 'Missing question'}, status_code=400)
+        
+        stream = data.get('stream') or 'text/event-stream' in request.headers.get('accept', '')
+        if not stream:
+            answer = await model_service.agenerate_response(question)
+            return JSONResponse({'answer': answer})
+        
+        async def events():
+            try:
+                async for token in model_service.astream_response(question):
+                    yield f"data: {json.dumps({'token': token})}\n\n"
+                yield f"data: {json.dumps({'done': True})}\n\n"
+            except Exception as e:
+                yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        
+        return StreamingResponse(events(), media_type='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            # Keep reverse proxies from buffering the stream
+            'X-Accel-Buffering': 'no'
+        })
+    
+    return Starlette(
+        routes=[
+            Route('/api/chat', chat, methods=['POST']),
+            Route('/', serve_helpmate, methods=['GET', 'HEAD']),
+            Route('/{path:path}', serve_static, methods=['GET', 'HEAD'])
+        ],
+        middleware=[
+            # Configure CORS to allow embedding in iframe from any origin
+            Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'],
+                       allow_headers=['*'], expose_headers=['*']),
+            Middleware(FrameHeadersMiddleware)
+        ]
+    )
 
 def check_helpmate_build():
     """Check if Helpmate-AI is built, and build it if not"""
-    if not os.path.exists(app.static_folder):
+    if not os.path.exists(STATIC_FOLDER):
         # Build the React app
         try:
             print("Building Helpmate-AI React app...")
             subprocess.run(
-                ["npm", "run", "build"], 
-                cwd=os.path.join(os.getcwd(), "../Helpmate-AI"),
+                ["npm", "run", "build"],
+                cwd=HELPMATE_DIR,
                 check=True
             )
             return True
@@ -55,28 +211,41 @@ def check_helpmate_build():
             return False
     return True
 
-def run_flask_app():
-    """Run the Flask app in a separate thread"""
-    # Set Flask server headers to allow iframe embedding
-    @app.after_request
-    def add_header(response):
-        response.headers['X-Frame-Options'] = 'ALLOW-FROM *'
-        response.headers['Content-Security-Policy'] = "frame-ancestors *"
-        return response
-        
-    app.run(host='0.0.0.0', port=5173, debug=False, use_reloader=False)
+def run_bridge_server(server: uvicorn.Server):
+    """Run the bridge server in a separate thread"""
+    # Signal handlers can only be installed from the main thread, which Streamlit owns
+    server.install_signal_handlers = lambda: None
+    server.run()
 
-def init_helpmate_bridge():
-    """Initialize the Helpmate-AI bridge"""
+def init_helpmate_bridge(model_service, host: str = '0.0.0.0', port: int = 5173,
+                         static_folder: Optional[str] = None):
+    """Initialize the Helpmate-AI bridge
+    
+    Args:
+        model_service: ModelService answering chat requests, shared with the Streamlit app
+        host: Interface to listen on
+        port: Port to listen on
+        static_folder: The React app's build directory
+    
+    Returns:
+        The thread running the server
+    """
+    static_folder = static_folder or STATIC_FOLDER
     # Ensure the static folder exists or build it
-    if not os.path.exists(app.static_folder):
+    if not os.path.exists(static_folder):
         if not check_helpmate_build():
-            raise Exception('Helpmate-AI build directory not found and build failed. Please build the React app manually.')
+            raise Exception('Helpmate-AI build directory not found and build failed. '
+                            'Please build the React app manually.')
+    precompress_static_files(static_folder)
+    
+    config = uvicorn.Config(create_app(model_service, static_folder), host=host, port=port,
+                            log_level='warning', timeout_keep_alive=30)
+    server = uvicorn.Server(config)
     
-    # Start the Flask app in a separate thread
-    flask_thread = threading.Thread(target=run_flask_app)
-    flask_thread.daemon = True
-    flask_thread.start()
+    # Start the server in a separate thread, requests are handled concurrently on its event loop
+    server_thread = threading.Thread(target=run_bridge_server, args=(server,))
+    server_thread.daemon = True
+    server_thread.start()
     
-    print("Helpmate-AI bridge initialized on port 5173")
-    return flask_thread
\ No newline at end of file
+    print(f"Helpmate-AI bridge initialized on port {port}")
+    return server_thread
@@ -4,6 +4,7 @@ import plotly.express as px
 from datetime import datetime
 import os
 from components.helpmate_bridge import init_helpmate_bridge
+from utils.document_processor import DocumentProcessor
 
 def render_main_panel():
     """Render the main panel of the CoderAI application"""
@@ -14,7 +15,7 @@ def render_main_panel():
         
     if not st.session_state.helpmate_initialized:
         try:
-            st.session_state.helpmate_thread = init_helpmate_bridge()
+            st.session_state.helpmate_thread = init_helpmate_bridge(st.session_state.model_service)
             st.session_state.helpmate_initialized = True
         except Exception as e:
             st.error(f"Failed to initialize Helpmate-AI integration: {str(e)}")
@@ -117,20 +118,39 @@ def render_document_processing():
         # Processing options
         st.checkbox("Extract metadata", value=True)
         st.checkbox("Generate summary", value=True)
-        st.checkbox("Store in vector database", value=True)
+        store_in_vector_db = st.checkbox("Store in vector database", value=True)
     
     # Process button
     if st.button("Process Document", disabled=uploaded_file is None):
         if uploaded_file is not None:
             with st.spinner("Processing document..."):
-                # Simulate processing
-                st.success(f"Document '{uploaded_file.name}' processed successfully!")
+                config = st.session_state.config
+                embedding_service = st.session_state.embedding_service
+                vector_store = st.session_state.vector_store
+                chunks_indexed = 0
+                
+                if store_in_vector_db:
+                    if embedding_service.model_name != selected_embedding_model:
+                        embedding_service.load_model(selected_embedding_model)
+                    
+                    # Read, chunk, embed and index the document in bounded batches
+                    progress = st.empty()
+                    chunks_indexed = DocumentProcessor.ingest(
+                        uploaded_file.getvalue(),
+                        os.path.splitext(uploaded_file.name)[1].lstrip("."),
+                        embedding_service,
+                        vector_store,
+                        metadata={"source": uploaded_file.name},
+                        chunk_size=config.chunk_size,
+                        overlap=config.chunk_overlap,
+                        chunk_unit=config.chunk_unit,
+                        batch_size=config.ingest_batch_size,
+                        progress_callback=lambda indexed: progress.text(f"Indexed {indexed} chunks..."),
+                        index_name=vector_store.name or "default"
+                    )
+                    progress.empty()
                 
-                # In a real implementation, we would:
-                # 1. Read the document
-                # 2. Generate embeddings using the selected model
-                # 3. Store in vector database
-                # 4. Extract metadata and generate summary
+                st.success(f"Document '{uploaded_file.name}' processed successfully!")
                 
                 # Add to session state
                 if "documents" not in st.session_state:
@@ -141,6 +161,7 @@ def render_document_processing():
                     "size": uploaded_file.size,
                     "type": uploaded_file.type,
                     "embedding_model": selected_embedding_model,
+                    "chunks": chunks_indexed,
                     "processed_at": datetime.now().isoformat()
                 })
     
@@ -153,6 +174,7 @@ def render_document_processing():
                 st.write(f"Size: {doc['size']} bytes")
                 st.write(f"Type: {doc['type']}")
                 st.write(f"Embedding Model: {doc['embedding_model']}")
+                st.write(f"Chunks indexed: {doc.get('chunks', 0)}")
                 st.write(f"Processed at: {doc['processed_at']}")
                 
                 # Actions
@@ -226,15 +248,20 @@ def render_chat_interface():
                     active_model = "claude-3-haiku"
                 
                 if active_provider:
-                    with st.spinner("Generating response..."):
-                        response = model_service.query_model(
-                            prompt=user_input,
-                            provider=active_provider,
-                            model=active_model
-                        )
-                        
-                        ai_response = response.get("text", "Sorry, I couldn't generate a response.")
-                        st.session_state.chat_history.append({"role": "assistant", "content": ai_response})
+                    # Show tokens as soon as the provider sends them
+                    placeholder = st.empty()
+                    ai_response = ""
+                    for token in model_service.stream_model(
+                        prompt=user_input,
+                        provider=active_provider,
+                        model=active_model
+                    ):
+                        ai_response += token
+                        placeholder.markdown(ai_response)
+                    placeholder.empty()
+                    
+                    ai_response = ai_response or "Sorry, I couldn't generate a response."
+                    st.session_state.chat_history.append({"role": "assistant", "content": ai_response})
                 else:
                     st.error("No active AI providers found. Please configure a provider in the settings.")
             except Exception as e:
@@ -14,11 +14,51 @@ class AppConfig(BaseModel):
     # File handling
     allowed_extensions: List[str] = ["pdf", "txt", "docx", "md"]
     max_file_size_mb: int = 100
+    chunk_size: int = 1000
+    chunk_overlap: int = 100
+    chunk_unit: str = "tokens"  # tokens of the embedding model, capped at its max sequence length, or characters
+    ingest_batch_size: int = 64  # Chunks embedded and indexed at once
     
     # Vector database settings
     vector_db_path: str = "./data/vector_db"
+    vector_index_type: str = "flat"  # flat, ivf_flat, ivf_pq or hnsw
+    vector_db_max_resident_mb: int = 1024  # Memory budget for indexes kept loaded
+    vector_db_mmap: bool = True
     embedding_dimension: int = 384  # Default for all-MiniLM-L6-v2
     
+    # Model registry settings
+    model_registry_max_memory_mb: int = 4096  # Memory budget for loaded Hugging Face models
+    warm_up_models: List[Dict[str, Any]] = [
+        {"sentence_transformer": "sentence-transformers/all-MiniLM-L6-v2"}
+    ]
+    
+    # Embedding micro-batching settings
+    embedding_micro_batching: bool = True  # Batch concurrent single-text requests of all sessions
+    embedding_max_batch_size: int = 32
+    embedding_max_latency_ms: float = 5.0
+    
+    # Embedding cache settings
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str = "./data/embedding_cache"
+    embedding_cache_max_entries: int = 200000  # Per embedding model
+    
+    # Response cache settings
+    response_cache_enabled: bool = True
+    response_cache_path: str = "./data/response_cache.db"
+    response_cache_ttl: int = 86400  # Seconds
+    response_cache_memory_entries: int = 1024
+    response_cache_semantic: bool = False  # Reuse responses of similar prompts
+    response_cache_semantic_threshold: float = 0.95
+    
+    # GitHub settings
+    github_cache_path: str = "./data/github_cache.db"  # Responses revalidated with ETag / Last-Modified
+    github_cache_max_entries: int = 20000  # Least recently used responses are evicted first
+    github_cache_ttl: int = 30 * 86400  # Seconds a response is kept after it was last validated
+    github_max_workers: int = 8  # Concurrent blob fetches
+    
+    # Code analysis settings
+    code_analysis_cache_path: str = "./data/code_analysis_cache.db"  # Results by content hash
+    
     # API settings
     api_timeout: int = 30
     max_retries: int = 3
@@ -296,7 +296,7 @@ async def generate_flow_events(
                     artifacts=artifacts,
                 )
             else:
-                await chat_service.set_cache(flow_id_str, graph)
+                await chat_service.set_vertex_checkpoint(flow_id_str, graph, vertex_id)
 
             timedelta = time.perf_counter() - start_time
             duration = format_elapsed_time(timedelta)
@@ -36,7 +36,6 @@ from langflow.api.v1.schemas import (
     VerticesOrderResponse,
 )
 from langflow.exceptions.component import ComponentBuildError
-from langflow.graph.graph.base import Graph
 from langflow.graph.utils import log_vertex_build
 from langflow.schema.schema import OutputValue
 from langflow.services.cache.utils import CacheMiss
@@ -244,20 +243,15 @@ async def build_vertex(
     start_time = time.perf_counter()
     error_message = None
     try:
-        graph: Graph = await chat_service.get_cache(flow_id_str)
-    except KeyError as exc:
-        raise HTTPException(status_code=404, detail="Graph not found") from exc
-
-    try:
-        cache = await chat_service.get_cache(flow_id_str)
-        if isinstance(cache, CacheMiss):
+        cached_graph = await chat_service.get_graph(flow_id_str)
+        if isinstance(cached_graph, CacheMiss):
             # If there's no cache
             logger.warning(f"No cache found for {flow_id_str}. Building graph starting at {vertex_id}")
             graph = await build_graph_from_db(
                 flow_id=flow_id, session=await anext(get_session()), chat_service=chat_service
             )
         else:
-            graph = cache.get("result")
+            graph = cached_graph
             await graph.initialize_run()
         vertex = graph.get_vertex(vertex_id)
 
@@ -321,7 +315,7 @@ async def build_vertex(
         graph.reset_inactivated_vertices()
         graph.reset_activated_vertices()
 
-        await chat_service.set_cache(flow_id_str, graph)
+        await chat_service.set_vertex_checkpoint(flow_id_str, graph, vertex_id)
 
         # graph.stop_vertex tells us if the user asked
         # to stop the build of the graph at a certain vertex
@@ -372,20 +366,20 @@ async def _stream_vertex(flow_id: str, vertex_id: str, chat_service: ChatService
     graph = None
     try:
         try:
-            cache = await chat_service.get_cache(flow_id)
+            cached_graph = await chat_service.get_graph(flow_id)
         except Exception as exc:  # noqa: BLE001
             logger.exception("Error building Component")
             yield str(StreamData(event="error", data={"error": str(exc)}))
             return
 
-        if isinstance(cache, CacheMiss):
+        if isinstance(cached_graph, CacheMiss):
             # If there's no cache
             msg = f"No cache found for {flow_id}."
             logger.error(msg)
             yield str(StreamData(event="error", data={"error": msg}))
             return
         else:
-            graph = cache.get("result")
+            graph = cached_graph
 
         try:
             vertex: InterfaceVertex = graph.get_vertex(vertex_id)
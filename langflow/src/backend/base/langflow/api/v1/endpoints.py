@@ -27,6 +27,7 @@ from langflow.api.v1.schemas import (
     UploadFileResponse,
 )
 from langflow.custom.custom_component.component import Component
+from langflow.custom.eval import component_class_cache
 from langflow.custom.utils import build_custom_component_template, get_instance_name, update_component_build_config
 from langflow.events.event_manager import create_stream_tokens_event_manager
 from langflow.exceptions.api import APIException, InvalidChatInputError
@@ -36,6 +37,7 @@ from langflow.graph.schema import RunOutputs
 from langflow.helpers.flow import get_flow_by_id_or_endpoint_name
 from langflow.helpers.user import get_user_by_flow_id_or_endpoint_name
 from langflow.interface.initialize.loading import update_params_with_load_from_db_fields
+from langflow.processing.prepared_graph import prepared_graph_cache
 from langflow.processing.process import process_tweaks, run_graph_internal
 from langflow.schema.graph import Tweaks
 from langflow.services.auth.utils import api_key_security, get_current_active_user
@@ -112,12 +114,7 @@ async def simple_run_flow(
         task_result: list[RunOutputs] = []
         user_id = api_key_user.id if api_key_user else None
         flow_id_str = str(flow.id)
-        if flow.data is None:
-            msg = f"Flow {flow_id_str} has no data"
-            raise ValueError(msg)
-        graph_data = flow.data.copy()
-        graph_data = process_tweaks(graph_data, input_request.tweaks or {}, stream=stream)
-        graph = Graph.from_payload(graph_data, flow_id=flow_id_str, user_id=str(user_id), flow_name=flow.name)
+        graph = prepared_graph_cache.get_graph(flow, input_request.tweaks, stream=stream, user_id=str(user_id))
         inputs = None
         if input_request.input_value is not None:
             inputs = [
@@ -687,6 +684,11 @@ async def custom_component_update(
         HTTPException: If there's an error building or updating the component
         SerializationError: If there's an error serializing the component to JSON
     """
+    # Drop the compiled classes of the previous and the submitted code so the next run recompiles them
+    previous_code = code_request.template.get("code", {})
+    if isinstance(previous_code, dict) and isinstance(previous_code.get("value"), str):
+        component_class_cache.invalidate(previous_code["value"])
+    component_class_cache.invalidate(code_request.code)
     try:
         component = Component(_code=code_request.code)
         component_node, cc_instance = build_custom_component_template(
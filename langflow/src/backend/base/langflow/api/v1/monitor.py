@@ -18,6 +18,7 @@ from langflow.services.database.models.vertex_builds.crud import (
     get_vertex_builds_by_flow_id,
 )
 from langflow.services.database.models.vertex_builds.model import VertexBuildMapModel
+from langflow.services.deps import get_log_writer_service
 
 router = APIRouter(prefix="/monitor", tags=["Monitor"])
 
@@ -25,6 +26,8 @@ router = APIRouter(prefix="/monitor", tags=["Monitor"])
 @router.get("/builds")
 async def get_vertex_builds(flow_id: Annotated[UUID, Query()], session: DbSession) -> VertexBuildMapModel:
     try:
+        # Logs are written behind the builds, make sure the queued ones are visible
+        await get_log_writer_service().flush()
         vertex_builds = await get_vertex_builds_by_flow_id(session, flow_id)
         return VertexBuildMapModel.from_list_of_dicts(vertex_builds)
     except Exception as e:
@@ -34,6 +37,7 @@ async def get_vertex_builds(flow_id: Annotated[UUID, Query()], session: DbSessio
 @router.delete("/builds", status_code=204)
 async def delete_vertex_builds(flow_id: Annotated[UUID, Query()], session: DbSession) -> None:
     try:
+        await get_log_writer_service().flush()
         await delete_vertex_builds_by_flow_id(session, flow_id)
         await session.commit()
     except Exception as e:
@@ -166,6 +170,7 @@ async def get_transactions(
     params: Annotated[Params | None, Depends(custom_params)],
 ) -> Page[TransactionTable]:
     try:
+        await get_log_writer_service().flush()
         stmt = (
             select(TransactionTable)
             .where(TransactionTable.flow_id == flow_id)
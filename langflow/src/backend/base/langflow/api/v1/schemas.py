@@ -265,6 +265,7 @@ class ResultDataResponse(BaseModel):
     timedelta: float | None = None
     duration: str | None = None
     used_frozen_result: bool | None = False
+    used_cached_result: bool | None = False
 
     @field_serializer("results")
     @classmethod
@@ -284,6 +285,7 @@ class ResultDataResponse(BaseModel):
             "timedelta": self.timedelta,
             "duration": self.duration,
             "used_frozen_result": self.used_frozen_result,
+            "used_cached_result": self.used_cached_result,
         }
 
 
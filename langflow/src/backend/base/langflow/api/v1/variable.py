@@ -7,6 +7,7 @@ from langflow.api.utils import CurrentActiveUser, DbSession
 from langflow.services.database.models.variable import VariableCreate, VariableRead, VariableUpdate
 from langflow.services.deps import get_variable_service
 from langflow.services.variable.constants import CREDENTIAL_TYPE
+from langflow.services.variable.resolver import variable_cache
 from langflow.services.variable.service import DatabaseVariableService
 
 router = APIRouter(prefix="/variables", tags=["Variables"])
@@ -33,7 +34,7 @@ async def create_variable(
     if variable.name in await variable_service.list_variables(user_id=current_user.id, session=session):
         raise HTTPException(status_code=400, detail="Variable name already exists")
     try:
-        return await variable_service.create_variable(
+        db_variable = await variable_service.create_variable(
             user_id=current_user.id,
             name=variable.name,
             value=variable.value,
@@ -41,10 +42,12 @@ async def create_variable(
             type_=variable.type or CREDENTIAL_TYPE,
             session=session,
         )
+        variable_cache.invalidate(current_user.id)
     except Exception as e:
         if isinstance(e, HTTPException):
             raise
         raise HTTPException(status_code=500, detail=str(e)) from e
+    return db_variable
 
 
 @router.get("/", response_model=list[VariableRead], status_code=200)
@@ -78,17 +81,19 @@ async def update_variable(
         msg = "Variable service is not an instance of DatabaseVariableService"
         raise TypeError(msg)
     try:
-        return await variable_service.update_variable_fields(
+        db_variable = await variable_service.update_variable_fields(
             user_id=current_user.id,
             variable_id=variable_id,
             variable=variable,
             session=session,
         )
+        variable_cache.invalidate(current_user.id)
     except NoResultFound as e:
         raise HTTPException(status_code=404, detail="Variable not found") from e
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
+    return db_variable
 
 
 @router.delete("/{variable_id}", status_code=204)
@@ -102,5 +107,6 @@ async def delete_variable(
     variable_service = get_variable_service()
     try:
         await variable_service.delete_variable_by_id(user_id=current_user.id, variable_id=variable_id, session=session)
+        variable_cache.invalidate(current_user.id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -5,7 +5,9 @@ import asyncio
 import inspect
 from collections.abc import AsyncIterator, Iterator
 from copy import deepcopy
+from functools import lru_cache
 from textwrap import dedent
+from types import SimpleNamespace
 from typing import TYPE_CHECKING, Any, ClassVar, NamedTuple, get_type_hints
 from uuid import UUID
 
@@ -64,6 +66,21 @@ def _get_component_toolkit():
     return _ComponentToolkit
 
 
+_REQUIRED_INPUT = SimpleNamespace(required=True)
+
+
+@lru_cache(maxsize=1024)
+def _find_required_inputs(source_code: str, required_input_names: frozenset[str]) -> tuple[str, ...]:
+    """Returns the required inputs referenced in `source_code`.
+
+    Every instance of a component class shares the same method sources, so the parse is
+    done once per source instead of on every instantiation.
+    """
+    visitor = RequiredInputsVisitor(dict.fromkeys(required_input_names, _REQUIRED_INPUT))
+    visitor.visit(ast.parse(dedent(source_code)))
+    return tuple(sorted(visitor.required_inputs))
+
+
 BACKWARDS_COMPATIBLE_ATTRIBUTES = ["user_id", "vertex", "tracing_service"]
 CONFIG_ATTRIBUTES = ["_display_name", "_description", "_icon", "_name", "_metadata"]
 
@@ -495,6 +512,7 @@ class Component(CustomComponent):
         output.set_selected()
 
     def _set_output_required_inputs(self) -> None:
+        required_input_names = frozenset(name for name, input_ in self._inputs.items() if input_.required)
         for output in self.outputs:
             if not output.method:
                 continue
@@ -503,13 +521,11 @@ class Component(CustomComponent):
                 continue
             try:
                 source_code = inspect.getsource(method)
-                ast_tree = ast.parse(dedent(source_code))
+                required_inputs = _find_required_inputs(source_code, required_input_names)
             except Exception:  # noqa: BLE001
-                ast_tree = ast.parse(dedent(self._code or ""))
+                required_inputs = _find_required_inputs(self._code or "", required_input_names)
 
-            visitor = RequiredInputsVisitor(self._inputs)
-            visitor.visit(ast_tree)
-            output.required_inputs = sorted(visitor.required_inputs)
+            output.required_inputs = list(required_inputs)
 
     def get_output_by_method(self, method: Callable):
         # method is a callable and output.method is a string
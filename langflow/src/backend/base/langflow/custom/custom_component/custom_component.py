@@ -61,6 +61,9 @@ class CustomComponent(BaseComponent):
     """The description of the component. Defaults to None."""
     icon: str | None = None
     """The icon of the component. It should be an emoji. Defaults to None."""
+    cacheable: bool = False
+    """Whether the outputs only depend on the code, parameters and inputs, so that they can be reused across runs
+    when the vertex result cache is enabled. Defaults to False."""
 
     def __init__(self, **data) -> None:
         """Initializes a new instance of the CustomComponent class.
@@ -452,6 +455,9 @@ class CustomComponent(BaseComponent):
         else:
             msg = f"Invalid user id: {self.user_id}"
             raise TypeError(msg)
+        if self._vertex is not None and self._vertex.graph is not None:
+            # Loads the variables of the whole run at once and reuses them across vertices
+            return await self._vertex.graph.variable_resolver.get(user_id, name, field)
         async with session_scope() as session:
             return await variable_service.get_variable(user_id=user_id, name=name, field=field, session=session)
 
@@ -1,3 +1,6 @@
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import TYPE_CHECKING
 
 from langflow.utils import validate
@@ -5,8 +8,77 @@ from langflow.utils import validate
 if TYPE_CHECKING:
     from langflow.custom import CustomComponent
 
+DEFAULT_COMPONENT_CLASS_CACHE_SIZE = 256
+
 
 def eval_custom_component_code(code: str) -> type["CustomComponent"]:
     """Evaluate custom component code."""
     class_name = validate.extract_class_name(code)
     return validate.create_class(code, class_name)
+
+
+class ComponentClassCache:
+    """A process-wide LRU cache of compiled component classes keyed by a hash of their code.
+
+    Compiling a component parses the code, executes its imports and runs the class body, so
+    it is done once per distinct code string and reused by every vertex that shares it.
+
+    Attributes:
+        max_size (int): Maximum number of classes to keep.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that had to compile the code.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_COMPONENT_CLASS_CACHE_SIZE) -> None:
+        self._classes: OrderedDict[str, type[CustomComponent]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def hash_code(code: str) -> str:
+        return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+    def get_or_create(self, code: str) -> type["CustomComponent"]:
+        """Return the compiled class for `code`, compiling and caching it on a miss."""
+        key = self.hash_code(code)
+        with self._lock:
+            if (class_object := self._classes.get(key)) is not None:
+                self._classes.move_to_end(key)
+                self.hits += 1
+                return class_object
+            self.misses += 1
+
+        # Compile outside the lock so a slow import doesn't block other lookups.
+        # Errors are not cached, the next call will try again.
+        class_object = eval_custom_component_code(code)
+        with self._lock:
+            self._classes[key] = class_object
+            self._classes.move_to_end(key)
+            while len(self._classes) > self.max_size:
+                self._classes.popitem(last=False)
+        return class_object
+
+    def invalidate(self, code: str | None = None) -> None:
+        """Remove the class compiled from `code`, or every class if no code is given."""
+        with self._lock:
+            if code is None:
+                self._classes.clear()
+            else:
+                self._classes.pop(self.hash_code(code), None)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"size": len(self._classes), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._classes)
+
+
+component_class_cache = ComponentClassCache()
+
+
+def get_component_class(code: str) -> type["CustomComponent"]:
+    """Evaluate custom component code, reusing the class compiled for the same code when possible."""
+    return component_class_cache.get_or_create(code)
@@ -9,9 +9,8 @@ import threading
 import uuid
 from collections import defaultdict, deque
 from datetime import datetime, timezone
-from functools import partial
 from itertools import chain
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING, Any, Literal, cast
 
 from loguru import logger
 
@@ -38,7 +37,8 @@ from langflow.logging.logger import LogConfig, configure
 from langflow.schema.dotdict import dotdict
 from langflow.schema.schema import INPUT_FIELD_NAME, InputType
 from langflow.services.cache.utils import CacheMiss
-from langflow.services.deps import get_chat_service, get_tracing_service
+from langflow.services.deps import get_chat_service, get_settings_service, get_tracing_service
+from langflow.services.variable.resolver import VariableResolver
 from langflow.utils.async_helpers import run_until_complete
 
 if TYPE_CHECKING:
@@ -130,6 +130,7 @@ class Graph:
         self._call_order: list[str] = []
         self._snapshots: list[dict[str, Any]] = []
         self._end_trace_tasks: set[asyncio.Task] = set()
+        self._variable_resolver: VariableResolver | None = None
 
         if context and not isinstance(context, dict):
             msg = "Context must be a dictionary"
@@ -669,9 +670,24 @@ class Graph:
         self.tracing_service.set_run_name(name)
 
     async def initialize_run(self) -> None:
+        # Variables may have changed since the last run
+        self._variable_resolver = None
         if self.tracing_service:
             await self.tracing_service.initialize_tracers()
 
+    @property
+    def variable_resolver(self) -> VariableResolver:
+        """The resolver shared by the vertices of the current run to load their global variables."""
+        if self._variable_resolver is None:
+            names = {
+                vertex.params[field]
+                for vertex in self.vertices
+                for field in vertex.load_from_db_fields
+                if isinstance(vertex.params.get(field), str) and vertex.params[field]
+            }
+            self._variable_resolver = VariableResolver(names)
+        return self._variable_resolver
+
     def _end_all_traces_async(self, outputs: dict[str, Any] | None = None, error: Exception | None = None) -> None:
         task = asyncio.create_task(self.end_all_traces(outputs, error))
         self._end_trace_tasks.add(task)
@@ -735,6 +751,7 @@ class Graph:
         session_id: str,
         fallback_to_env_vars: bool,
         event_manager: EventManager | None = None,
+        max_concurrency: int | None = None,
     ) -> list[ResultData | None]:
         """Runs the graph with the given inputs.
 
@@ -747,6 +764,7 @@ class Graph:
             session_id (str): The session ID for the graph.
             fallback_to_env_vars (bool): Whether to fallback to environment variables.
             event_manager (EventManager | None): The event manager for the graph.
+            max_concurrency (int | None): Maximum number of vertices built at the same time.
 
         Returns:
             List[Optional["ResultData"]]: The outputs of the graph.
@@ -784,6 +802,7 @@ class Graph:
                 start_component_id=start_component_id,
                 fallback_to_env_vars=fallback_to_env_vars,
                 event_manager=event_manager,
+                max_concurrency=max_concurrency,
             )
             self.increment_run_count()
         except Exception as exc:
@@ -819,6 +838,7 @@ class Graph:
         stream: bool = False,
         fallback_to_env_vars: bool = False,
         event_manager: EventManager | None = None,
+        max_concurrency: int | None = None,
     ) -> list[RunOutputs]:
         """Runs the graph with the given inputs.
 
@@ -831,6 +851,8 @@ class Graph:
             stream (bool, optional): Whether to stream the results or not. Defaults to False.
             fallback_to_env_vars (bool, optional): Whether to fallback to environment variables. Defaults to False.
             event_manager (EventManager | None): The event manager for the graph.
+            max_concurrency (int | None, optional): Maximum number of vertices built at the same time.
+                Defaults to the `graph_max_concurrency` setting.
 
         Returns:
             List[RunOutputs]: The outputs of the graph.
@@ -864,6 +886,7 @@ class Graph:
                 session_id=session_id or "",
                 fallback_to_env_vars=fallback_to_env_vars,
                 event_manager=event_manager,
+                max_concurrency=max_concurrency,
             )
             run_output_object = RunOutputs(inputs=run_inputs, outputs=run_outputs)
             logger.debug(f"Run outputs: {run_output_object}")
@@ -1051,6 +1074,7 @@ class Graph:
         self.vertex_map = {vertex.id: vertex for vertex in self.vertices}
         self.state_manager = GraphStateManager()
         self.tracing_service = get_tracing_service()
+        self._variable_resolver = None
         self.set_run_id(self._run_id)
         self.set_run_name()
 
@@ -1091,6 +1115,40 @@ class Graph:
         else:
             return graph
 
+    def clone(self, user_id: str | None = None) -> Graph:
+        """Creates a new graph with the same structure as this one and fresh run state.
+
+        The processed nodes and edges, the cycle detection and the adjacency maps are reused,
+        so only the vertices and their component instances are built again. This graph is
+        left untouched and can keep serving as a template for other runs.
+
+        Args:
+            user_id: The user ID for the new graph. Defaults to the user ID of this graph.
+
+        Returns:
+            Graph: The new graph.
+        """
+        graph = type(self)(
+            flow_id=self.flow_id,
+            flow_name=self.flow_name,
+            description=self.description,
+            user_id=user_id if user_id is not None else self.user_id,
+            context=dict(self._context),
+        )
+        graph.raw_graph_data = self.raw_graph_data
+        graph.top_level_vertices = list(self.top_level_vertices)
+        # Vertices may update their node data in place, so every clone gets its own copy
+        graph._vertices = copy.deepcopy(self._vertices)
+        graph._edges = copy.deepcopy(self._edges)
+        graph._cycle_vertices = set(self.cycle_vertices)
+        graph._build_graph()
+        graph.predecessor_map = defaultdict(list, {key: list(value) for key, value in self.predecessor_map.items()})
+        graph.successor_map = defaultdict(list, {key: list(value) for key, value in self.successor_map.items()})
+        graph.in_degree_map = defaultdict(int, self.in_degree_map)
+        graph.parent_child_map = defaultdict(list, {key: list(value) for key, value in self.parent_child_map.items()})
+        graph.define_vertices_lists()
+        return graph
+
     def __eq__(self, /, other: object) -> bool:
         if not isinstance(other, Graph):
             return False
@@ -1245,10 +1303,8 @@ class Graph:
 
     def _set_cache_to_vertices_in_cycle(self) -> None:
         """Sets the cache to the vertices in cycle."""
-        edges = self._get_edges_as_list_of_tuples()
-        cycle_vertices = set(find_cycle_vertices(edges))
         for vertex in self.vertices:
-            if vertex.id in cycle_vertices:
+            if vertex.id in self.cycle_vertices:
                 vertex.apply_on_outputs(lambda output_object: setattr(output_object, "cache", False))
 
     def _instantiate_components_in_vertices(self) -> None:
@@ -1340,7 +1396,7 @@ class Graph:
         self.reset_inactivated_vertices()
         self.reset_activated_vertices()
 
-        await chat_service.set_cache(str(self.flow_id or self._run_id), self)
+        await chat_service.set_vertex_checkpoint(str(self.flow_id or self._run_id), self, vertex_id)
         self._record_snapshot(vertex_id)
         return vertex_build_result
 
@@ -1361,6 +1417,39 @@ class Graph:
         if vertex_id:
             self._call_order.append(vertex_id)
 
+    def get_run_state(self) -> dict:
+        """Returns the scheduling state of the run, which changes after every vertex build.
+
+        Together with the checkpoints of the built vertices, it restores a run onto the graph
+        cached when the run started, without caching the whole graph after every vertex.
+        """
+        return {
+            "run_manager": self.run_manager.to_dict(),
+            "run_queue": list(self._run_queue),
+            # Builds can deactivate other vertices, e.g. the branches a router didn't take
+            "vertex_states": {vertex.id: vertex.state.name for vertex in self.vertices},
+        }
+
+    def restore_run(self, run_state: dict | None, vertex_checkpoints: dict[str, dict]) -> None:
+        """Restores the state saved by get_run_state and Vertex.get_checkpoint.
+
+        Args:
+            run_state: The scheduling state of the run, None if no vertex was built yet.
+            vertex_checkpoints: The build state of the built vertices by vertex ID.
+        """
+        for vertex_id, checkpoint in vertex_checkpoints.items():
+            vertex = self.vertex_map.get(vertex_id)
+            if vertex is not None:
+                vertex.restore_checkpoint(checkpoint)
+        if run_state is None:
+            return
+        self.run_manager = RunnableVerticesManager.from_dict(run_state["run_manager"])
+        self._run_queue = deque(run_state["run_queue"])
+        for vertex_id, state in run_state["vertex_states"].items():
+            vertex = self.vertex_map.get(vertex_id)
+            if vertex is not None:
+                vertex.state = VertexStates[state]
+
     def step(
         self,
         inputs: InputValueRequest | None = None,
@@ -1454,6 +1543,8 @@ class Graph:
                     fallback_to_env_vars=fallback_to_env_vars,
                     files=files,
                     event_manager=event_manager,
+                    get_cache=get_cache,
+                    set_cache=set_cache,
                 )
                 if set_cache is not None:
                     vertex_dict = {
@@ -1519,37 +1610,107 @@ class Graph:
         fallback_to_env_vars: bool,
         start_component_id: str | None = None,
         event_manager: EventManager | None = None,
+        scheduler: Literal["layered", "ready_queue"] | None = None,
+        max_concurrency: int | None = None,
     ) -> Graph:
-        """Processes the graph with vertices in each layer run in parallel."""
+        """Processes the graph, building vertices concurrently.
+
+        Args:
+            fallback_to_env_vars (bool): Whether to fallback to environment variables.
+            start_component_id (str | None): The component to start the run from. Defaults to None.
+            event_manager (EventManager | None): The event manager for the graph.
+            scheduler (str | None): "layered" runs vertices layer by layer, "ready_queue" starts each vertex as
+                soon as its predecessors are fulfilled. Defaults to the `graph_scheduler` setting.
+            max_concurrency (int | None): Maximum number of vertices built at the same time.
+                Defaults to the `graph_max_concurrency` setting (no limit when unset).
+
+        Returns:
+            Graph: The processed graph.
+        """
+        settings = get_settings_service().settings
+        scheduler = scheduler or settings.graph_scheduler
+        if max_concurrency is None:
+            max_concurrency = settings.graph_max_concurrency
+        if max_concurrency is not None and max_concurrency < 1:
+            msg = f"max_concurrency must be a positive integer, got {max_concurrency}"
+            raise ValueError(msg)
+
         first_layer = self.sort_vertices(start_component_id=start_component_id)
-        vertex_task_run_count: dict[str, int] = {}
-        to_process = deque(first_layer)
-        layer_index = 0
-        chat_service = get_chat_service()
         self.set_run_id()
         self.set_run_name()
         await self.initialize_run()
+        run_scheduler = self._process_ready_queue if scheduler == "ready_queue" else self._process_layers
+        await run_scheduler(
+            first_layer,
+            fallback_to_env_vars=fallback_to_env_vars,
+            event_manager=event_manager,
+            max_concurrency=max_concurrency,
+        )
+
+        logger.debug("Graph processing complete")
+        return self
+
+    def _create_build_task(
+        self,
+        vertex_id: str,
+        vertex_task_run_count: dict[str, int],
+        *,
+        fallback_to_env_vars: bool,
+        event_manager: EventManager | None,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> asyncio.Task:
+        chat_service = get_chat_service()
+        vertex = self.get_vertex(vertex_id)
+        coro = self.build_vertex(
+            vertex_id=vertex_id,
+            user_id=self.user_id,
+            inputs_dict={},
+            fallback_to_env_vars=fallback_to_env_vars,
+            get_cache=chat_service.get_cache,
+            set_cache=chat_service.set_cache,
+            event_manager=event_manager,
+        )
+        if semaphore is not None:
+            coro = self._run_with_semaphore(coro, semaphore)
+        task = asyncio.create_task(
+            coro,
+            name=f"{vertex.display_name} Run {vertex_task_run_count.get(vertex_id, 0)}",
+        )
+        vertex_task_run_count[vertex_id] = vertex_task_run_count.get(vertex_id, 0) + 1
+        return task
+
+    @staticmethod
+    async def _run_with_semaphore(coro, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            return await coro
+
+    async def _process_layers(
+        self,
+        first_layer: list[str],
+        *,
+        fallback_to_env_vars: bool,
+        event_manager: EventManager | None,
+        max_concurrency: int | None,
+    ) -> None:
+        """Runs the vertices of each layer in parallel, waiting for the whole layer before the next one."""
+        vertex_task_run_count: dict[str, int] = {}
+        to_process = deque(first_layer)
+        layer_index = 0
         lock = asyncio.Lock()
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
         while to_process:
             current_batch = list(to_process)  # Copy current deque items to a list
             to_process.clear()  # Clear the deque for new items
-            tasks = []
-            for vertex_id in current_batch:
-                vertex = self.get_vertex(vertex_id)
-                task = asyncio.create_task(
-                    self.build_vertex(
-                        vertex_id=vertex_id,
-                        user_id=self.user_id,
-                        inputs_dict={},
-                        fallback_to_env_vars=fallback_to_env_vars,
-                        get_cache=chat_service.get_cache,
-                        set_cache=chat_service.set_cache,
-                        event_manager=event_manager,
-                    ),
-                    name=f"{vertex.display_name} Run {vertex_task_run_count.get(vertex_id, 0)}",
+            tasks = [
+                self._create_build_task(
+                    vertex_id,
+                    vertex_task_run_count,
+                    fallback_to_env_vars=fallback_to_env_vars,
+                    event_manager=event_manager,
+                    semaphore=semaphore,
                 )
-                tasks.append(task)
-                vertex_task_run_count[vertex_id] = vertex_task_run_count.get(vertex_id, 0) + 1
+                for vertex_id in current_batch
+            ]
 
             logger.debug(f"Running layer {layer_index} with {len(tasks)} tasks, {current_batch}")
             try:
@@ -1562,8 +1723,63 @@ class Graph:
             to_process.extend(next_runnable_vertices)
             layer_index += 1
 
-        logger.debug("Graph processing complete")
-        return self
+    async def _process_ready_queue(
+        self,
+        first_layer: list[str],
+        *,
+        fallback_to_env_vars: bool,
+        event_manager: EventManager | None,
+        max_concurrency: int | None,
+    ) -> None:
+        """Starts each vertex as soon as its predecessors are fulfilled.
+
+        Vertices wait in a ready queue until a concurrency slot is free. Whenever a build finishes, its
+        successors are resolved through the run manager and queued right away, so a slow vertex only delays
+        the vertices that depend on it instead of everything in the same layer.
+        """
+        vertex_task_run_count: dict[str, int] = {}
+        ready: deque[str] = deque(first_layer)
+        scheduled: set[str] = set(first_layer)
+        in_flight: dict[asyncio.Task, str] = {}
+        lock = asyncio.Lock()
+        try:
+            while ready or in_flight:
+                while ready and (max_concurrency is None or len(in_flight) < max_concurrency):
+                    vertex_id = ready.popleft()
+                    task = self._create_build_task(
+                        vertex_id,
+                        vertex_task_run_count,
+                        fallback_to_env_vars=fallback_to_env_vars,
+                        event_manager=event_manager,
+                    )
+                    in_flight[task] = vertex_id
+                logger.debug(f"Running {len(in_flight)} vertices, {len(ready)} waiting in the ready queue")
+
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    vertex_id = in_flight.pop(task)
+                    scheduled.discard(vertex_id)
+                    if (exc := task.exception()) is not None:
+                        logger.error(f"Task {task.get_name()} failed with exception: {exc}")
+                        raise exc
+                    result = task.result()
+                    if not isinstance(result, VertexBuildResult):
+                        msg = f"Invalid result from task {task.get_name()}: {result}"
+                        raise TypeError(msg)
+                    vertex = result.vertex
+                    logger.debug(f"Vertex {vertex.id}, result: {vertex.built_result}, object: {vertex.built_object}")
+                    # get_next_runnable_vertices also removes the vertex from the runnables
+                    next_runnable_vertices = await self.get_next_runnable_vertices(lock, vertex=vertex, cache=False)
+                    for next_v_id in next_runnable_vertices:
+                        if next_v_id not in scheduled:
+                            scheduled.add(next_v_id)
+                            ready.append(next_v_id)
+        except BaseException:
+            # Cancel the remaining builds so they don't outlive the failed run
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+            raise
 
     def find_next_runnable_vertices(self, vertex_successors_ids: list[str]) -> list[str]:
         next_runnable_vertices = set()
@@ -1588,8 +1804,7 @@ class Graph:
                 else:
                     self.run_manager.add_to_vertices_being_run(next_v_id)
             if cache and self.flow_id is not None:
-                set_cache_coro = partial(get_chat_service().set_cache, key=self.flow_id)
-                await set_cache_coro(data=self, lock=lock)
+                await get_chat_service().set_vertex_checkpoint(self.flow_id, self, v_id, lock=lock)
         return next_runnable_vertices
 
     async def _execute_tasks(self, tasks: list[asyncio.Task], lock: asyncio.Lock) -> list[str]:
@@ -16,6 +16,7 @@ from loguru import logger
 from langflow.exceptions.component import ComponentBuildError
 from langflow.graph.schema import INPUT_COMPONENTS, OUTPUT_COMPONENTS, InterfaceComponentTypes, ResultData
 from langflow.graph.utils import UnbuiltObject, UnbuiltResult, log_transaction
+from langflow.graph.vertex.result_cache import get_cached_result, make_cache_entry, result_cache_key
 from langflow.interface import initialize
 from langflow.interface.listing import lazy_load_dict
 from langflow.schema.artifact import ArtifactType
@@ -35,6 +36,7 @@ if TYPE_CHECKING:
     from langflow.graph.edge.base import CycleEdge, Edge
     from langflow.graph.graph.base import Graph
     from langflow.graph.vertex.schema import NodeData
+    from langflow.services.chat.schema import GetCache, SetCache
     from langflow.services.tracing.schema import Log
 
 
@@ -103,6 +105,9 @@ class Vertex:
             self.is_interface_component = False
 
         self.use_result = False
+        # Content address of the result, set when the vertex is cacheable
+        self.result_hash: str | None = None
+        self.used_cached_result = False
         self.build_times: list[float] = []
         self.state = VertexStates.ACTIVE
         self.log_transaction_tasks: set[asyncio.Task] = set()
@@ -223,6 +228,37 @@ class Vertex:
         self.built_object = state.get("built_object") or UnbuiltObject()
         self.built_result = state.get("built_result") or UnbuiltResult()
 
+    # Attributes a build changes, enough to restore a built vertex onto an unbuilt copy of the graph
+    CHECKPOINT_ATTRIBUTES = (
+        "built",
+        "built_object",
+        "built_result",
+        "artifacts",
+        "artifacts_raw",
+        "artifacts_type",
+        "results",
+        "result",
+        "outputs_logs",
+        "logs",
+        "use_result",
+        "build_times",
+    )
+
+    def get_checkpoint(self) -> dict[str, Any]:
+        """Returns the build state of the vertex, without the graph it belongs to."""
+        state = {name: getattr(self, name) for name in self.CHECKPOINT_ATTRIBUTES}
+        state["built_object"] = None if isinstance(self.built_object, UnbuiltObject) else self.built_object
+        state["built_result"] = None if isinstance(self.built_result, UnbuiltResult) else self.built_result
+        return state
+
+    def restore_checkpoint(self, state: dict[str, Any]) -> None:
+        """Restores the build state returned by get_checkpoint."""
+        for name in self.CHECKPOINT_ATTRIBUTES:
+            if name in state:
+                setattr(self, name, state[name])
+        self.built_object = state.get("built_object") or UnbuiltObject()
+        self.built_result = state.get("built_result") or UnbuiltResult()
+
     def set_top_level(self, top_level_vertices: list[str]) -> None:
         self.parent_is_top_level = self.parent_node_id in top_level_vertices
 
@@ -497,8 +533,13 @@ class Vertex:
         fallback_to_env_vars,
         user_id=None,
         event_manager: EventManager | None = None,
+        get_cache: GetCache | None = None,
+        set_cache: SetCache | None = None,
     ) -> None:
-        """Initiate the build process."""
+        """Initiate the build process.
+
+        Results of cacheable components are looked up with get_cache and stored with set_cache.
+        """
         logger.debug(f"Building {self.display_name}")
         await self._build_each_vertex_in_params_dict()
 
@@ -516,6 +557,19 @@ class Vertex:
                 self.custom_component.set_event_manager(event_manager)
             custom_params = initialize.loading.get_params(self.params)
 
+        if get_cache is not None:
+            self.result_hash = await result_cache_key(
+                self, custom_component, user_id, fallback_to_env_vars=fallback_to_env_vars
+            )
+            if self.result_hash is not None:
+                state = get_cached_result(await get_cache(key=self.result_hash))
+                if state is not None:
+                    self.custom_component = custom_component
+                    self.restore_checkpoint(state)
+                    self.used_cached_result = True
+                    self.built = True
+                    return
+
         await self._build_results(
             custom_component=custom_component,
             custom_params=custom_params,
@@ -527,6 +581,11 @@ class Vertex:
 
         self.built = True
 
+        if self.result_hash is not None and set_cache is not None:
+            entry = make_cache_entry(self)
+            if entry is not None:
+                await set_cache(key=self.result_hash, data=entry)
+
     def extract_messages_from_artifacts(self, artifacts: dict[str, Any]) -> list[dict]:
         """Extracts messages from the artifacts.
 
@@ -581,6 +640,7 @@ class Vertex:
             messages=messages,
             component_display_name=self.display_name,
             component_id=self.id,
+            used_cached_result=self.used_cached_result,
         )
         self.set_result(result_dict)
 
@@ -805,6 +865,8 @@ class Vertex:
 
     def _reset(self) -> None:
         self.built = False
+        self.result_hash = None
+        self.used_cached_result = False
         self.built_object = UnbuiltObject()
         self.built_result = UnbuiltResult()
         self.artifacts = {}
@@ -0,0 +1,179 @@
+"""Content-addressed cache of the results of cacheable components across runs.
+
+A vertex result is keyed by a hash of the component code, its resolved parameters and the result
+hashes of the vertices it depends on. Parameter values are fingerprinted by content, global variables
+by their value; a value that can't be fingerprinted makes the vertex uncacheable for that build rather
+than risking a wrong hit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import inspect
+import json
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+from loguru import logger
+from pydantic import BaseModel
+
+from langflow.interface.initialize.loading import update_params_with_load_from_db_fields
+from langflow.schema.data import Data
+from langflow.schema.message import Message
+from langflow.services.cache.utils import CacheMiss, estimate_size
+from langflow.services.deps import get_settings_service
+
+if TYPE_CHECKING:
+    from langflow.graph.vertex.base import Vertex
+
+RESULT_CACHE_PREFIX = "vertex_result"
+# Attributes of the vertex checkpoint that don't depend on the inputs
+_UNCACHED_ATTRIBUTES = ("built", "result", "build_times")
+
+
+class Unfingerprintable(Exception):  # noqa: N818
+    """Raised for values whose content can't be hashed reliably."""
+
+
+def _fingerprint(value: Any) -> Any:
+    """Converts a value to a JSON-serializable structure that changes when its content changes."""
+    if value is None or isinstance(value, bool | int | float):
+        return value
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bytes):
+        return ["bytes", hashlib.sha256(value).hexdigest()]
+    if isinstance(value, list | tuple):
+        return [_fingerprint(item) for item in value]
+    if isinstance(value, set | frozenset):
+        return sorted((_fingerprint(item) for item in value), key=json.dumps)
+    if isinstance(value, dict):
+        return sorted(([str(key), _fingerprint(item)] for key, item in value.items()), key=lambda pair: pair[0])
+    if isinstance(value, Message):
+        # Messages get a new ID and timestamp every run, only their content matters
+        return ["message", _fingerprint(value.text), _fingerprint(value.files)]
+    if isinstance(value, Data):
+        return ["data", _fingerprint(value.data)]
+    if isinstance(value, pd.DataFrame):
+        try:
+            hashed = pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes()
+        except TypeError as exc:
+            # Cells holding lists or dicts can't be hashed
+            raise Unfingerprintable(type(value).__name__) from exc
+        return ["dataframe", [str(column) for column in value.columns], hashlib.sha256(hashed).hexdigest()]
+    if hasattr(value, "page_content") and hasattr(value, "metadata"):
+        # LangChain documents
+        return ["document", value.page_content, _fingerprint(value.metadata)]
+    if isinstance(value, BaseModel):
+        return [type(value).__qualname__, _fingerprint(value.model_dump())]
+    raise Unfingerprintable(type(value).__name__)
+
+
+def _fingerprint_file(value: Any) -> Any:
+    """Fingerprints the value of a file input, files may change under the same path."""
+    if isinstance(value, list | tuple):
+        return [_fingerprint_file(item) for item in value]
+    if isinstance(value, str) and Path(value).is_file():
+        stat = Path(value).stat()
+        return ["file", value, stat.st_mtime_ns, stat.st_size]
+    return _fingerprint(value)
+
+
+def _fingerprint_params(vertex: Vertex, params: dict[str, Any]) -> dict[str, Any]:
+    template = vertex.data["node"]["template"]
+    file_fields = {name for name, field in template.items() if isinstance(field, dict) and field.get("type") == "file"}
+    fingerprints = {}
+    for key, value in params.items():
+        raw = vertex.raw_params.get(key)
+        upstream = raw if isinstance(raw, list) else [raw]
+        hashes = [getattr(item, "result_hash", None) for item in upstream]
+        if upstream and all(hashes):
+            # The result of a cached vertex is identified by its own key
+            fingerprints[key] = ["vertex", hashes]
+            continue
+        try:
+            fingerprints[key] = _fingerprint_file(value) if key in file_fields else _fingerprint(value)
+        except Unfingerprintable as exc:
+            msg = f"parameter {key} is a {exc}"
+            raise Unfingerprintable(msg) from exc
+    return fingerprints
+
+
+@lru_cache(maxsize=512)
+def _class_source(cls: type) -> str | None:
+    try:
+        return inspect.getsource(cls)
+    except (OSError, TypeError):
+        return None
+
+
+async def result_cache_key(
+    vertex: Vertex, custom_component: Any, user_id: str | None, *, fallback_to_env_vars: bool = False
+) -> str | None:
+    """Returns the content address of the result of a vertex, or None if it must not be cached.
+
+    Args:
+        vertex: The vertex about to be built, with its parameters resolved.
+        custom_component: The component instance of the vertex.
+        user_id: The user building the vertex, global variables differ between users.
+        fallback_to_env_vars: Whether global variables that aren't found are read from the environment.
+    """
+    settings = get_settings_service().settings
+    if not settings.vertex_result_cache or not getattr(custom_component, "cacheable", False):
+        return None
+    code = getattr(custom_component, "_code", None) or _class_source(type(custom_component))
+    if code is None:
+        return None
+
+    params = dict(vertex.params)
+    if vertex.load_from_db_fields:
+        # The parameters hold the names of global variables, the component reads their values
+        try:
+            params = await update_params_with_load_from_db_fields(
+                custom_component, params, vertex.load_from_db_fields, fallback_to_env_vars=fallback_to_env_vars
+            )
+        except ValueError as exc:
+            logger.debug(f"Not caching the result of {vertex.id}, a global variable can't be read: {exc}")
+            return None
+    try:
+        # Files are checked on disk and tables hashed, away from the event loop
+        fingerprints = await asyncio.to_thread(_fingerprint_params, vertex, params)
+    except Unfingerprintable as exc:
+        logger.debug(f"Not caching the result of {vertex.id}, {exc}")
+        return None
+
+    content = {
+        "code": code,
+        "vertex_type": vertex.vertex_type,
+        "outputs": sorted({edge.source_handle.name for edge in vertex.outgoing_edges}),
+        "user_id": str(user_id) if user_id else None,
+        "params": fingerprints,
+    }
+    digest = hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{RESULT_CACHE_PREFIX}:{digest}"
+
+
+def get_cached_result(cached: Any) -> dict | None:
+    """Returns the build state of a cache entry, or None if there is none or it is too old."""
+    if isinstance(cached, CacheMiss) or not isinstance(cached, dict):
+        return None
+    entry = cached.get("result")
+    if not isinstance(entry, dict) or "state" not in entry:
+        return None
+    if time.time() - entry["time"] > get_settings_service().settings.vertex_result_cache_ttl:
+        return None
+    return entry["state"]
+
+
+def make_cache_entry(vertex: Vertex) -> dict | None:
+    """Returns the cache entry of a built vertex, or None if its result is too large to cache."""
+    state = {key: value for key, value in vertex.get_checkpoint().items() if key not in _UNCACHED_ATTRIBUTES}
+    max_size = get_settings_service().settings.vertex_result_cache_max_entry_size_mb * 1024 * 1024
+    if max_size and estimate_size(state) > max_size:
+        logger.debug(f"Not caching the result of {vertex.id}, it is larger than {max_size} bytes")
+        return None
+    return {"state": state, "time": time.time()}
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+import orjson
+
+from langflow.graph.graph.base import Graph
+from langflow.processing.process import process_tweaks
+
+if TYPE_CHECKING:
+    from langflow.schema.graph import Tweaks
+    from langflow.services.database.models.flow import Flow
+
+DEFAULT_PREPARED_GRAPH_CACHE_SIZE = 128
+
+PreparedGraphKey = tuple[str, str, str, bool]
+
+
+class PreparedGraphCache:
+    """An LRU cache of graph templates used by the run and webhook endpoints.
+
+    A template is built once per flow version and tweaks combination. Every run gets a clone
+    of it (see `Graph.clone`), which reuses the processed payload, the cycle detection and the
+    adjacency maps instead of rebuilding them from the flow data.
+
+    Attributes:
+        max_size (int): Maximum number of templates to keep.
+        hits (int): Number of runs served from a cached template.
+        misses (int): Number of runs that had to build a template.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_PREPARED_GRAPH_CACHE_SIZE) -> None:
+        self._templates: OrderedDict[PreparedGraphKey, Graph] = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def hash_tweaks(tweaks: Tweaks | dict[str, Any] | None) -> str:
+        if tweaks is not None and not isinstance(tweaks, dict):
+            tweaks = tweaks.model_dump()
+        serialized = orjson.dumps(tweaks or {}, option=orjson.OPT_SORT_KEYS, default=str)
+        return hashlib.sha256(serialized).hexdigest()
+
+    @classmethod
+    def make_key(cls, flow: Flow, tweaks: Tweaks | dict[str, Any] | None, *, stream: bool) -> PreparedGraphKey:
+        version = flow.updated_at.isoformat() if flow.updated_at else ""
+        return str(flow.id), version, cls.hash_tweaks(tweaks), stream
+
+    def get_graph(
+        self,
+        flow: Flow,
+        tweaks: Tweaks | dict[str, Any] | None = None,
+        *,
+        stream: bool = False,
+        user_id: str | None = None,
+    ) -> Graph:
+        """Return a graph ready to run for `flow` with `tweaks` applied.
+
+        Args:
+            flow: The flow to run. Its `updated_at` is part of the key, so a saved flow never
+                reuses a template built from an older version.
+            tweaks: The tweaks of the request.
+            stream: Whether the run streams its outputs.
+            user_id: The user running the flow.
+
+        Returns:
+            Graph: A fresh graph that can be run and mutated freely.
+
+        Raises:
+            ValueError: If the flow has no data.
+        """
+        if flow.data is None:
+            msg = f"Flow {flow.id} has no data"
+            raise ValueError(msg)
+        key = self.make_key(flow, tweaks, stream=stream)
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if template is None:
+            # process_tweaks updates the nodes in place, so it must not touch the flow data
+            graph_data = process_tweaks(copy.deepcopy(flow.data), tweaks or {}, stream=stream)
+            template = Graph.from_payload(graph_data, flow_id=str(flow.id), user_id=user_id, flow_name=flow.name)
+            with self._lock:
+                self._templates[key] = template
+                while len(self._templates) > self.max_size:
+                    self._templates.popitem(last=False)
+        return template.clone(user_id=user_id)
+
+    def invalidate(self, flow_id: str | None = None) -> None:
+        """Remove the templates of `flow_id`, or every template if no flow is given."""
+        with self._lock:
+            if flow_id is None:
+                self._templates.clear()
+                return
+            for key in [key for key in self._templates if key[0] == str(flow_id)]:
+                del self._templates[key]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._templates),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+
+prepared_graph_cache = PreparedGraphCache()
@@ -134,6 +134,30 @@ class AsyncBaseCacheService(Service, Generic[AsyncLockType]):
             lock: A lock to use for the operation.
         """
 
+    async def get_many(self, keys) -> list:
+        """Retrieve several items from the cache.
+
+        Caches that can fetch several items in one round trip override this.
+
+        Args:
+            keys: The keys of the items to retrieve.
+
+        Returns:
+            The values in the order of the keys, CACHE_MISS for the keys that are not found.
+        """
+        return [await self.get(key) for key in keys]
+
+    async def set_many(self, items: dict) -> None:
+        """Add several items to the cache.
+
+        Caches that can store several items in one round trip override this.
+
+        Args:
+            items: The values to cache by key.
+        """
+        for key, value in items.items():
+            await self.set(key, value)
+
     @abc.abstractmethod
     async def upsert(self, key, value, lock: AsyncLockType | None = None):
         """Add an item to the cache if it doesn't exist, or update it if it does.
@@ -1,4 +1,7 @@
 import asyncio
+import contextlib
+import hashlib
+import json
 import pickle
 import time
 from typing import Generic
@@ -9,36 +12,133 @@ from loguru import logger
 from langflow.services.cache.base import AsyncBaseCacheService, AsyncLockType
 from langflow.services.cache.utils import CACHE_MISS
 
+# Bump when the layout of the stored entries changes, older entries are then ignored and pruned
+ENTRY_FORMAT = 2
+# Key under which the namespaces writing to the directory are kept, with the time they were last active
+_NAMESPACES_KEY = "__langflow_cache_namespaces__"
+# Pending deletion in the write buffer
+_DELETED = object()
+
 
 class AsyncDiskCache(AsyncBaseCacheService, Generic[AsyncLockType]):
-    def __init__(self, cache_dir, max_size=None, expiration_time=3600) -> None:
-        self.cache = Cache(cache_dir)
-        # Let's clear the cache for now to maintain a similar
-        # behavior as the in-memory cache
-        # Later we should implement endpoints for the frontend to grab
-        # output logs from the cache
-        if len(self.cache) > 0:
-            self.cache.clear()
+    """A diskcache-based cache that can survive restarts.
+
+    By default the cache directory is cleared on startup, like the in-memory caches. In persistent
+    mode the entries are kept, so a restarted or newly deployed worker starts warm. Every entry is
+    tagged with a namespace made of the Langflow version and a hash of the entry format and
+    serializer. Entries of another namespace are never returned, and they are deleted by a
+    background task once no worker has used their namespace for a while. The task also removes
+    expired entries and culls the cache to its size limit.
+
+    Writes are buffered and stored in batches, one transaction per batch, off the event loop.
+    Reads see the buffered writes.
+
+    Attributes:
+        expiration_time (int): Time in seconds after which a cached item expires. Default is 1 hour.
+        persistent (bool): Whether entries are kept across restarts.
+        namespace (str): The Langflow version and schema hash the entries are tagged with.
+    """
+
+    def __init__(
+        self,
+        cache_dir,
+        max_size=None,
+        expiration_time=3600,
+        *,
+        persistent: bool = False,
+        max_bytes: int | None = None,
+        serializer=pickle,
+        prune_interval: float = 300.0,
+        write_batch_size: int = 64,
+        write_delay: float = 0.05,
+        version: str | None = None,
+    ) -> None:
+        """Initialize a new AsyncDiskCache instance.
+
+        Args:
+            cache_dir: Directory of the cache database.
+            max_size (int, optional): Number of items above which the cache is culled on write.
+            expiration_time (int, optional): Time in seconds after which a cached item expires.
+            persistent (bool, optional): Keep the entries of previous runs instead of clearing them.
+            max_bytes (int, optional): Size of the cache directory above which entries are evicted,
+                oldest first. Defaults to the diskcache limit of 1 GB.
+            serializer (optional): Object with dumps and loads functions converting values to and
+                from bytes, such as the pickle module.
+            prune_interval (float, optional): Time in seconds between two removals of the expired
+                and outdated entries.
+            write_batch_size (int, optional): Number of buffered writes that triggers a flush.
+            write_delay (float, optional): Longest time in seconds a write stays buffered, 0 to
+                write immediately.
+            version (str, optional): The Langflow version, detected by default.
+        """
+        settings = {"size_limit": max_bytes} if max_bytes else {}
+        self.cache = Cache(cache_dir, **settings)
         self.lock = asyncio.Lock()
         self.max_size = max_size
         self.expiration_time = expiration_time
+        self.persistent = persistent
+        self.serializer = serializer
+        self.prune_interval = prune_interval
+        self.write_batch_size = write_batch_size
+        self.write_delay = write_delay
+        if version is None:
+            from langflow.utils.version import get_version_info
+
+            version = get_version_info()["version"]
+        self.namespace = f"{version}:{self.schema_hash(serializer)}"
+
+        if not persistent:
+            # Maintain a similar behavior as the in-memory cache
+            if len(self.cache) > 0:
+                self.cache.clear()
+        else:
+            # Outdated entries are pruned in the background rather than blocking startup
+            self.cache.create_tag_index()
+            self._heartbeat()
+            logger.debug(f"Disk cache resumed with {len(self.cache) - 1} entries in {self.cache.directory}")
+
+        # key -> serialized value or _DELETED, in write order
+        self._pending: dict = {}
+        # The batch being written, still visible to reads until it is on disk
+        self._writing: dict = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self._pruner: asyncio.Task | None = None
+
+    @staticmethod
+    def schema_hash(serializer) -> str:
+        """Return a hash of the entry format and serializer, entries written with another one are unreadable."""
+        name = getattr(serializer, "__qualname__", None) or getattr(serializer, "__name__", None)
+        module = getattr(serializer, "__module__", None) or ""
+        schema = json.dumps({"format": ENTRY_FORMAT, "serializer": f"{module}:{name or type(serializer).__qualname__}"})
+        return hashlib.sha256(schema.encode()).hexdigest()[:16]
 
     async def get(self, key, lock: asyncio.Lock | None = None):
         if not lock:
             async with self.lock:
-                return await asyncio.to_thread(self._get, key)
+                return await self._get(key)
         else:
-            return await asyncio.to_thread(self._get, key)
-
-    def _get(self, key):
-        item = self.cache.get(key, default=None)
-        if item:
-            if time.time() - item["time"] < self.expiration_time:
-                self.cache.touch(key)  # Refresh the expiry time
-                return pickle.loads(item["value"]) if isinstance(item["value"], bytes) else item["value"]
-            logger.info(f"Cache item for key '{key}' has expired and will be deleted.")
-            self.cache.delete(key)  # Log before deleting the expired item
-        return CACHE_MISS
+            return await self._get(key)
+
+    def _buffered(self, key):
+        pending = self._pending.get(key, CACHE_MISS)
+        return self._writing.get(key, CACHE_MISS) if pending is CACHE_MISS else pending
+
+    async def _get(self, key):
+        pending = self._buffered(key)
+        if pending is _DELETED:
+            return CACHE_MISS
+        if pending is not CACHE_MISS:
+            return self.serializer.loads(pending)
+        self._ensure_pruner()
+        return await asyncio.to_thread(self._read, key)
+
+    def _read(self, key):
+        payload, tag = self.cache.get(key, default=None, tag=True)
+        if payload is None or tag != self.namespace:
+            # Missing, expired, or written by another version
+            return CACHE_MISS
+        return self.serializer.loads(payload)
 
     async def set(self, key, value, lock: asyncio.Lock | None = None) -> None:
         if not lock:
@@ -48,10 +148,58 @@ class AsyncDiskCache(AsyncBaseCacheService, Generic[AsyncLockType]):
             await self._set(key, value)
 
     async def _set(self, key, value) -> None:
+        # Serialized right away, later changes to the value must not leak into the cache
+        await self._buffer(key, self.serializer.dumps(value))
+
+    async def set_many(self, items: dict) -> None:
+        """Add several items to the cache, they are written in the same batch when it isn't full.
+
+        Args:
+            items: The values to cache by key.
+        """
+        async with self.lock:
+            for key, value in items.items():
+                await self._set(key, value)
+
+    async def _buffer(self, key, payload) -> None:
+        self._pending.pop(key, None)
+        self._pending[key] = payload
+        self._ensure_pruner()
+        if self.write_delay <= 0 or len(self._pending) >= self.write_batch_size:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        # Writes buffered while a batch is on its way to disk don't start a task of their own
+        while self._pending:
+            await asyncio.sleep(self.write_delay)
+            try:
+                await self.flush()
+            except Exception:  # noqa: BLE001
+                logger.exception("Error writing to the disk cache")
+                return
+
+    async def flush(self) -> None:
+        """Write the buffered writes to disk in one transaction."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            self._writing, self._pending = self._pending, {}
+            try:
+                await asyncio.to_thread(self._write, self._writing)
+            finally:
+                self._writing = {}
+
+    def _write(self, batch: dict) -> None:
         if self.max_size and len(self.cache) >= self.max_size:
-            await asyncio.to_thread(self.cache.cull)
-        item = {"value": pickle.dumps(value) if not isinstance(value, str | bytes) else value, "time": time.time()}
-        await asyncio.to_thread(self.cache.set, key, item)
+            self.cache.cull()
+        with self.cache.transact():
+            for key, payload in batch.items():
+                if payload is _DELETED:
+                    self.cache.delete(key)
+                else:
+                    self.cache.set(key, payload, expire=self.expiration_time, tag=self.namespace)
 
     async def delete(self, key, lock: asyncio.Lock | None = None) -> None:
         if not lock:
@@ -61,7 +209,7 @@ class AsyncDiskCache(AsyncBaseCacheService, Generic[AsyncLockType]):
             await self._delete(key)
 
     async def _delete(self, key) -> None:
-        await asyncio.to_thread(self.cache.delete, key)
+        await self._buffer(key, _DELETED)
 
     async def clear(self, lock: asyncio.Lock | None = None) -> None:
         if not lock:
@@ -71,7 +219,11 @@ class AsyncDiskCache(AsyncBaseCacheService, Generic[AsyncLockType]):
             await self._clear()
 
     async def _clear(self) -> None:
-        await asyncio.to_thread(self.cache.clear)
+        async with self._flush_lock:
+            self._pending = {}
+            await asyncio.to_thread(self.cache.clear)
+            if self.persistent:
+                await asyncio.to_thread(self._heartbeat)
 
     async def upsert(self, key, value, lock: asyncio.Lock | None = None) -> None:
         if not lock:
@@ -81,15 +233,74 @@ class AsyncDiskCache(AsyncBaseCacheService, Generic[AsyncLockType]):
             await self._upsert(key, value)
 
     async def _upsert(self, key, value) -> None:
-        existing_value = await asyncio.to_thread(self._get, key)
+        existing_value = await self._get(key)
         if existing_value is not CACHE_MISS and isinstance(existing_value, dict) and isinstance(value, dict):
             existing_value.update(value)
             value = existing_value
-        await self.set(key, value)
+        await self._set(key, value)
 
     async def contains(self, key) -> bool:
-        return await asyncio.to_thread(self.cache.__contains__, key)
+        pending = self._buffered(key)
+        if pending is not CACHE_MISS:
+            return pending is not _DELETED
+        return await asyncio.to_thread(self._read, key) is not CACHE_MISS
+
+    def _ensure_pruner(self) -> None:
+        # Started on first use, the cache may be created before the event loop runs
+        if self.persistent and self.prune_interval > 0 and (self._pruner is None or self._pruner.done()):
+            self._pruner = asyncio.create_task(self._prune_periodically())
+
+    async def _prune_periodically(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.prune)
+            except Exception:  # noqa: BLE001
+                logger.exception("Error pruning the disk cache")
+            await asyncio.sleep(self.prune_interval)
+
+    def _heartbeat(self) -> dict:
+        # Workers of several versions share the directory during a rolling restart
+        with self.cache.transact():
+            namespaces = dict(self.cache.get(_NAMESPACES_KEY, default={}))
+            namespaces[self.namespace] = time.time()
+            self.cache.set(_NAMESPACES_KEY, namespaces)
+        return namespaces
+
+    def prune(self) -> int:
+        """Remove the entries of inactive namespaces, then the expired ones, then cull to the size limit.
+
+        A namespace is inactive when no worker using it has pruned for three prune intervals.
+
+        Returns:
+            The number of entries removed.
+        """
+        removed = 0
+        namespaces = self._heartbeat()
+        stale = [ns for ns, seen in namespaces.items() if time.time() - seen > 3 * self.prune_interval]
+        for namespace in stale:
+            removed += self.cache.evict(namespace)
+        if stale:
+            with self.cache.transact():
+                namespaces = dict(self.cache.get(_NAMESPACES_KEY, default={}))
+                for namespace in stale:
+                    namespaces.pop(namespace, None)
+                self.cache.set(_NAMESPACES_KEY, namespaces)
+        # cull also removes the expired entries
+        removed += self.cache.cull()
+        if removed:
+            logger.debug(f"Pruned {removed} entries from the disk cache")
+        return removed
 
     async def teardown(self) -> None:
-        # Clean up the cache directory
-        self.cache.clear(retry=True)
+        for task in (self._pruner, self._flush_task):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        if self.persistent:
+            await self.flush()
+            await asyncio.to_thread(self.cache.close)
+        else:
+            # Clean up the cache directory
+            self._pending = {}
+            await asyncio.to_thread(self.cache.clear, retry=True)
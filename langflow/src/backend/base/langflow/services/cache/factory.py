@@ -30,6 +30,10 @@ class CacheServiceFactory(ServiceFactory):
                 db=settings_service.settings.redis_db,
                 url=settings_service.settings.redis_url,
                 expiration_time=settings_service.settings.redis_cache_expire,
+                compression=settings_service.settings.redis_compression,
+                compression_threshold=settings_service.settings.redis_compression_threshold,
+                near_cache_size=settings_service.settings.redis_near_cache_size,
+                near_cache_ttl=settings_service.settings.redis_near_cache_ttl,
             )
             if redis_cache.is_connected():
                 logger.debug("Redis cache is connected")
@@ -41,10 +45,18 @@ class CacheServiceFactory(ServiceFactory):
         if settings_service.settings.cache_type == "memory":
             return ThreadingInMemoryCache(expiration_time=settings_service.settings.cache_expire)
         if settings_service.settings.cache_type == "async":
-            return AsyncInMemoryCache(expiration_time=settings_service.settings.cache_expire)
+            return AsyncInMemoryCache(
+                expiration_time=settings_service.settings.cache_expire,
+                max_bytes=settings_service.settings.cache_max_size_mb * 1024 * 1024 or None,
+                num_shards=settings_service.settings.cache_shards,
+                sweep_interval=settings_service.settings.cache_sweep_interval,
+            )
         if settings_service.settings.cache_type == "disk":
             return AsyncDiskCache(
                 cache_dir=settings_service.settings.config_dir,
                 expiration_time=settings_service.settings.cache_expire,
+                persistent=settings_service.settings.cache_disk_persistent,
+                max_bytes=settings_service.settings.cache_max_size_mb * 1024 * 1024 or None,
+                prune_interval=settings_service.settings.cache_disk_prune_interval,
             )
         return None
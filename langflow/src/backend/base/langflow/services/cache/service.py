@@ -1,7 +1,10 @@
 import asyncio
+import contextlib
+import json
 import pickle
 import threading
 import time
+import uuid
 from collections import OrderedDict
 from typing import Generic, Union
 
@@ -9,7 +12,7 @@ from loguru import logger
 from typing_extensions import override
 
 from langflow.services.cache.base import AsyncBaseCacheService, AsyncLockType, CacheService, LockType
-from langflow.services.cache.utils import CACHE_MISS
+from langflow.services.cache.utils import CACHE_MISS, estimate_size
 
 
 class ThreadingInMemoryCache(CacheService, Generic[LockType]):
@@ -168,13 +171,29 @@ class ThreadingInMemoryCache(CacheService, Generic[LockType]):
         return f"InMemoryCache(max_size={self.max_size}, expiration_time={self.expiration_time})"
 
 
+_RAW = b"\x00"
+_ZSTD = b"\x01"
+_LZ4 = b"\x02"
+
+
 class RedisCache(AsyncBaseCacheService, Generic[LockType]):
     """A Redis-based cache implementation.
 
-    This cache supports setting an expiration time for cached items.
+    This cache supports setting an expiration time for cached items. Values are serialized with a
+    pluggable serializer, pickle by default, and compressed with zstd or lz4 when they are larger
+    than a threshold. Several keys can be read or written in one round trip with get_many and
+    set_many.
+
+    An optional near-cache keeps the most recently used payloads in process memory. Writes publish
+    the changed keys on a Redis channel, and every instance drops its local copies of them, so
+    reads served locally are at most near_cache_ttl seconds stale even if a message is lost.
 
     Attributes:
         expiration_time (int, optional): Time in seconds after which a cached item expires. Default is 1 hour.
+        compression (str, optional): "zstd", "lz4" or None for no compression.
+        compression_threshold (int): Size in bytes above which serialized values are compressed.
+        near_cache_size (int): Number of payloads kept in process memory, 0 to disable the near-cache.
+        near_cache_ttl (float): Time in seconds a payload is served from process memory.
 
     Example:
         cache = RedisCache(expiration_time=5)
@@ -189,7 +208,21 @@ class RedisCache(AsyncBaseCacheService, Generic[LockType]):
         b = cache["b"]
     """
 
-    def __init__(self, host="localhost", port=6379, db=0, url=None, expiration_time=60 * 60) -> None:
+    invalidation_channel = "langflow:cache:invalidate"
+
+    def __init__(
+        self,
+        host="localhost",
+        port=6379,
+        db=0,
+        url=None,
+        expiration_time=60 * 60,
+        serializer=pickle,
+        compression: str | None = None,
+        compression_threshold: int = 1024,
+        near_cache_size: int = 0,
+        near_cache_ttl: float = 30.0,
+    ) -> None:
         """Initialize a new RedisCache instance.
 
         Args:
@@ -199,6 +232,12 @@ class RedisCache(AsyncBaseCacheService, Generic[LockType]):
             url (str, optional): Redis URL.
             expiration_time (int, optional): Time in seconds after which a
                 cached item expires. Default is 1 hour.
+            serializer (optional): Object with dumps and loads functions converting values to and
+                from bytes, such as the pickle module.
+            compression (str, optional): "zstd" or "lz4" to compress large values.
+            compression_threshold (int, optional): Size in bytes above which values are compressed.
+            near_cache_size (int, optional): Number of payloads kept in process memory, 0 to disable.
+            near_cache_ttl (float, optional): Time in seconds a payload is served from process memory.
         """
         try:
             from redis.asyncio import StrictRedis
@@ -217,6 +256,49 @@ class RedisCache(AsyncBaseCacheService, Generic[LockType]):
         else:
             self._client = StrictRedis(host=host, port=port, db=db)
         self.expiration_time = expiration_time
+        self.serializer = serializer
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self._compress, self._decompressors = self._load_codecs(compression)
+        self.near_cache_size = near_cache_size
+        self.near_cache_ttl = near_cache_ttl
+        # key -> (payload as stored in Redis, expiry time), least recently used first
+        self._near_cache: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        # Bumped on every invalidation, a read that raced with one doesn't fill the near-cache
+        self._generation = 0
+        self._instance_id = uuid.uuid4().hex
+        self._listener: asyncio.Task | None = None
+        self._listener_lock = asyncio.Lock()
+        self.near_hits = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _load_codecs(compression: str | None):
+        # Values written with either codec stay readable when the setting changes
+        codecs = {}
+        with contextlib.suppress(ImportError):
+            import zstandard
+
+            compressor = zstandard.ZstdCompressor(level=3)
+            codecs["zstd"] = (_ZSTD, compressor.compress, zstandard.ZstdDecompressor().decompress)
+        with contextlib.suppress(ImportError):
+            import lz4.frame
+
+            codecs["lz4"] = (_LZ4, lz4.frame.compress, lz4.frame.decompress)
+        decompressors = {header: decompress for header, _, decompress in codecs.values()}
+
+        if compression is None:
+            return None, decompressors
+        if compression not in {"zstd", "lz4"}:
+            msg = f"Unknown RedisCache compression {compression!r}, expected 'zstd', 'lz4' or None."
+            raise ValueError(msg)
+        if compression not in codecs:
+            package = "zstandard" if compression == "zstd" else "lz4"
+            msg = f"RedisCache {compression} compression requires the {package} package: pip install {package}"
+            raise ImportError(msg)
+        header, compress, _ = codecs[compression]
+        return lambda data: header + compress(data), decompressors
 
     # check connection
     def is_connected(self) -> bool:
@@ -230,24 +312,156 @@ class RedisCache(AsyncBaseCacheService, Generic[LockType]):
             return False
         return True
 
+    def _dumps(self, value) -> bytes:
+        try:
+            data = self.serializer.dumps(value)
+        except (TypeError, AttributeError, pickle.PicklingError) as exc:
+            msg = "RedisCache only accepts values that can be serialized. "
+            raise TypeError(msg) from exc
+        if self._compress is not None and len(data) > self.compression_threshold:
+            return self._compress(data)
+        return _RAW + data
+
+    def _loads(self, payload: bytes):
+        header, data = payload[:1], payload[1:]
+        if header == _RAW:
+            return self.serializer.loads(data)
+        if header in (_ZSTD, _LZ4):
+            decompress = self._decompressors.get(header)
+            if decompress is None:
+                msg = "RedisCache found a compressed value but the package to decompress it is not installed."
+                raise ImportError(msg)
+            return self.serializer.loads(decompress(data))
+        # Written before values had a header
+        return self.serializer.loads(payload)
+
+    async def _ensure_listener(self) -> bool:
+        # The near-cache may only be used while invalidations are received
+        if self.near_cache_size <= 0:
+            return False
+        if self._listener is not None and not self._listener.done():
+            return True
+        async with self._listener_lock:
+            if self._listener is None or self._listener.done():
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(self.invalidation_channel)
+                self._near_cache.clear()
+                self._listener = asyncio.create_task(self._listen(pubsub))
+        return True
+
+    async def _listen(self, pubsub) -> None:
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    self._invalidate(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001
+            logger.exception("RedisCache stopped receiving invalidations, the near-cache is dropped")
+        finally:
+            self._near_cache.clear()
+            with contextlib.suppress(Exception):
+                await pubsub.aclose()
+
+    def _invalidate(self, data: bytes) -> None:
+        sender, keys = json.loads(data)
+        if sender == self._instance_id:
+            return
+        self._generation += 1
+        if keys is None:
+            self._near_cache.clear()
+        else:
+            for key in keys:
+                self._near_cache.pop(key, None)
+
+    def _near_get(self, key: str) -> bytes | None:
+        entry = self._near_cache.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._near_cache[key]
+            return None
+        self._near_cache.move_to_end(key)
+        return entry[0]
+
+    def _near_put(self, key: str, payload: bytes) -> None:
+        self._near_cache[key] = (payload, time.monotonic() + self.near_cache_ttl)
+        self._near_cache.move_to_end(key)
+        while len(self._near_cache) > self.near_cache_size:
+            self._near_cache.popitem(last=False)
+
+    def _publish(self, pipeline, keys: list[str] | None) -> None:
+        pipeline.publish(self.invalidation_channel, json.dumps([self._instance_id, keys]))
+
     @override
     async def get(self, key, lock=None):
         if key is None:
             return CACHE_MISS
-        value = await self._client.get(str(key))
-        return pickle.loads(value) if value else CACHE_MISS
+        return (await self.get_many([key]))[0]
+
+    async def get_many(self, keys) -> list:
+        """Retrieve several items from the cache in one round trip.
+
+        Args:
+            keys: The keys of the items to retrieve.
+
+        Returns:
+            The values in the order of the keys, CACHE_MISS for the keys that are not found.
+        """
+        keys = [None if key is None else str(key) for key in keys]
+        results = [CACHE_MISS] * len(keys)
+        near_cache = await self._ensure_listener()
+        missing = []
+        for i, key in enumerate(keys):
+            if key is None:
+                continue
+            payload = self._near_get(key) if near_cache else None
+            if payload is None:
+                missing.append(i)
+            else:
+                self.near_hits += 1
+                results[i] = self._loads(payload)
+        if not missing:
+            return results
+
+        generation = self._generation
+        payloads = await self._client.mget([keys[i] for i in missing])
+        for i, payload in zip(missing, payloads, strict=True):
+            if not payload:
+                self.misses += 1
+                continue
+            self.hits += 1
+            results[i] = self._loads(payload)
+            if near_cache and generation == self._generation:
+                self._near_put(keys[i], payload)
+        return results
 
     @override
     async def set(self, key, value, lock=None) -> None:
-        try:
-            if pickled := pickle.dumps(value):
-                result = await self._client.setex(str(key), self.expiration_time, pickled)
-                if not result:
-                    msg = "RedisCache could not set the value."
-                    raise ValueError(msg)
-        except TypeError as exc:
-            msg = "RedisCache only accepts values that can be pickled. "
-            raise TypeError(msg) from exc
+        await self.set_many({key: value})
+
+    async def set_many(self, items: dict) -> None:
+        """Add several items to the cache in one round trip.
+
+        Args:
+            items: The values to cache by key.
+        """
+        payloads = {str(key): self._dumps(value) for key, value in items.items()}
+        if not payloads:
+            return
+        near_cache = await self._ensure_listener()
+        async with self._client.pipeline(transaction=False) as pipeline:
+            for key, payload in payloads.items():
+                pipeline.set(key, payload, ex=self.expiration_time)
+            if near_cache:
+                self._publish(pipeline, list(payloads))
+            results = await pipeline.execute()
+        if not all(results[: len(payloads)]):
+            msg = "RedisCache could not set the value."
+            raise ValueError(msg)
+        if near_cache:
+            for key, payload in payloads.items():
+                self._near_put(key, payload)
 
     @override
     async def upsert(self, key, value, lock=None) -> None:
@@ -271,78 +485,199 @@ class RedisCache(AsyncBaseCacheService, Generic[LockType]):
 
     @override
     async def delete(self, key, lock=None) -> None:
-        await self._client.delete(key)
+        key = str(key)
+        self._near_cache.pop(key, None)
+        if not await self._ensure_listener():
+            await self._client.delete(key)
+            return
+        async with self._client.pipeline(transaction=False) as pipeline:
+            pipeline.delete(key)
+            self._publish(pipeline, [key])
+            await pipeline.execute()
 
     @override
     async def clear(self, lock=None) -> None:
         """Clear all items from the cache."""
-        await self._client.flushdb()
+        self._near_cache.clear()
+        if not await self._ensure_listener():
+            await self._client.flushdb()
+            return
+        async with self._client.pipeline(transaction=False) as pipeline:
+            pipeline.flushdb()
+            self._publish(pipeline, None)
+            await pipeline.execute()
 
     async def contains(self, key) -> bool:
         """Check if the key is in the cache."""
         if key is None:
             return False
+        if self._near_get(str(key)) is not None:
+            return True
         return bool(await self._client.exists(str(key)))
 
+    def stats(self) -> dict:
+        """Return the near-cache hits and the Redis hits and misses."""
+        return {
+            "near_hits": self.near_hits,
+            "hits": self.hits,
+            "misses": self.misses,
+            "near_cache_items": len(self._near_cache),
+        }
+
+    async def teardown(self) -> None:
+        """Stop receiving invalidations and close the connection."""
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+        await self._client.aclose()
+
     def __repr__(self) -> str:
         """Return a string representation of the RedisCache instance."""
-        return f"RedisCache(expiration_time={self.expiration_time})"
+        return (
+            f"RedisCache(expiration_time={self.expiration_time}, compression={self.compression}, "
+            f"near_cache_size={self.near_cache_size})"
+        )
 
 
-class AsyncInMemoryCache(AsyncBaseCacheService, Generic[AsyncLockType]):
-    def __init__(self, max_size=None, expiration_time=3600) -> None:
-        self.cache: OrderedDict = OrderedDict()
+class _CacheShard:
+    """One shard of AsyncInMemoryCache: an LRU ordered dict, its lock and its resident bytes."""
 
+    __slots__ = ("cache", "lock", "resident_bytes")
+
+    def __init__(self) -> None:
+        self.cache: OrderedDict = OrderedDict()
         self.lock = asyncio.Lock()
+        self.resident_bytes = 0
+
+
+class AsyncInMemoryCache(AsyncBaseCacheService, Generic[AsyncLockType]):
+    """An asyncio in-memory cache split into shards with their own locks.
+
+    Keys are spread over the shards by hash, so concurrent operations on different keys rarely
+    wait for each other. Each shard evicts its least recently used items to stay within its share
+    of the byte budget, using estimated object sizes, and of the item count. A background task
+    removes expired items periodically so that they don't stay resident until they are read.
+
+    Attributes:
+        max_size (int, optional): Maximum number of items to store in the cache.
+        max_bytes (int, optional): Maximum estimated size of the cached items in bytes.
+        expiration_time (int): Time in seconds after which a cached item expires. Default is 1 hour.
+        num_shards (int): Number of shards.
+        sweep_interval (float): Time in seconds between two removals of the expired items.
+    """
+
+    def __init__(
+        self,
+        max_size=None,
+        expiration_time=3600,
+        max_bytes: int | None = None,
+        num_shards: int = 16,
+        sweep_interval: float = 60.0,
+    ) -> None:
         self.max_size = max_size
+        self.max_bytes = max_bytes
         self.expiration_time = expiration_time
+        self.num_shards = num_shards
+        self.sweep_interval = sweep_interval
+        self._shards = [_CacheShard() for _ in range(num_shards)]
+        # Budgets per shard, keys are spread evenly
+        self._shard_max_size = -(-max_size // num_shards) if max_size else None
+        self._shard_max_bytes = max_bytes // num_shards if max_bytes else None
+        self._sweeper: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _shard(self, key) -> _CacheShard:
+        return self._shards[hash(key) % self.num_shards]
+
+    def _ensure_sweeper(self) -> None:
+        # Started on first use, the cache may be created before the event loop runs
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_periodically())
+
+    async def _sweep_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.remove_expired()
+            except Exception:  # noqa: BLE001
+                logger.exception("Error removing expired cache items")
+
+    async def remove_expired(self) -> int:
+        """Remove the expired items from every shard.
+
+        Returns:
+            The number of items removed.
+        """
+        removed = 0
+        for shard in self._shards:
+            async with shard.lock:
+                now = time.time()
+                expired = [key for key, item in shard.cache.items() if now - item["time"] >= self.expiration_time]
+                for key in expired:
+                    self._remove(shard, key)
+                removed += len(expired)
+        self.expirations += removed
+        return removed
 
     async def get(self, key, lock: asyncio.Lock | None = None):
-        async with lock or self.lock:
-            return await self._get(key)
+        shard = self._shard(key)
+        async with lock or shard.lock:
+            return self._get(shard, key)
 
-    async def _get(self, key):
-        item = self.cache.get(key, None)
+    def _get(self, shard: _CacheShard, key):
+        item = shard.cache.get(key, None)
         if item:
             if time.time() - item["time"] < self.expiration_time:
-                self.cache.move_to_end(key)
+                shard.cache.move_to_end(key)
+                self.hits += 1
                 return pickle.loads(item["value"]) if isinstance(item["value"], bytes) else item["value"]
             logger.info(f"Cache item for key '{key}' has expired and will be deleted.")
-            await self._delete(key)  # Log before deleting the expired item
+            self._remove(shard, key)
+            self.expirations += 1
+        self.misses += 1
         return CACHE_MISS
 
     async def set(self, key, value, lock: asyncio.Lock | None = None) -> None:
-        async with lock or self.lock:
-            await self._set(
-                key,
-                value,
-            )
-
-    async def _set(self, key, value) -> None:
-        if self.max_size and len(self.cache) >= self.max_size:
-            self.cache.popitem(last=False)
-        self.cache[key] = {"value": value, "time": time.time()}
-        self.cache.move_to_end(key)
+        self._ensure_sweeper()
+        shard = self._shard(key)
+        size = estimate_size(value) if self._shard_max_bytes else 0
+        async with lock or shard.lock:
+            self._set(shard, key, value, size)
+
+    def _set(self, shard: _CacheShard, key, value, size: int) -> None:
+        self._remove(shard, key)
+        shard.cache[key] = {"value": value, "time": time.time(), "size": size}
+        shard.resident_bytes += size
+        # Evict least recently used items, never the one just set
+        while len(shard.cache) > 1 and (
+            (self._shard_max_size and len(shard.cache) > self._shard_max_size)
+            or (self._shard_max_bytes and shard.resident_bytes > self._shard_max_bytes)
+        ):
+            self._remove(shard, next(iter(shard.cache)))
+            self.evictions += 1
+
+    def _remove(self, shard: _CacheShard, key) -> None:
+        item = shard.cache.pop(key, None)
+        if item is not None:
+            shard.resident_bytes -= item["size"]
 
     async def delete(self, key, lock: asyncio.Lock | None = None) -> None:
-        async with lock or self.lock:
-            await self._delete(key)
-
-    async def _delete(self, key) -> None:
-        if key in self.cache:
-            del self.cache[key]
+        shard = self._shard(key)
+        async with lock or shard.lock:
+            self._remove(shard, key)
 
     async def clear(self, lock: asyncio.Lock | None = None) -> None:
-        async with lock or self.lock:
-            await self._clear()
-
-    async def _clear(self) -> None:
-        self.cache.clear()
+        for shard in self._shards:
+            async with lock or shard.lock:
+                shard.cache.clear()
+                shard.resident_bytes = 0
 
     async def upsert(self, key, value, lock: asyncio.Lock | None = None) -> None:
-        await self._upsert(key, value, lock)
-
-    async def _upsert(self, key, value, lock: asyncio.Lock | None = None) -> None:
         existing_value = await self.get(key, lock)
         if existing_value is not None and isinstance(existing_value, dict) and isinstance(value, dict):
             existing_value.update(value)
@@ -350,4 +685,34 @@ class AsyncInMemoryCache(AsyncBaseCacheService, Generic[AsyncLockType]):
         await self.set(key, value, lock)
 
     async def contains(self, key) -> bool:
-        return key in self.cache
+        return key in self._shard(key).cache
+
+    def stats(self) -> dict:
+        """Return the hit, miss, eviction and expiration counts and the resident items and bytes."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "items": len(self),
+            "resident_bytes": sum(shard.resident_bytes for shard in self._shards),
+            "max_bytes": self.max_bytes,
+        }
+
+    def __len__(self) -> int:
+        """Return the number of items in the cache."""
+        return sum(len(shard.cache) for shard in self._shards)
+
+    async def teardown(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sweeper
+            self._sweeper = None
+
+    def __repr__(self) -> str:
+        """Return a string representation of the AsyncInMemoryCache instance."""
+        return (
+            f"AsyncInMemoryCache(max_size={self.max_size}, max_bytes={self.max_bytes}, "
+            f"expiration_time={self.expiration_time}, num_shards={self.num_shards})"
+        )
@@ -1,8 +1,11 @@
 import base64
 import contextlib
 import hashlib
+import sys
 import tempfile
+from collections import deque
 from pathlib import Path
+from types import FunctionType, MethodType, ModuleType
 from typing import TYPE_CHECKING, Any
 
 from fastapi import UploadFile
@@ -166,4 +169,42 @@ def update_build_status(cache_service, flow_id: str, status: "BuildStatus") -> N
     cache_service[flow_id] = cached_flow
 
 
+def estimate_size(obj: Any, max_objects: int = 100_000) -> int:
+    """Estimate the memory used by an object and the objects it references, in bytes.
+
+    Containers and instance attributes are followed, each object is counted once. Classes, modules
+    and functions are shared with the rest of the process and are not counted.
+
+    Args:
+        obj: The object to measure.
+        max_objects: Maximum number of objects visited, larger object graphs are underestimated.
+
+    Returns:
+        The estimated size in bytes.
+    """
+    size = 0
+    seen: set[int] = set()
+    stack = [obj]
+    while stack and len(seen) < max_objects:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, type | ModuleType | FunctionType | MethodType):
+            continue
+        seen.add(id(current))
+        try:
+            size += sys.getsizeof(current)
+        except TypeError:
+            continue
+
+        if isinstance(current, str | bytes | bytearray | int | float | bool | None):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, list | tuple | set | frozenset | deque):
+            stack.extend(current)
+        elif hasattr(current, "__dict__"):
+            stack.append(vars(current))
+    return size
+
+
 CACHE_MISS = CacheMiss()
@@ -1,12 +1,27 @@
+from __future__ import annotations
+
 import asyncio
+import weakref
 from collections import defaultdict
 from threading import RLock
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from langflow.services.base import Service
 from langflow.services.cache.base import AsyncBaseCacheService, CacheService
+from langflow.services.cache.utils import CacheMiss
 from langflow.services.deps import get_cache_service
 
+if TYPE_CHECKING:
+    from langflow.graph.graph.base import Graph
+
+
+def _graph_run_id(data: Any) -> str | None:
+    # Only graphs have a run ID, the property raises until it is set
+    try:
+        return data.run_id
+    except (AttributeError, ValueError):
+        return None
+
 
 class ChatService(Service):
     """Service class for managing chat-related operations."""
@@ -17,6 +32,12 @@ class ChatService(Service):
         self.async_cache_locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
         self._sync_cache_locks: dict[str, RLock] = defaultdict(RLock)
         self.cache_service: CacheService | AsyncBaseCacheService = get_cache_service()
+        # Run ID of the last whole graph cached under each key, checkpoints of that run only hold what changed
+        self._graph_runs: dict[str, str] = {}
+        # Checkpoint keys of that run, deleted once another run is cached under the key
+        self._checkpoint_keys: dict[str, set[str]] = defaultdict(set)
+        # Last graph cached under each key, in-memory caches return it as is
+        self._cached_graphs: weakref.WeakValueDictionary[str, Graph] = weakref.WeakValueDictionary()
 
     async def set_cache(self, key: str, data: Any, lock: asyncio.Lock | None = None) -> bool:
         """Set the cache for a client.
@@ -33,6 +54,12 @@ class ChatService(Service):
             "result": data,
             "type": type(data),
         }
+        run_id = _graph_run_id(data)
+        if self._graph_runs.pop(str(key), None) != run_id:
+            await self._delete_checkpoints(str(key))
+        if run_id:
+            self._graph_runs[str(key)] = run_id
+            self._cached_graphs[str(key)] = data
         if isinstance(self.cache_service, AsyncBaseCacheService):
             await self.cache_service.upsert(str(key), result_dict, lock=lock or self.async_cache_locks[key])
             return await self.cache_service.contains(key)
@@ -62,6 +89,96 @@ class ChatService(Service):
             key (str): The cache key.
             lock (Optional[asyncio.Lock], optional): The lock to use for the cache operation. Defaults to None.
         """
+        self._graph_runs.pop(str(key), None)
+        self._cached_graphs.pop(str(key), None)
+        await self._delete_checkpoints(str(key))
         if isinstance(self.cache_service, AsyncBaseCacheService):
             return await self.cache_service.delete(key, lock=lock or self.async_cache_locks[key])
         return await asyncio.to_thread(self.cache_service.delete, key, lock=lock or self._sync_cache_locks[key])
+
+    @staticmethod
+    def _checkpoint_key(key: str, run_id: str, name: str) -> str:
+        return f"{key}:checkpoint:{run_id}:{name}"
+
+    async def _delete_checkpoints(self, key: str) -> None:
+        # Checkpoints are never read once their run is replaced, in-memory caches would keep them forever
+        for item_key in self._checkpoint_keys.pop(key, ()):
+            if isinstance(self.cache_service, AsyncBaseCacheService):
+                await self.cache_service.delete(item_key)
+            else:
+                await asyncio.to_thread(self.cache_service.delete, item_key, lock=self._sync_cache_locks[item_key])
+            self._sync_cache_locks.pop(item_key, None)
+
+    async def set_vertex_checkpoint(
+        self, key: str, graph: Graph, vertex_id: str, lock: asyncio.Lock | None = None
+    ) -> None:
+        """Cache the state of a run after a vertex was built.
+
+        Only the build state of the vertex and the scheduling state of the run are written, in one
+        batch, instead of the whole graph with the results of every built vertex. The whole graph is
+        written instead when none of this run was cached under the key by this process.
+
+        Args:
+            key (str): The cache key of the graph.
+            graph (Graph): The graph being run.
+            vertex_id (str): The ID of the vertex that was built.
+            lock (Optional[asyncio.Lock], optional): The lock to use for the cache operation. Defaults to None.
+        """
+        key = str(key)
+        run_id = _graph_run_id(graph)
+        if not run_id or self._graph_runs.get(key) != run_id:
+            await self.set_cache(key, graph, lock=lock)
+            return
+
+        items = {
+            self._checkpoint_key(key, run_id, f"vertex:{vertex_id}"): graph.get_vertex(vertex_id).get_checkpoint(),
+            self._checkpoint_key(key, run_id, "run_state"): graph.get_run_state(),
+        }
+        self._checkpoint_keys[key].update(items)
+        if isinstance(self.cache_service, AsyncBaseCacheService):
+            await self.cache_service.set_many(items)
+            return
+        for item_key, value in items.items():
+            await asyncio.to_thread(self.cache_service.set, item_key, value, lock=self._sync_cache_locks[item_key])
+
+    async def get_graph(self, key: str, lock: asyncio.Lock | None = None) -> Graph | CacheMiss:
+        """Get a cached graph with the vertices built so far in its run.
+
+        Args:
+            key (str): The cache key of the graph.
+            lock (Optional[asyncio.Lock], optional): The lock to use for the cache operation. Defaults to None.
+
+        Returns:
+            Graph | CacheMiss: The graph, or a cache miss if it isn't cached.
+        """
+        key = str(key)
+        cached = await self.get_cache(key, lock=lock)
+        if isinstance(cached, CacheMiss):
+            return cached
+        graph = cached["result"]
+        run_id = _graph_run_id(graph)
+        if not run_id or graph is self._cached_graphs.get(key):
+            # Without a run there are no checkpoints, and the live graph already holds its run
+            return graph
+
+        vertex_ids = list(graph.vertex_map)
+        keys = [self._checkpoint_key(key, run_id, f"vertex:{vertex_id}") for vertex_id in vertex_ids]
+        keys.append(self._checkpoint_key(key, run_id, "run_state"))
+        if isinstance(self.cache_service, AsyncBaseCacheService):
+            values = await self.cache_service.get_many(keys)
+        else:
+            values = [await asyncio.to_thread(self.cache_service.get, item_key) for item_key in keys]
+
+        # Checkpoints written by another process are deleted with the run too
+        self._checkpoint_keys[key].update(
+            item_key for item_key, value in zip(keys, values, strict=True) if not isinstance(value, CacheMiss)
+        )
+        run_state = None if isinstance(values[-1], CacheMiss) else values[-1]
+        checkpoints = {
+            vertex_id: value
+            for vertex_id, value in zip(vertex_ids, values[:-1], strict=True)
+            if not isinstance(value, CacheMiss)
+        }
+        graph.restore_run(run_state, checkpoints)
+        self._graph_runs[key] = run_id
+        return graph
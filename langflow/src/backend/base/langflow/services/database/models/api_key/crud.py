@@ -1,17 +1,22 @@
 import asyncio
 import datetime
+import hashlib
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from typing import TYPE_CHECKING
 from uuid import UUID
 
+from loguru import logger
 from sqlalchemy.orm import selectinload
-from sqlmodel import select
+from sqlmodel import select, update
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from langflow.services.database.models import User
 from langflow.services.database.models.api_key import ApiKey, ApiKeyCreate, ApiKeyRead, UnmaskedApiKeyRead
 from langflow.services.database.utils import session_getter
-from langflow.services.deps import get_db_service
+from langflow.services.deps import get_db_service, get_settings_service
 
 if TYPE_CHECKING:
     from sqlmodel.sql.expression import SelectOfScalar
@@ -49,31 +54,141 @@ async def delete_api_key(session: AsyncSession, api_key_id: UUID) -> None:
         raise ValueError(msg)
     await session.delete(api_key)
     await session.commit()
-
-
-update_total_uses_tasks: set[asyncio.Task] = set()
+    api_key_cache.invalidate(api_key_id=api_key_id)
+
+
+DEFAULT_API_KEY_CACHE_SIZE = 1024
+
+
+class ApiKeyCache:
+    """An LRU cache of validated API keys and the ids of the users they belong to.
+
+    Keys are stored hashed. Only ids are kept, the user is loaded again by primary key in the session
+    of each request, so no ORM instance is shared between requests. Entries are dropped right away
+    when the key or its user is deleted in this process, and expire after `api_key_cache_ttl`
+    seconds, which bounds how long a deletion made in another worker takes to apply.
+
+    Attributes:
+        max_size (int): Maximum number of keys to keep.
+        hits (int): Number of checks served from the cache.
+        misses (int): Number of checks that had to query the database.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_API_KEY_CACHE_SIZE) -> None:
+        self._entries: OrderedDict[str, tuple[UUID, UUID, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def hash_key(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+    def get(self, api_key: str, ttl: float) -> tuple[UUID, UUID] | None:
+        """Return the id and user id of `api_key` if it was validated less than `ttl` seconds ago."""
+        key = self.hash_key(api_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[2] >= ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def set(self, api_key: str, api_key_id: UUID, user_id: UUID) -> None:
+        key = self.hash_key(api_key)
+        with self._lock:
+            self._entries[key] = (api_key_id, user_id, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *, api_key_id: UUID | None = None, user_id: UUID | None = None) -> None:
+        """Remove the entries of `api_key_id` or of the keys of `user_id`, or every entry if neither is given."""
+        with self._lock:
+            if api_key_id is None and user_id is None:
+                self._entries.clear()
+                return
+            for key, (entry_key_id, entry_user_id, _) in list(self._entries.items()):
+                if entry_key_id == api_key_id or entry_user_id == user_id:
+                    del self._entries[key]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ApiKeyUsageCounter:
+    """Aggregates API key uses in memory and writes them to the database in batches.
+
+    The first use after a flush schedules the next one `api_key_usage_flush_interval` seconds
+    later, so a busy key costs one update per interval instead of one transaction per request.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[UUID, tuple[int, datetime.datetime]] = {}
+        self._flush_task: asyncio.Task | None = None
+
+    def record(self, api_key_id: UUID, flush_interval: float) -> None:
+        uses, _ = self._pending.get(api_key_id, (0, None))
+        self._pending[api_key_id] = (uses + 1, datetime.datetime.now(datetime.timezone.utc))
+        loop = asyncio.get_running_loop()
+        if self._flush_task is None or self._flush_task.done() or self._flush_task.get_loop() is not loop:
+            self._flush_task = loop.create_task(self._flush_later(flush_interval))
+
+    async def _flush_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write the aggregated uses to the database in a single transaction."""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            async with session_getter(get_db_service()) as session:
+                for api_key_id, (uses, last_used_at) in pending.items():
+                    stmt = (
+                        update(ApiKey)
+                        .where(ApiKey.id == api_key_id)
+                        .values(total_uses=ApiKey.total_uses + uses, last_used_at=last_used_at)
+                    )
+                    await session.exec(stmt)
+                await session.commit()
+        except Exception:  # noqa: BLE001
+            logger.exception(f"Error updating the usage of {len(pending)} API keys")
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+api_key_cache = ApiKeyCache()
+api_key_usage = ApiKeyUsageCounter()
 
 
 async def check_key(session: AsyncSession, api_key: str) -> User | None:
     """Check if the API key is valid."""
-    query: SelectOfScalar = select(ApiKey).options(selectinload(ApiKey.user)).where(ApiKey.api_key == api_key)
-    api_key_object: ApiKey | None = (await session.exec(query)).first()
-    if api_key_object is not None:
-        task = asyncio.create_task(update_total_uses(api_key_object.id))
-        task.add_done_callback(update_total_uses_tasks.discard)
-        update_total_uses_tasks.add(task)
-        return api_key_object.user
-    return None
-
-
-async def update_total_uses(api_key_id: UUID):
-    """Update the total uses and last used at."""
-    async with session_getter(get_db_service()) as session:
-        new_api_key = await session.get(ApiKey, api_key_id)
-        if new_api_key is None:
-            msg = "API Key not found"
-            raise ValueError(msg)
-        new_api_key.total_uses += 1
-        new_api_key.last_used_at = datetime.datetime.now(datetime.timezone.utc)
-        session.add(new_api_key)
-        await session.commit()
+    settings = get_settings_service().settings
+    ttl = settings.api_key_cache_ttl
+    user: User | None = None
+    if ttl > 0 and (cached := api_key_cache.get(api_key, ttl)) is not None:
+        api_key_id, user_id = cached
+        user = await session.get(User, user_id)
+        if user is None:
+            api_key_cache.invalidate(user_id=user_id)
+    if user is None:
+        query: SelectOfScalar = select(ApiKey).options(selectinload(ApiKey.user)).where(ApiKey.api_key == api_key)
+        api_key_object: ApiKey | None = (await session.exec(query)).first()
+        if api_key_object is None or api_key_object.user is None:
+            return None
+        api_key_id, user = api_key_object.id, api_key_object.user
+        if ttl > 0:
+            api_key_cache.set(api_key, api_key_id, user.id)
+    api_key_usage.record(api_key_id, settings.api_key_usage_flush_interval)
+    return user
@@ -1,7 +1,7 @@
 from uuid import UUID
 
 from loguru import logger
-from sqlmodel import col, delete, select
+from sqlmodel import col, delete, func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from langflow.services.database.models.transactions.model import (
@@ -74,6 +74,60 @@ async def log_transaction(db: AsyncSession, transaction: TransactionBase) -> Tra
     return table
 
 
+async def log_transactions(db: AsyncSession, transactions: list[TransactionBase]) -> list[TransactionTable]:
+    """Insert several transactions in a single transaction.
+
+    Unlike `log_transaction`, this does not enforce `max_transactions_to_keep`. Call
+    `trim_transactions` periodically to remove the oldest transactions of each flow.
+
+    Args:
+        db: Database session
+        transactions: Transaction data to log. Entries without a flow_id are skipped.
+
+    Returns:
+        The created TransactionTable entries
+    """
+    tables = [TransactionTable(**transaction.model_dump()) for transaction in transactions if transaction.flow_id]
+    try:
+        db.add_all(tables)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return tables
+
+
+async def trim_transactions(
+    db: AsyncSession, *, flow_ids: set[UUID] | None = None, max_transactions_to_keep: int | None = None
+) -> None:
+    """Delete the oldest transactions of each flow over `max_transactions_to_keep` in a single statement.
+
+    Args:
+        db: Database session
+        flow_ids: Only trim the transactions of these flows. If None, all flows are trimmed.
+        max_transactions_to_keep: Maximum number of transactions to keep per flow. If None, uses system settings.
+    """
+    max_entries = max_transactions_to_keep or get_settings_service().settings.max_transactions_to_keep
+    ranked = select(
+        TransactionTable.id,
+        func.row_number()
+        .over(partition_by=TransactionTable.flow_id, order_by=col(TransactionTable.timestamp).desc())
+        .label("position"),
+    )
+    if flow_ids is not None:
+        ranked = ranked.where(col(TransactionTable.flow_id).in_(flow_ids))
+    ranked_subq = ranked.subquery()
+    delete_older = delete(TransactionTable).where(
+        col(TransactionTable.id).in_(select(ranked_subq.c.id).where(ranked_subq.c.position > max_entries))
+    )
+    try:
+        await db.exec(delete_older)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+
 def transform_transaction_table(
     transaction: list[TransactionTable] | TransactionTable,
 ) -> list[TransactionReadResponse]:
@@ -130,6 +130,87 @@ async def log_vertex_build(
     return table
 
 
+async def log_vertex_builds(db: AsyncSession, vertex_builds: list[VertexBuildBase]) -> list[VertexBuildTable]:
+    """Insert several vertex builds in a single transaction.
+
+    Unlike `log_vertex_build`, this does not enforce the build limits. Call `trim_vertex_builds`
+    periodically to remove the builds over the limits.
+
+    Args:
+        db (AsyncSession): The database session for executing queries.
+        vertex_builds (list[VertexBuildBase]): The vertex builds to insert.
+
+    Returns:
+        list[VertexBuildTable]: The newly created vertex build records.
+    """
+    tables = [VertexBuildTable(**vertex_build.model_dump()) for vertex_build in vertex_builds]
+    try:
+        db.add_all(tables)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return tables
+
+
+async def trim_vertex_builds(
+    db: AsyncSession,
+    *,
+    flow_ids: set[UUID] | None = None,
+    max_builds_to_keep: int | None = None,
+    max_builds_per_vertex: int | None = None,
+) -> None:
+    """Delete the vertex builds over the per-vertex and global limits in a single transaction.
+
+    Args:
+        db (AsyncSession): The database session for executing queries.
+        flow_ids (set[UUID] | None, optional): Only enforce the per-vertex limit on the vertices of
+            these flows. If None, all vertices are checked.
+        max_builds_to_keep (int | None, optional): Maximum number of builds to keep globally.
+            If None, uses system settings.
+        max_builds_per_vertex (int | None, optional): Maximum number of builds to keep per vertex.
+            If None, uses system settings.
+    """
+    settings = get_settings_service().settings
+    max_global = max_builds_to_keep or settings.max_vertex_builds_to_keep
+    max_per_vertex = max_builds_per_vertex or settings.max_vertex_builds_per_vertex
+
+    try:
+        # 1) Rank the builds of each vertex from newest to oldest and delete the ones past max_per_vertex
+        ranked = select(
+            VertexBuildTable.build_id,
+            func.row_number()
+            .over(
+                partition_by=(VertexBuildTable.flow_id, VertexBuildTable.id),
+                order_by=(col(VertexBuildTable.timestamp).desc(), col(VertexBuildTable.build_id).desc()),
+            )
+            .label("position"),
+        )
+        if flow_ids is not None:
+            ranked = ranked.where(col(VertexBuildTable.flow_id).in_(flow_ids))
+        ranked_subq = ranked.subquery()
+        delete_vertex_older = delete(VertexBuildTable).where(
+            col(VertexBuildTable.build_id).in_(
+                select(ranked_subq.c.build_id).where(ranked_subq.c.position > max_per_vertex)
+            )
+        )
+        await db.exec(delete_vertex_older)
+
+        # 2) Delete older builds globally, keeping newest max_global
+        keep_global_subq = (
+            select(VertexBuildTable.build_id)
+            .order_by(col(VertexBuildTable.timestamp).desc(), col(VertexBuildTable.build_id).desc())
+            .limit(max_global)
+        )
+        delete_global_older = delete(VertexBuildTable).where(col(VertexBuildTable.build_id).not_in(keep_global_subq))
+        await db.exec(delete_global_older)
+
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+
 async def delete_vertex_builds_by_flow_id(db: AsyncSession, flow_id: UUID) -> None:
     """Delete all vertex builds associated with a specific flow ID.
 
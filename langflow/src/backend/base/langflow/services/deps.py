@@ -16,6 +16,7 @@ if TYPE_CHECKING:
     from langflow.services.chat.service import ChatService
     from langflow.services.database.service import DatabaseService
     from langflow.services.job_queue.service import JobQueueService
+    from langflow.services.log_writer.service import LogWriterService
     from langflow.services.session.service import SessionService
     from langflow.services.settings.service import SettingsService
     from langflow.services.socket.service import SocketIOService
@@ -247,3 +248,14 @@ def get_queue_service() -> JobQueueService:
     from langflow.services.job_queue.factory import JobQueueServiceFactory
 
     return get_service(ServiceType.JOB_QUEUE_SERVICE, JobQueueServiceFactory())
+
+
+def get_log_writer_service() -> LogWriterService:
+    """Retrieves the LogWriterService instance from the service manager.
+
+    Returns:
+        LogWriterService: The LogWriterService instance.
+    """
+    from langflow.services.log_writer.factory import LogWriterServiceFactory
+
+    return get_service(ServiceType.LOG_WRITER_SERVICE, LogWriterServiceFactory())
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from langflow.services.base import Service
+from langflow.services.database.models.transactions.crud import log_transactions, trim_transactions
+from langflow.services.database.models.transactions.model import TransactionBase
+from langflow.services.database.models.vertex_builds.crud import log_vertex_builds, trim_vertex_builds
+from langflow.services.database.models.vertex_builds.model import VertexBuildBase
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from uuid import UUID
+
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from langflow.services.database.service import DatabaseService
+    from langflow.services.settings.service import SettingsService
+
+LogEntry = TransactionBase | VertexBuildBase
+
+
+class LogWriterService(Service):
+    """Write-behind writer for transaction and vertex build logs.
+
+    Logs are put on a bounded queue and written by a background worker, one multi-row insert per
+    batch. A batch is written when it reaches `log_writer_batch_size` logs or when its oldest log
+    has waited `log_writer_flush_interval` seconds. The history limits (`max_transactions_to_keep`,
+    `max_vertex_builds_to_keep` and `max_vertex_builds_per_vertex`) are enforced every
+    `log_writer_trim_interval` seconds, in one pass over the flows written since the last trim,
+    instead of on every insert.
+
+    When the queue is full, producers wait for room. The time spent waiting is reported by `stats`.
+    """
+
+    name = "log_writer_service"
+
+    def __init__(self, settings_service: SettingsService, database_service: DatabaseService) -> None:
+        self.settings_service = settings_service
+        self.database_service = database_service
+        settings = settings_service.settings
+        self.queue_size = settings.log_writer_queue_size
+        self.batch_size = settings.log_writer_batch_size
+        self.flush_interval = settings.log_writer_flush_interval
+        self.trim_interval = settings.log_writer_trim_interval
+
+        self._queue: asyncio.Queue[LogEntry] | None = None
+        self._flush_requested = asyncio.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._worker_task: asyncio.Task | None = None
+        self._stopping = False
+        self._last_trim = time.monotonic()
+        self._transaction_flows_to_trim: set[UUID] = set()
+        self._vertex_build_flows_to_trim: set[UUID] = set()
+
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.max_queue_depth = 0
+        self.backpressure_waits = 0
+        self.backpressure_wait_time = 0.0
+
+    async def add_transaction(self, transaction: TransactionBase) -> None:
+        """Queue a transaction to be written to the database."""
+        await self._put(transaction)
+
+    async def add_vertex_build(self, vertex_build: VertexBuildBase) -> None:
+        """Queue a vertex build to be written to the database."""
+        await self._put(vertex_build)
+
+    async def _put(self, entry: LogEntry) -> None:
+        if self._stopping:
+            # The worker is gone, write late logs right away
+            await self._write_batch([entry])
+            return
+        queue = self._ensure_started()
+        try:
+            queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.backpressure_waits += 1
+            start = time.perf_counter()
+            await queue.put(entry)
+            self.backpressure_wait_time += time.perf_counter() - start
+        self.enqueued += 1
+        self.max_queue_depth = max(self.max_queue_depth, queue.qsize())
+
+    def _ensure_started(self) -> asyncio.Queue[LogEntry]:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            if self._queue is not None and not self._queue.empty():
+                logger.warning(f"Dropping {self._queue.qsize()} logs queued on a closed event loop")
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._flush_requested = asyncio.Event()
+            self._loop = loop
+            self._worker_task = None
+        if self._worker_task is None or self._worker_task.done():
+            self._worker_task = loop.create_task(self._worker(self._queue))
+        return self._queue
+
+    async def _worker(self, queue: asyncio.Queue[LogEntry]) -> None:
+        while True:
+            batch = await self._next_batch(queue)
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+            if time.monotonic() - self._last_trim >= self.trim_interval:
+                await self.trim()
+
+    async def _next_batch(self, queue: asyncio.Queue[LogEntry]) -> list[LogEntry]:
+        """Wait for a log, then collect more until the batch is full, the interval elapses or a flush is requested."""
+        loop = asyncio.get_running_loop()
+        batch = [await queue.get()]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0 or self._flush_requested.is_set():
+                break
+            getter = asyncio.ensure_future(queue.get())
+            flush_waiter = asyncio.ensure_future(self._flush_requested.wait())
+            await asyncio.wait({getter, flush_waiter}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            flush_waiter.cancel()
+            # cancel() returns False when the getter already has a log, which must not be lost
+            if not getter.cancel():
+                batch.append(getter.result())
+            else:
+                break
+        return batch
+
+    async def _write_batch(self, batch: list[LogEntry]) -> None:
+        transactions = [entry for entry in batch if isinstance(entry, TransactionBase)]
+        vertex_builds = [entry for entry in batch if isinstance(entry, VertexBuildBase)]
+        if transactions:
+            await self._insert(log_transactions, transactions)
+            self._transaction_flows_to_trim.update(transaction.flow_id for transaction in transactions)
+        if vertex_builds:
+            await self._insert(log_vertex_builds, vertex_builds)
+            self._vertex_build_flows_to_trim.update(vertex_build.flow_id for vertex_build in vertex_builds)
+
+    async def _insert(self, insert: Callable[[AsyncSession, list], Awaitable[list]], entries: list[LogEntry]) -> None:
+        try:
+            async with self.database_service.with_session() as session:
+                await insert(session, entries)
+        except Exception:  # noqa: BLE001
+            if len(entries) == 1:
+                logger.exception("Error writing log")
+                self.failed += 1
+                return
+            # Retry one by one so a single bad row (e.g. a log of a deleted flow) doesn't drop the batch
+            logger.warning(f"Error writing a batch of {len(entries)} logs, retrying them one by one")
+            for entry in entries:
+                await self._insert(insert, [entry])
+            return
+        self.written += len(entries)
+        self.batches += 1
+
+    async def trim(self) -> None:
+        """Delete the transactions and vertex builds over the limits for the flows written since the last trim."""
+        self._last_trim = time.monotonic()
+        transaction_flows, self._transaction_flows_to_trim = self._transaction_flows_to_trim, set()
+        vertex_build_flows, self._vertex_build_flows_to_trim = self._vertex_build_flows_to_trim, set()
+        if not transaction_flows and not vertex_build_flows:
+            return
+        try:
+            async with self.database_service.with_session() as session:
+                if transaction_flows:
+                    await trim_transactions(session, flow_ids=transaction_flows)
+                if vertex_build_flows:
+                    await trim_vertex_builds(session, flow_ids=vertex_build_flows)
+        except Exception:  # noqa: BLE001
+            logger.exception("Error trimming transactions and vertex builds")
+
+    async def flush(self) -> None:
+        """Write the queued logs without waiting for the flush interval and wait until they are written."""
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            return
+        queue = self._ensure_started()
+        self._flush_requested.set()
+        try:
+            await queue.join()
+        finally:
+            self._flush_requested.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "max_queue_depth": self.max_queue_depth,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+            "backpressure_waits": self.backpressure_waits,
+            "backpressure_wait_time": self.backpressure_wait_time,
+        }
+
+    async def stop(self) -> None:
+        """Drain the queue, stop the worker and enforce the limits one last time."""
+        try:
+            await self.flush()
+        except Exception:  # noqa: BLE001
+            logger.exception("Error draining the log queue")
+        self._stopping = True
+        if self._worker_task is not None and not self._worker_task.done() and self._loop is asyncio.get_running_loop():
+            self._worker_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker_task
+        self._worker_task = None
+        await self.trim()
+
+    async def teardown(self) -> None:
+        await self.stop()
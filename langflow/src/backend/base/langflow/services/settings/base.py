@@ -121,8 +121,36 @@ class Settings(BaseSettings):
     """The cache type can be 'async' or 'redis'."""
     cache_expire: int = 3600
     """The cache expire in seconds."""
+    cache_max_size_mb: int = 0
+    """The estimated memory the 'async' cache may use before it evicts the least recently used items, or the
+    size of the 'disk' cache directory above which it evicts the oldest items. Set to 0 for no limit on the
+    'async' cache and the diskcache default of 1 GB on the 'disk' cache."""
+    cache_shards: int = 16
+    """The number of independently locked shards of the 'async' cache."""
+    cache_sweep_interval: float = 60.0
+    """The interval in seconds at which the 'async' cache removes its expired items."""
+    cache_disk_persistent: bool = False
+    """If set to True, the 'disk' cache keeps its entries across restarts instead of clearing them on startup.
+    Entries written by another Langflow version are ignored and pruned in the background."""
+    cache_disk_prune_interval: float = 300.0
+    """The interval in seconds at which the persistent 'disk' cache removes its expired and outdated items."""
+    vertex_result_cache: bool = False
+    """If set to True, the results of components marked cacheable are stored in the cache service and reused by
+    later runs with the same component code, parameters and inputs, without running the component."""
+    vertex_result_cache_ttl: int = 86400
+    """The time in seconds a cached component result is reused."""
+    vertex_result_cache_max_entry_size_mb: int = 16
+    """The estimated size above which a component result is not cached. Set to 0 for no limit."""
+    api_key_cache_ttl: int = 60
+    """The time in seconds a validated API key is served from memory before it is checked against the database
+    again. Set to 0 to check every request against the database."""
+    api_key_usage_flush_interval: float = 10.0
+    """The interval in seconds at which the API key usage counts aggregated in memory are written to the database."""
     variable_store: str = "db"
     """The store can be 'db' or 'kubernetes'."""
+    variable_cache_ttl: int = 0
+    """The time in seconds the decrypted global variables loaded by a flow run are reused by later runs.
+    Set to 0 to load them once per run. Changing a variable through the API invalidates the cache."""
 
     prometheus_enabled: bool = False
     """If set to True, Langflow will expose Prometheus metrics."""
@@ -141,6 +169,16 @@ class Settings(BaseSettings):
     redis_db: int = 0
     redis_url: str | None = None
     redis_cache_expire: int = 3600
+    redis_compression: Literal["zstd", "lz4"] | None = None
+    """The compression of the values stored in Redis larger than redis_compression_threshold. Requires the
+    zstandard or lz4 package."""
+    redis_compression_threshold: int = 1024
+    """The size in bytes above which values stored in Redis are compressed."""
+    redis_near_cache_size: int = 0
+    """The number of Redis values also kept in process memory, invalidated through Redis pub/sub when another
+    instance changes them. Set to 0 to always read from Redis."""
+    redis_near_cache_ttl: float = 30.0
+    """The time in seconds a Redis value is served from process memory, bounding how stale it can be."""
 
     # Sentry
     sentry_dsn: str | None = None
@@ -215,6 +253,15 @@ class Settings(BaseSettings):
     """The maximum number of vertex builds to keep in the database."""
     max_vertex_builds_per_vertex: int = 2
     """The maximum number of builds to keep per vertex. Older builds will be deleted."""
+    log_writer_queue_size: int = 10000
+    """The maximum number of transaction and vertex build logs waiting to be written.
+    Producers wait for room when the queue is full."""
+    log_writer_batch_size: int = 200
+    """The maximum number of logs written to the database in a single transaction."""
+    log_writer_flush_interval: float = 1.0
+    """The maximum time in seconds a log waits in the queue before it is written."""
+    log_writer_trim_interval: float = 30.0
+    """The interval in seconds at which transactions and vertex builds over the limits are deleted."""
 
     # MCP Server
     mcp_server_enabled: bool = True
@@ -225,6 +272,13 @@ class Settings(BaseSettings):
     event_delivery: Literal["polling", "streaming"] = "polling"
     """How to deliver build events to the frontend. Can be 'polling' or 'streaming'."""
 
+    # Graph execution
+    graph_scheduler: Literal["layered", "ready_queue"] = "layered"
+    """How Graph.process schedules vertices. 'layered' waits for a whole layer to finish before starting the next
+    one, 'ready_queue' starts each vertex as soon as its predecessors are fulfilled."""
+    graph_max_concurrency: int | None = None
+    """The maximum number of vertices built concurrently in a single graph run. None means no limit."""
+
     @field_validator("dev")
     @classmethod
     def set_dev(cls, value):
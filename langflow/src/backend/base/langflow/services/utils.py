@@ -135,6 +135,12 @@ async def teardown_services() -> None:
             await teardown_superuser(get_settings_service(), session)
     except Exception as exc:  # noqa: BLE001
         logger.exception(exc)
+    try:
+        from langflow.services.database.models.api_key.crud import api_key_usage
+
+        await api_key_usage.flush()
+    except Exception as exc:  # noqa: BLE001
+        logger.exception(exc)
     try:
         from langflow.services.manager import service_manager
 
@@ -1,4 +1,5 @@
 import abc
+from collections.abc import Collection
 from uuid import UUID
 
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -35,6 +36,21 @@ class VariableService(Service):
             The value of the variable.
         """
 
+    @abc.abstractmethod
+    async def get_variables(
+        self, user_id: UUID | str, names: Collection[str], session: AsyncSession
+    ) -> dict[str, tuple[str | None, str]]:
+        """Async get the types and values of several variables in one call.
+
+        Args:
+            user_id: The user ID.
+            names: The names of the variables.
+            session: The database session.
+
+        Returns:
+            A mapping of variable name to its type and value. Variables that are not found are left out.
+        """
+
     @abc.abstractmethod
     async def list_variables(self, user_id: UUID | str, session: AsyncSession) -> list[str | None]:
         """List all variables.
@@ -15,6 +15,7 @@ from langflow.services.variable.constants import CREDENTIAL_TYPE, GENERIC_TYPE
 from langflow.services.variable.kubernetes_secrets import KubernetesSecretManager, encode_user_id
 
 if TYPE_CHECKING:
+    from collections.abc import Collection
     from uuid import UUID
 
     from sqlmodel import Session
@@ -90,6 +91,21 @@ class KubernetesSecretService(VariableService, Service):
             raise TypeError(msg)
         return value
 
+    @override
+    async def get_variables(
+        self, user_id: UUID | str, names: Collection[str], session: AsyncSession
+    ) -> dict[str, tuple[str | None, str]]:
+        variables = await asyncio.to_thread(self.kubernetes_secrets.get_secret, name=encode_user_id(user_id))
+        if not variables:
+            return {}
+        resolved = {}
+        for name in names:
+            if name in variables:
+                resolved[name] = (GENERIC_TYPE, variables[name])
+            elif (credential_name := CREDENTIAL_TYPE + "_" + name) in variables:
+                resolved[name] = (CREDENTIAL_TYPE, variables[credential_name])
+        return resolved
+
     @override
     async def list_variables(
         self,
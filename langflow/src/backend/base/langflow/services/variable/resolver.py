@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from langflow.services.deps import get_settings_service, get_variable_service, session_scope
+from langflow.services.variable.constants import CREDENTIAL_TYPE
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from uuid import UUID
+
+DEFAULT_VARIABLE_CACHE_SIZE = 1024
+
+ResolvedVariable = tuple[str | None, str]
+
+
+class VariableCache:
+    """An LRU cache of decrypted variables shared by flow runs.
+
+    It is only used when `variable_cache_ttl` is set, since it keeps decrypted values in memory.
+    The variable endpoints invalidate the entries of a user whenever one of their variables changes.
+
+    Attributes:
+        max_size (int): Maximum number of variables to keep.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that had to load the variable.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_VARIABLE_CACHE_SIZE) -> None:
+        self._entries: OrderedDict[tuple[str, str], tuple[ResolvedVariable, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: UUID | str, name: str, ttl: float) -> ResolvedVariable | None:
+        """Return the type and value of `name` if it was loaded less than `ttl` seconds ago."""
+        key = (str(user_id), name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[1] >= ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, user_id: UUID | str, name: str, variable: ResolvedVariable) -> None:
+        key = (str(user_id), name)
+        with self._lock:
+            self._entries[key] = (variable, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID | str | None = None) -> None:
+        """Remove the variables of `user_id`, or every variable if no user is given."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == str(user_id)]:
+                del self._entries[key]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+variable_cache = VariableCache()
+
+
+class VariableResolver:
+    """Resolves the global variables used by the `load_from_db` fields of a flow run.
+
+    The first lookup for a user loads every variable the run needs (`names`) with a single
+    `VariableService.get_variables` call, which decrypts each value once. Later lookups in the
+    same run, from any vertex, are served from memory. If one of the run variables can't be read,
+    the lookup falls back to the requested variable alone, so only the vertices using the broken
+    variable fail.
+
+    Args:
+        names: The names of the variables the run needs.
+    """
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self.names = set(names)
+        self._variables: dict[str, dict[str, ResolvedVariable]] = {}
+        self._requested: dict[str, set[str]] = {}
+        self._lock = asyncio.Lock()
+
+    async def get(self, user_id: UUID, name: str, field: str) -> str:
+        """Return the value of the variable `name` for the `field` of a component.
+
+        Raises:
+            ValueError: If the variable is not found.
+            TypeError: If a credential is used in a Session ID field.
+        """
+        async with self._lock:
+            variables = await self._load(user_id, name)
+
+        if name not in variables:
+            msg = f"{name} variable not found."
+            raise ValueError(msg)
+        type_, value = variables[name]
+        if type_ == CREDENTIAL_TYPE and field == "session_id":
+            msg = (
+                f"variable {name} of type 'Credential' cannot be used in a Session ID field "
+                "because its purpose is to prevent the exposure of values."
+            )
+            raise TypeError(msg)
+        return value
+
+    async def _load(self, user_id: UUID, name: str) -> dict[str, ResolvedVariable]:
+        variables = self._variables.setdefault(str(user_id), {})
+        requested = self._requested.setdefault(str(user_id), set())
+        if name in requested:
+            return variables
+
+        names = ({name} | self.names) - requested
+        ttl = get_settings_service().settings.variable_cache_ttl
+        if ttl > 0:
+            for variable_name in names:
+                if (cached := variable_cache.get(user_id, variable_name, ttl)) is not None:
+                    variables[variable_name] = cached
+        if missing := names - variables.keys():
+            try:
+                loaded = await self._fetch(user_id, missing)
+            except Exception:
+                if missing == {name}:
+                    raise
+                # Another variable of the run can't be read, only the vertices using it must fail
+                names = {name}
+                loaded = await self._fetch(user_id, names - variables.keys())
+            variables.update(loaded)
+            if ttl > 0:
+                for variable_name, variable in loaded.items():
+                    variable_cache.set(user_id, variable_name, variable)
+        requested.update(names)
+        return variables
+
+    @staticmethod
+    async def _fetch(user_id: UUID, names: set[str]) -> dict[str, ResolvedVariable]:
+        if not names:
+            return {}
+        async with session_scope() as session:
+            return await get_variable_service().get_variables(user_id, names, session=session)
@@ -5,7 +5,7 @@ from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
 from loguru import logger
-from sqlmodel import select
+from sqlmodel import col, select
 from typing_extensions import override
 
 from langflow.services.auth import utils as auth_utils
@@ -15,7 +15,7 @@ from langflow.services.variable.base import VariableService
 from langflow.services.variable.constants import CREDENTIAL_TYPE, GENERIC_TYPE
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Collection, Sequence
     from uuid import UUID
 
     from sqlmodel.ext.asyncio.session import AsyncSession
@@ -80,6 +80,22 @@ class DatabaseVariableService(VariableService, Service):
         # we decrypt the value
         return auth_utils.decrypt_api_key(variable.value, settings_service=self.settings_service)
 
+    @override
+    async def get_variables(
+        self, user_id: UUID | str, names: Collection[str], session: AsyncSession
+    ) -> dict[str, tuple[str | None, str]]:
+        if not names:
+            return {}
+        stmt = select(Variable).where(Variable.user_id == user_id, col(Variable.name).in_(names))
+        resolved = {}
+        for variable in (await session.exec(stmt)).all():
+            if not variable.value:
+                continue
+            # Like get_variable, a value that can't be decrypted is an error rather than a missing variable
+            value = auth_utils.decrypt_api_key(variable.value, settings_service=self.settings_service)
+            resolved[variable.name] = (variable.type, value)
+        return resolved
+
     async def get_all(self, user_id: UUID | str, session: AsyncSession) -> list[VariableRead]:
         stmt = select(Variable).where(Variable.user_id == user_id)
         variables = list((await session.exec(stmt)).all())
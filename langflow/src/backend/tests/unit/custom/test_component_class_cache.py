@@ -0,0 +1,74 @@
+import pytest
+from langflow.custom.eval import ComponentClassCache
+
+COMPONENT_CODE = """
+from langflow.custom import Component
+from langflow.io import MessageTextInput, Output
+from langflow.schema.message import Message
+
+
+class {name}(Component):
+    display_name = "{name}"
+    inputs = [MessageTextInput(name="text", display_name="Text")]
+    outputs = [Output(display_name="Message", name="message", method="build_message")]
+
+    def build_message(self) -> Message:
+        return Message(text=self.text)
+"""
+
+
+def component_code(name: str) -> str:
+    return COMPONENT_CODE.format(name=name)
+
+
+def test_get_or_create_reuses_compiled_class():
+    cache = ComponentClassCache()
+    code = component_code("EchoComponent")
+
+    first = cache.get_or_create(code)
+    second = cache.get_or_create(code)
+
+    assert first is second
+    assert first.__name__ == "EchoComponent"
+    assert cache.stats() == {"size": 1, "max_size": cache.max_size, "hits": 1, "misses": 1}
+
+
+def test_get_or_create_evicts_least_recently_used():
+    cache = ComponentClassCache(max_size=2)
+    first_code, second_code, third_code = (component_code(f"Component{i}") for i in range(3))
+
+    first = cache.get_or_create(first_code)
+    cache.get_or_create(second_code)
+    # Touch the first class so the second one becomes the least recently used
+    cache.get_or_create(first_code)
+    cache.get_or_create(third_code)
+
+    assert len(cache) == 2
+    assert cache.get_or_create(first_code) is first
+    assert cache.misses == 3
+    cache.get_or_create(second_code)
+    assert cache.misses == 4
+
+
+def test_invalidate_forces_recompile():
+    cache = ComponentClassCache()
+    code = component_code("EchoComponent")
+    first = cache.get_or_create(code)
+
+    cache.invalidate(code)
+
+    assert len(cache) == 0
+    assert cache.get_or_create(code) is not first
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_get_or_create_does_not_cache_errors():
+    cache = ComponentClassCache()
+
+    with pytest.raises(TypeError, match="No Component subclass found"):
+        cache.get_or_create("x = 1")
+
+    assert len(cache) == 0
+    assert cache.misses == 1
@@ -68,6 +68,30 @@ async def test_graph_functional():
     assert graph.edges[0].target_id == "chat_output"
 
 
+async def test_graph_restore_run_from_checkpoints():
+    def make_graph():
+        chat_input = ChatInput(_id="chat_input")
+        chat_input.set(should_store_message=False)
+        chat_output = ChatOutput(input_value="test", _id="chat_output")
+        chat_output.set(sender_name=chat_input.message_response)
+        graph = Graph(chat_input, chat_output)
+        graph.prepare()
+        return graph
+
+    graph = make_graph()
+    await graph.astep()
+    checkpoints = {"chat_input": graph.get_vertex("chat_input").get_checkpoint()}
+
+    # An unbuilt copy of the graph, like the one cached when the run started
+    restored = make_graph()
+    restored.restore_run(graph.get_run_state(), checkpoints)
+    assert restored._run_queue == graph._run_queue == deque(["chat_output"])
+    assert restored.run_manager.to_dict() == graph.run_manager.to_dict()
+    assert restored.get_vertex("chat_input").built
+    assert restored.get_vertex("chat_input").result == graph.get_vertex("chat_input").result
+    assert not restored.get_vertex("chat_output").built
+
+
 async def test_graph_functional_async_start():
     chat_input = ChatInput(_id="chat_input")
     chat_output = ChatOutput(input_value="test", _id="chat_output")
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from langflow.custom import Component
+from langflow.graph import Graph
+from langflow.io import MessageTextInput, Output
+from langflow.schema.message import Message
+
+
+class SleepComponent(Component):
+    display_name = "Sleep"
+    inputs = [
+        MessageTextInput(name="text", display_name="Text"),
+    ]
+    outputs = [
+        Output(display_name="Message", name="message", method="sleep_and_return"),
+    ]
+
+    delay: float = 0.0
+    finished: list[str] = []
+
+    async def sleep_and_return(self) -> Message:
+        await asyncio.sleep(self.delay)
+        self.finished.append(self._id)
+        return Message(text=f"{self._id}:{self.text or ''}")
+
+
+class SlowComponent(SleepComponent):
+    delay = 0.3
+
+
+class FastComponent(SleepComponent):
+    delay = 0.01
+
+
+class JoinComponent(Component):
+    display_name = "Join"
+    inputs = [
+        MessageTextInput(name="first", display_name="First"),
+        MessageTextInput(name="second", display_name="Second"),
+    ]
+    outputs = [
+        Output(display_name="Message", name="message", method="join"),
+    ]
+
+    def join(self) -> Message:
+        return Message(text=f"{self.first}|{self.second}")
+
+
+@pytest.fixture
+def finished():
+    SleepComponent.finished = []
+    yield SleepComponent.finished
+    SleepComponent.finished = []
+
+
+def wide_graph() -> Graph:
+    slow = SlowComponent(_id="slow")
+    fast = FastComponent(_id="fast")
+    child = FastComponent(_id="child")
+    child.set(text=fast.sleep_and_return)
+    join = JoinComponent(_id="join")
+    join.set(first=slow.sleep_and_return, second=child.sleep_and_return)
+    graph = Graph()
+    graph.add_component(join)
+    graph.prepare()
+    return graph
+
+
+async def test_process_layered_waits_for_whole_layer(finished):
+    graph = wide_graph()
+    await graph.process(fallback_to_env_vars=False, scheduler="layered")
+
+    assert finished == ["fast", "slow", "child"]
+    assert graph.get_vertex("join").built_object["message"].text == "slow:|child:fast:"
+
+
+async def test_process_ready_queue_does_not_wait_for_unrelated_vertices(finished):
+    graph = wide_graph()
+    await graph.process(fallback_to_env_vars=False, scheduler="ready_queue")
+
+    assert finished == ["fast", "child", "slow"]
+    assert all(vertex.built for vertex in graph.vertices)
+    assert graph.get_vertex("join").built_object["message"].text == "slow:|child:fast:"
+
+
+@pytest.mark.parametrize("scheduler", ["ready_queue", "layered"])
+async def test_process_respects_max_concurrency(finished, scheduler):
+    graph = wide_graph()
+    build_vertex = graph.build_vertex
+    in_flight = 0
+    peak = 0
+
+    async def tracked_build_vertex(*args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            return await build_vertex(*args, **kwargs)
+        finally:
+            in_flight -= 1
+
+    graph.build_vertex = tracked_build_vertex
+    await graph.process(fallback_to_env_vars=False, scheduler=scheduler, max_concurrency=1)
+
+    assert peak == 1
+    assert sorted(finished) == ["child", "fast", "slow"]
+    assert graph.get_vertex("join").built
+
+
+async def test_process_rejects_invalid_max_concurrency():
+    graph = wide_graph()
+    with pytest.raises(ValueError, match="max_concurrency must be a positive integer"):
+        await graph.process(fallback_to_env_vars=False, max_concurrency=0)
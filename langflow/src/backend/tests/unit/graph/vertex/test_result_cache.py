@@ -0,0 +1,123 @@
+import pandas as pd
+import pytest
+from langflow.components.outputs import TextOutputComponent
+from langflow.custom import Component
+from langflow.graph import Graph
+from langflow.graph.vertex.result_cache import Unfingerprintable, _fingerprint, _fingerprint_file
+from langflow.io import MessageTextInput, Output, SecretStrInput
+from langflow.schema.data import Data
+from langflow.schema.message import Message
+from langflow.services.cache.utils import CacheMiss
+from langflow.services.deps import get_settings_service
+
+VARIABLES = {"API_KEY": "first"}
+BUILDS: list[str] = []
+
+
+class CachedUpper(Component):
+    display_name = "Cached Upper"
+    cacheable = True
+
+    inputs = [
+        MessageTextInput(name="text", display_name="Text"),
+        SecretStrInput(name="api_key", display_name="API Key"),
+    ]
+    outputs = [
+        Output(display_name="Message", name="upper", method="upper"),
+    ]
+
+    async def get_variables(self, name: str, field: str):  # noqa: ARG002
+        return VARIABLES[name]
+
+    def upper(self) -> Message:
+        BUILDS.append(self.text)
+        return Message(text=f"{self.text.upper()} {self.api_key}")
+
+
+class DictCache:
+    """Stores entries like the chat service does, under a result key."""
+
+    def __init__(self):
+        self.entries = {}
+
+    async def get(self, key, lock=None):  # noqa: ARG002
+        return self.entries.get(key, CacheMiss())
+
+    async def set(self, key, data, lock=None):  # noqa: ARG002
+        self.entries[key] = {"result": data}
+        return True
+
+
+@pytest.fixture
+def result_cache(monkeypatch):
+    monkeypatch.setattr(get_settings_service().settings, "vertex_result_cache", True)
+    monkeypatch.setitem(VARIABLES, "API_KEY", "first")
+    BUILDS.clear()
+    return DictCache()
+
+
+async def build_upper(cache: DictCache, text: str = "hello"):
+    upper = CachedUpper(_id="upper", text=text, api_key="API_KEY")
+    output = TextOutputComponent(_id="output")
+    output.set(input_value=upper.upper)
+    graph = Graph(upper, output)
+    graph.prepare()
+    build = await graph.build_vertex("upper", get_cache=cache.get, set_cache=cache.set)
+    return build.vertex
+
+
+def test_fingerprint_ignores_message_identity():
+    first = Message(text="hello", sender="User")
+    second = Message(text="hello", sender="User")
+    assert _fingerprint(first) == _fingerprint(second)
+    assert _fingerprint(first) != _fingerprint(Message(text="bye", sender="User"))
+
+
+def test_fingerprint_changes_with_file_content(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text("one")
+    before = _fingerprint_file(str(path))
+    path.write_text("three")
+    assert _fingerprint_file(str(path)) != before
+    assert _fingerprint_file([str(path)]) == [_fingerprint_file(str(path))]
+    # Other strings are never looked up on disk
+    assert _fingerprint(str(path)) == str(path)
+
+
+def test_fingerprint_of_containers_is_order_independent_for_dicts():
+    assert _fingerprint({"a": 1, "b": [Data(data={"x": 1})]}) == _fingerprint({"b": [Data(data={"x": 1})], "a": 1})
+    assert _fingerprint(pd.DataFrame({"a": [1, 2]})) != _fingerprint(pd.DataFrame({"a": [1, 3]}))
+
+
+def test_unknown_values_are_not_fingerprinted():
+    with pytest.raises(Unfingerprintable):
+        _fingerprint(object())
+
+
+async def test_cacheable_vertex_is_served_from_cache(result_cache):
+    first = await build_upper(result_cache)
+    second = await build_upper(result_cache)
+
+    assert BUILDS == ["hello"]
+    assert not first.result.used_cached_result
+    assert second.result.used_cached_result
+    assert second.result_hash == first.result_hash
+    assert second.results["upper"].text == "HELLO first"
+
+
+async def test_changed_param_misses_the_cache(result_cache):
+    await build_upper(result_cache)
+    changed = await build_upper(result_cache, text="bye")
+
+    assert BUILDS == ["hello", "bye"]
+    assert not changed.result.used_cached_result
+
+
+async def test_changed_global_variable_misses_the_cache(result_cache):
+    await build_upper(result_cache)
+    VARIABLES["API_KEY"] = "second"
+    changed = await build_upper(result_cache)
+
+    assert BUILDS == ["hello", "hello"]
+    assert not changed.result.used_cached_result
+    assert changed.results["upper"].text == "HELLO second"
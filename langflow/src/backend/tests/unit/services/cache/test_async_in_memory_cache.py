@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+from langflow.services.cache.service import AsyncInMemoryCache
+from langflow.services.cache.utils import CACHE_MISS, estimate_size
+
+
+@pytest.fixture
+async def cache():
+    cache = AsyncInMemoryCache(expiration_time=60, num_shards=4, sweep_interval=0.05)
+    yield cache
+    await cache.teardown()
+
+
+async def test_get_set_delete(cache):
+    await cache.set("a", {"x": 1})
+    assert await cache.get("a") == {"x": 1}
+    assert await cache.contains("a")
+
+    await cache.delete("a")
+    assert await cache.get("a") is CACHE_MISS
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+async def test_upsert_merges_dicts(cache):
+    await cache.upsert("a", {"x": 1})
+    await cache.upsert("a", {"y": 2})
+    assert await cache.get("a") == {"x": 1, "y": 2}
+
+
+async def test_evicts_least_recently_used_within_byte_budget():
+    cache = AsyncInMemoryCache(max_bytes=estimate_size("v" * 1000) * 3, num_shards=1)
+    for key in "abc":
+        await cache.set(key, "v" * 1000)
+    # Reading "a" makes "b" the least recently used
+    await cache.get("a")
+    await cache.set("d", "v" * 1000)
+
+    assert await cache.get("b") is CACHE_MISS
+    assert await cache.get("a") != CACHE_MISS
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["resident_bytes"] <= cache.max_bytes
+    await cache.teardown()
+
+
+async def test_sweeper_removes_expired_items(cache):
+    cache.expiration_time = 0.01
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    await asyncio.sleep(0.2)
+
+    assert len(cache) == 0
+    assert cache.stats()["resident_bytes"] == 0
+    assert cache.stats()["expirations"] == 2
+
+
+async def test_operations_on_different_shards_do_not_wait_for_each_other(cache):
+    blocked = cache._shard("a")
+    other_key = next(key for key in map(str, range(100)) if cache._shard(key) is not blocked)
+
+    async with blocked.lock:
+        await asyncio.wait_for(cache.set(other_key, 1), timeout=1)
+        assert await asyncio.wait_for(cache.get(other_key), timeout=1) == 1
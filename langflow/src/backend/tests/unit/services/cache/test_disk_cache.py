@@ -0,0 +1,136 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from langflow.services.cache.disk import _NAMESPACES_KEY, AsyncDiskCache
+from langflow.services.cache.utils import CACHE_MISS
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    async def make(**kwargs):
+        kwargs.setdefault("version", "1.0.0")
+        # Opening the cache touches the disk, keep it off the event loop
+        return await asyncio.to_thread(AsyncDiskCache, str(tmp_path), expiration_time=60, **kwargs)
+
+    return make
+
+
+async def on_disk(cache, key):
+    return await asyncio.to_thread(cache.cache.__contains__, key)
+
+
+async def test_writes_are_visible_before_they_are_flushed(make_cache):
+    cache = await make_cache(write_delay=60)
+    await cache.set("a", {"x": 1})
+    assert await cache.get("a") == {"x": 1}
+    assert not await on_disk(cache, "a")
+
+    await cache.delete("a")
+    assert await cache.get("a") is CACHE_MISS
+    assert not await cache.contains("a")
+    await cache.teardown()
+
+
+async def test_batch_is_written_when_full(make_cache):
+    cache = await make_cache(write_delay=60, write_batch_size=3)
+    await cache.set_many({"a": 1, "b": 2})
+    assert len(cache._pending) == 2
+    await cache.set("c", 3)
+    assert not cache._pending
+    assert all([await on_disk(cache, key) for key in "abc"])
+    await cache.teardown()
+
+
+async def test_writes_made_during_a_flush_are_flushed(make_cache):
+    cache = await make_cache(write_delay=0.01)
+    write = cache._write
+    writing = threading.Event()
+
+    def slow_write(batch):
+        writing.set()
+        time.sleep(0.2)
+        write(batch)
+
+    cache._write = slow_write
+    await cache.set("a", 1)
+    assert await asyncio.to_thread(writing.wait, 5)
+    await cache.set("b", 2)
+
+    for _ in range(100):
+        if await on_disk(cache, "b"):
+            break
+        await asyncio.sleep(0.05)
+    assert await on_disk(cache, "b")
+    assert not cache._pending
+    await cache.teardown()
+
+
+async def test_upsert_merges_dicts(make_cache):
+    cache = await make_cache()
+    await cache.upsert("a", {"x": 1})
+    await cache.upsert("a", {"y": 2})
+    assert await cache.get("a") == {"x": 1, "y": 2}
+    await cache.teardown()
+
+
+async def test_cache_is_cleared_on_startup_by_default(make_cache):
+    cache = await make_cache()
+    await cache.set("a", 1)
+    await cache.flush()
+    await asyncio.to_thread(cache.cache.close)
+
+    restarted = await make_cache()
+    assert await restarted.get("a") is CACHE_MISS
+
+
+async def test_persistent_cache_survives_restarts(make_cache):
+    cache = await make_cache(persistent=True)
+    await cache.set("a", {"x": 1})
+    await cache.teardown()
+
+    restarted = await make_cache(persistent=True)
+    assert await restarted.get("a") == {"x": 1}
+    await restarted.teardown()
+
+
+async def test_entries_of_other_versions_are_ignored_and_pruned(make_cache):
+    old = await make_cache(persistent=True, version="1.0.0")
+    await old.set("a", 1)
+    await old.teardown()
+
+    new = await make_cache(persistent=True, version="1.1.0")
+    assert await new.get("a") is CACHE_MISS
+    # The old version is still active, e.g. during a rolling restart
+    assert await asyncio.to_thread(new.prune) == 0
+    assert await on_disk(new, "a")
+
+    namespaces = await asyncio.to_thread(new.cache.get, _NAMESPACES_KEY)
+    namespaces[old.namespace] = time.time() - 10 * new.prune_interval
+    await asyncio.to_thread(new.cache.set, _NAMESPACES_KEY, namespaces)
+    assert await asyncio.to_thread(new.prune) == 1
+    assert not await on_disk(new, "a")
+    await new.teardown()
+
+
+async def test_custom_serializer(make_cache):
+    class JSONSerializer:
+        @staticmethod
+        def dumps(value):
+            return json.dumps(value).encode()
+
+        @staticmethod
+        def loads(data):
+            return json.loads(data)
+
+    cache = await make_cache(persistent=True, serializer=JSONSerializer)
+    await cache.set("a", {"x": [1, 2]})
+    await cache.teardown()
+
+    restarted = await make_cache(persistent=True, serializer=JSONSerializer)
+    assert await restarted.get("a") == {"x": [1, 2]}
+    # Entries written with another serializer are not readable
+    other = await make_cache(persistent=True)
+    assert await other.get("a") is CACHE_MISS
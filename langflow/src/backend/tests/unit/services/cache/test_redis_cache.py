@@ -0,0 +1,104 @@
+import asyncio
+import json
+import pickle
+
+import pytest
+from langflow.services.cache.service import RedisCache
+from langflow.services.cache.utils import CACHE_MISS
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr("redis.asyncio.StrictRedis", lambda **_: fakeredis.FakeAsyncRedis(server=server))
+    return server
+
+
+@pytest.fixture
+async def make_cache(server):  # noqa: ARG001
+    caches = []
+
+    def make(**kwargs):
+        cache = RedisCache(expiration_time=60, **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        await cache.teardown()
+
+
+async def test_get_set_delete(make_cache):
+    cache = make_cache()
+    await cache.set("a", {"x": 1})
+    assert await cache.get("a") == {"x": 1}
+    assert await cache.contains("a")
+
+    await cache.delete("a")
+    assert await cache.get("a") is CACHE_MISS
+    assert not await cache.contains("a")
+
+
+async def test_get_many_set_many(make_cache):
+    cache = make_cache()
+    await cache.set_many({"a": 1, "b": [2]})
+    assert await cache.get_many(["a", "missing", None, "b"]) == [1, CACHE_MISS, CACHE_MISS, [2]]
+
+
+@pytest.mark.parametrize("compression", ["zstd", "lz4"])
+async def test_large_values_are_compressed(make_cache, compression):
+    pytest.importorskip("zstandard" if compression == "zstd" else "lz4")
+    cache = make_cache(compression=compression, compression_threshold=100)
+    large = {"text": "x" * 100_000}
+    await cache.set_many({"small": "y", "large": large})
+
+    assert len(await cache._client.get("large")) < 1000
+    assert await cache.get_many(["small", "large"]) == ["y", large]
+    # Compressed values stay readable without compression configured
+    assert await make_cache().get("large") == large
+
+
+async def test_custom_serializer(make_cache):
+    class JSONSerializer:
+        @staticmethod
+        def dumps(value):
+            return json.dumps(value).encode()
+
+        @staticmethod
+        def loads(data):
+            return json.loads(data)
+
+    cache = make_cache(serializer=JSONSerializer)
+    await cache.set("a", {"x": [1, 2]})
+    assert await cache.get("a") == {"x": [1, 2]}
+
+
+async def test_reads_values_without_header(make_cache):
+    cache = make_cache()
+    await cache._client.set("legacy", pickle.dumps({"x": 1}))
+    assert await cache.get("legacy") == {"x": 1}
+
+
+async def test_near_cache_is_invalidated_by_other_instances(make_cache):
+    first = make_cache(near_cache_size=10)
+    second = make_cache(near_cache_size=10)
+    await first.set("a", 1)
+    assert await second.get("a") == 1
+    assert await second.get("a") == 1
+    assert second.stats()["near_hits"] == 1
+
+    await first.set("a", 2)
+    for _ in range(100):
+        if "a" not in second._near_cache:
+            break
+        await asyncio.sleep(0.01)
+    assert await second.get("a") == 2
+
+    await first.clear()
+    for _ in range(100):
+        if not second._near_cache:
+            break
+        await asyncio.sleep(0.01)
+    assert await second.get("a") is CACHE_MISS
@@ -0,0 +1,56 @@
+import uuid
+
+import pytest
+from langflow.components.inputs import ChatInput
+from langflow.components.outputs import ChatOutput
+from langflow.graph import Graph
+from langflow.services.cache.service import ThreadingInMemoryCache
+from langflow.services.chat import service as chat_service_module
+from langflow.services.chat.service import ChatService
+
+
+@pytest.fixture
+def chat_service(monkeypatch):
+    cache = ThreadingInMemoryCache()
+    monkeypatch.setattr(chat_service_module, "get_cache_service", lambda: cache)
+    return ChatService()
+
+
+def make_graph():
+    chat_input = ChatInput(_id="chat_input")
+    chat_output = ChatOutput(input_value="test", _id="chat_output")
+    chat_output.set(sender_name=chat_input.message_response)
+    graph = Graph(chat_input, chat_output)
+    graph.prepare()
+    graph.set_run_id(uuid.uuid4())
+    return graph
+
+
+def checkpoint_keys(chat_service):
+    return [key for key in chat_service.cache_service._cache if ":checkpoint:" in key]
+
+
+async def test_checkpoints_of_a_run_are_deleted_with_it(chat_service):
+    first = make_graph()
+    await chat_service.set_cache("flow", first)
+    await chat_service.set_vertex_checkpoint("flow", first, "chat_input")
+    assert len(checkpoint_keys(chat_service)) == 2
+
+    second = make_graph()
+    await chat_service.set_cache("flow", second)
+    assert checkpoint_keys(chat_service) == []
+
+    await chat_service.set_vertex_checkpoint("flow", second, "chat_input")
+    assert all(second.run_id in key for key in checkpoint_keys(chat_service))
+    await chat_service.clear_cache("flow")
+    assert len(chat_service.cache_service) == 0
+
+
+async def test_live_graph_is_returned_as_is(chat_service):
+    graph = make_graph()
+    await chat_service.set_cache("flow", graph)
+    await chat_service.set_vertex_checkpoint("flow", graph, "chat_input")
+    run_manager = graph.run_manager
+
+    assert await chat_service.get_graph("flow") is graph
+    assert graph.run_manager is run_manager
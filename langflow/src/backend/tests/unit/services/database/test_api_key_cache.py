@@ -0,0 +1,141 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from langflow.services.database.models.api_key.crud import ApiKeyCache, api_key_cache, check_key
+from langflow.services.database.models.api_key.model import ApiKey
+from langflow.services.database.models.user.model import User
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+def make_user():
+    return User(id=uuid4(), username=f"user-{uuid4()}", password="password", is_active=True)  # noqa: S106
+
+
+def test_get_returns_validated_key():
+    cache = ApiKeyCache()
+    user_id, api_key_id = uuid4(), uuid4()
+
+    cache.set("sk-key", api_key_id, user_id)
+
+    assert cache.get("sk-key", ttl=60) == (api_key_id, user_id)
+    assert cache.get("sk-other", ttl=60) is None
+    assert cache.stats() == {"size": 1, "max_size": cache.max_size, "hits": 1, "misses": 1}
+
+
+def test_get_expires_entries_after_ttl():
+    cache = ApiKeyCache()
+    cache.set("sk-key", uuid4(), uuid4())
+
+    with patch("langflow.services.database.models.api_key.crud.time.monotonic", return_value=float("inf")):
+        assert cache.get("sk-key", ttl=60) is None
+
+    assert len(cache) == 0
+
+
+def test_set_evicts_least_recently_used():
+    cache = ApiKeyCache(max_size=2)
+    for name in ("sk-1", "sk-2"):
+        cache.set(name, uuid4(), uuid4())
+    cache.get("sk-1", ttl=60)
+
+    cache.set("sk-3", uuid4(), uuid4())
+
+    assert cache.get("sk-2", ttl=60) is None
+    assert cache.get("sk-1", ttl=60) is not None
+
+
+def test_invalidate_by_key_and_user():
+    cache = ApiKeyCache()
+    user_id, other_user_id = uuid4(), uuid4()
+    first_key_id = uuid4()
+    cache.set("sk-1", first_key_id, user_id)
+    cache.set("sk-2", uuid4(), user_id)
+    cache.set("sk-3", uuid4(), other_user_id)
+
+    cache.invalidate(api_key_id=first_key_id)
+    assert cache.get("sk-1", ttl=60) is None
+    assert len(cache) == 2
+
+    cache.invalidate(user_id=user_id)
+    assert cache.get("sk-2", ttl=60) is None
+    assert cache.get("sk-3", ttl=60) is not None
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+@pytest.fixture
+def api_key_settings():
+    settings_service = SimpleNamespace(settings=SimpleNamespace(api_key_cache_ttl=60, api_key_usage_flush_interval=10))
+    with (
+        patch("langflow.services.database.models.api_key.crud.get_settings_service", return_value=settings_service),
+        patch("langflow.services.database.models.api_key.crud.api_key_usage") as usage,
+    ):
+        api_key_cache.invalidate()
+        yield SimpleNamespace(settings=settings_service.settings, usage=usage)
+        api_key_cache.invalidate()
+
+
+async def test_check_key_serves_repeated_checks_from_memory(async_session: AsyncSession, api_key_settings):
+    user = make_user()
+    api_key = ApiKey(api_key=f"sk-{uuid4()}", name="test", user_id=user.id)
+    async_session.add(user)
+    async_session.add(api_key)
+    await async_session.commit()
+
+    assert (await check_key(async_session, api_key.api_key)).id == user.id
+    # Only the user is loaded again, by primary key
+    with patch.object(async_session, "exec", MagicMock(side_effect=AssertionError("unexpected query"))):
+        assert (await check_key(async_session, api_key.api_key)).id == user.id
+
+    assert api_key_settings.usage.record.call_count == 2
+    assert await check_key(async_session, "sk-unknown") is None
+
+
+@pytest.mark.usefixtures("api_key_settings")
+async def test_check_key_does_not_share_users_between_sessions(async_session: AsyncSession):
+    user = make_user()
+    api_key = ApiKey(api_key=f"sk-{uuid4()}", name="test", user_id=user.id)
+    async_session.add(user)
+    async_session.add(api_key)
+    await async_session.commit()
+
+    engine = async_session.bind
+    async with AsyncSession(engine) as first, AsyncSession(engine) as second:
+        first_user = await check_key(first, api_key.api_key)
+        second_user = await check_key(second, api_key.api_key)
+
+        assert first_user is not second_user
+        assert first_user in first
+        assert second_user in second
+
+
+@pytest.mark.usefixtures("api_key_settings")
+async def test_check_key_drops_keys_of_deleted_users(async_session: AsyncSession):
+    user = make_user()
+    api_key = ApiKey(api_key=f"sk-{uuid4()}", name="test", user_id=user.id)
+    async_session.add(user)
+    async_session.add(api_key)
+    await async_session.commit()
+    await check_key(async_session, api_key.api_key)
+
+    await async_session.delete(user)
+    await async_session.commit()
+
+    assert await check_key(async_session, api_key.api_key) is None
+    assert len(api_key_cache) == 0
+
+
+async def test_check_key_without_cache_queries_every_time(async_session: AsyncSession, api_key_settings):
+    api_key_settings.settings.api_key_cache_ttl = 0
+    user = make_user()
+    api_key = ApiKey(api_key=f"sk-{uuid4()}", name="test", user_id=user.id)
+    async_session.add(user)
+    async_session.add(api_key)
+    await async_session.commit()
+
+    await check_key(async_session, api_key.api_key)
+
+    assert len(api_key_cache) == 0
@@ -0,0 +1,161 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from langflow.services.database.models.transactions.model import TransactionBase, TransactionTable
+from langflow.services.database.models.vertex_builds.model import VertexBuildBase, VertexBuildTable
+from langflow.services.log_writer.service import LogWriterService
+from langflow.services.settings.base import Settings
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+class FakeDatabaseService:
+    def __init__(self, engine):
+        self.engine = engine
+
+    @asynccontextmanager
+    async def with_session(self):
+        async with AsyncSession(self.engine, expire_on_commit=False) as session:
+            yield session
+
+
+@pytest.fixture
+async def database_service():
+    engine = create_async_engine("sqlite+aiosqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    yield FakeDatabaseService(engine)
+    await engine.dispose()
+
+
+@pytest.fixture
+def settings():
+    return Settings().model_copy(
+        update={
+            "max_vertex_builds_to_keep": 10,
+            "max_vertex_builds_per_vertex": 2,
+            "max_transactions_to_keep": 3,
+            "log_writer_batch_size": 3,
+            "log_writer_flush_interval": 10,
+            "log_writer_trim_interval": 3600,
+        }
+    )
+
+
+@pytest.fixture
+def make_service(database_service, settings):
+    def _make_service(**overrides):
+        service_settings = settings.model_copy(update=overrides)
+        return LogWriterService(SimpleNamespace(settings=service_settings), database_service)
+
+    return _make_service
+
+
+@pytest.fixture
+def settings_service(settings):
+    settings_service = SimpleNamespace(settings=settings)
+    with (
+        patch(
+            "langflow.services.database.models.vertex_builds.crud.get_settings_service", return_value=settings_service
+        ),
+        patch(
+            "langflow.services.database.models.transactions.crud.get_settings_service", return_value=settings_service
+        ),
+    ):
+        yield settings_service
+
+
+def vertex_build(flow_id, vertex_id="vertex"):
+    return VertexBuildBase(id=vertex_id, flow_id=flow_id, valid=True)
+
+
+def transaction(flow_id):
+    return TransactionBase(vertex_id="vertex", status="success", flow_id=flow_id)
+
+
+async def count(database_service, table):
+    async with database_service.with_session() as session:
+        return (await session.exec(select(func.count()).select_from(table))).one()
+
+
+async def test_writes_queued_logs_in_batches(make_service, database_service):
+    service = make_service()
+    flow_id = uuid4()
+
+    for i in range(7):
+        await service.add_vertex_build(vertex_build(flow_id, f"vertex-{i}"))
+    await service.flush()
+
+    assert await count(database_service, VertexBuildTable) == 7
+    stats = service.stats()
+    assert stats["enqueued"] == 7
+    assert stats["written"] == 7
+    assert stats["batches"] == 3
+    assert stats["queue_depth"] == 0
+    await service.stop()
+
+
+async def test_writes_after_flush_interval(make_service, database_service):
+    service = make_service(log_writer_flush_interval=0.05)
+
+    await service.add_transaction(transaction(uuid4()))
+    await asyncio.sleep(0.5)
+
+    assert await count(database_service, TransactionTable) == 1
+    await service.stop()
+
+
+@pytest.mark.usefixtures("settings_service")
+async def test_trim_enforces_limits_in_one_pass(make_service, database_service):
+    service = make_service()
+    flow_id, other_flow_id = uuid4(), uuid4()
+
+    for _ in range(5):
+        await service.add_vertex_build(vertex_build(flow_id))
+        await service.add_transaction(transaction(flow_id))
+    await service.add_transaction(transaction(other_flow_id))
+    await service.flush()
+    assert await count(database_service, VertexBuildTable) == 5
+    assert await count(database_service, TransactionTable) == 6
+
+    await service.trim()
+
+    assert await count(database_service, VertexBuildTable) == 2
+    assert await count(database_service, TransactionTable) == 4
+    await service.stop()
+
+
+async def test_full_queue_applies_backpressure(make_service, database_service):
+    service = make_service(log_writer_queue_size=1)
+    flow_id = uuid4()
+
+    await asyncio.gather(*(service.add_vertex_build(vertex_build(flow_id, f"vertex-{i}")) for i in range(4)))
+    await service.flush()
+
+    stats = service.stats()
+    assert stats["backpressure_waits"] >= 1
+    assert stats["max_queue_depth"] == 1
+    assert await count(database_service, VertexBuildTable) == 4
+    await service.stop()
+
+
+async def test_stop_drains_the_queue(make_service, database_service):
+    service = make_service()
+    flow_id = uuid4()
+
+    await service.add_vertex_build(vertex_build(flow_id))
+    await service.add_transaction(transaction(flow_id))
+    await service.stop()
+
+    assert await count(database_service, VertexBuildTable) == 1
+    assert await count(database_service, TransactionTable) == 1
+
+    # Logs produced after shutdown are written right away
+    await service.add_transaction(transaction(flow_id))
+    assert await count(database_service, TransactionTable) == 2
@@ -0,0 +1,124 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from langflow.services.auth import utils as auth_utils
+from langflow.services.deps import get_settings_service
+from langflow.services.variable.constants import CREDENTIAL_TYPE, GENERIC_TYPE
+from langflow.services.variable.resolver import VariableCache, VariableResolver, variable_cache
+from langflow.services.variable.service import DatabaseVariableService
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+@pytest.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+
+@pytest.fixture
+def service():
+    return DatabaseVariableService(get_settings_service())
+
+
+@pytest.fixture
+def variable_cache_ttl():
+    return 0
+
+
+@pytest.fixture
+def resolver_services(service, session, variable_cache_ttl):
+    @asynccontextmanager
+    async def session_scope():
+        yield session
+
+    settings_service = SimpleNamespace(settings=SimpleNamespace(variable_cache_ttl=variable_cache_ttl))
+    with (
+        patch("langflow.services.variable.resolver.session_scope", session_scope),
+        patch("langflow.services.variable.resolver.get_variable_service", return_value=service),
+        patch("langflow.services.variable.resolver.get_settings_service", return_value=settings_service),
+        patch.object(service, "get_variables", wraps=service.get_variables) as get_variables,
+    ):
+        variable_cache.invalidate()
+        yield get_variables
+        variable_cache.invalidate()
+
+
+async def test_resolver_loads_the_run_variables_at_once(service, session, resolver_services):
+    user_id = uuid4()
+    await service.create_variable(user_id, "OPENAI_API_KEY", "openai", session=session)
+    await service.create_variable(user_id, "MODEL", "gpt", type_=GENERIC_TYPE, session=session)
+    resolver = VariableResolver(["OPENAI_API_KEY", "MODEL"])
+
+    assert await resolver.get(user_id, "OPENAI_API_KEY", "api_key") == "openai"
+    assert await resolver.get(user_id, "MODEL", "model_name") == "gpt"
+    assert await resolver.get(user_id, "OPENAI_API_KEY", "api_key") == "openai"
+
+    resolver_services.assert_called_once()
+    assert set(resolver_services.call_args.args[1]) == {"OPENAI_API_KEY", "MODEL"}
+
+
+async def test_resolver_errors(service, session, resolver_services):
+    user_id = uuid4()
+    await service.create_variable(user_id, "SECRET", "secret", type_=CREDENTIAL_TYPE, session=session)
+    resolver = VariableResolver(["SECRET"])
+
+    with pytest.raises(ValueError, match=r"MISSING variable not found\."):
+        await resolver.get(user_id, "MISSING", "api_key")
+    with pytest.raises(TypeError, match="cannot be used in a Session ID field"):
+        await resolver.get(user_id, "SECRET", "session_id")
+    # The missing variable was loaded together with the run variables, it is not looked up again
+    with pytest.raises(ValueError, match=r"MISSING variable not found\."):
+        await resolver.get(user_id, "MISSING", "api_key")
+    resolver_services.assert_called_once()
+
+
+@pytest.mark.usefixtures("resolver_services")
+async def test_resolver_only_fails_the_variable_that_cannot_be_decrypted(service, session):
+    user_id = uuid4()
+    await service.create_variable(user_id, "GOOD", "good", session=session)
+    await service.create_variable(user_id, "BROKEN", "broken", session=session)
+
+    def decrypt(value, settings_service):
+        decrypted = auth_utils.decrypt_api_key(value, settings_service=settings_service)
+        if decrypted == "broken":
+            msg = "Invalid token"
+            raise ValueError(msg)
+        return decrypted
+
+    resolver = VariableResolver(["GOOD", "BROKEN"])
+    with patch("langflow.services.variable.service.auth_utils", SimpleNamespace(decrypt_api_key=decrypt)):
+        assert await resolver.get(user_id, "GOOD", "api_key") == "good"
+        with pytest.raises(ValueError, match="Invalid token"):
+            await resolver.get(user_id, "BROKEN", "api_key")
+
+
+@pytest.mark.parametrize("variable_cache_ttl", [60])
+async def test_resolver_shares_variables_across_runs_when_cached(service, session, resolver_services):
+    user_id = uuid4()
+    await service.create_variable(user_id, "OPENAI_API_KEY", "openai", session=session)
+
+    assert await VariableResolver(["OPENAI_API_KEY"]).get(user_id, "OPENAI_API_KEY", "api_key") == "openai"
+    assert await VariableResolver(["OPENAI_API_KEY"]).get(user_id, "OPENAI_API_KEY", "api_key") == "openai"
+    resolver_services.assert_called_once()
+
+    variable_cache.invalidate(user_id)
+    await VariableResolver(["OPENAI_API_KEY"]).get(user_id, "OPENAI_API_KEY", "api_key")
+    assert resolver_services.call_count == 2
+
+
+def test_variable_cache_expires_entries():
+    cache = VariableCache()
+    cache.set("user", "name", (GENERIC_TYPE, "value"))
+
+    assert cache.get("user", "name", ttl=60) == (GENERIC_TYPE, "value")
+    with patch("langflow.services.variable.resolver.time.monotonic", return_value=float("inf")):
+        assert cache.get("user", "name", ttl=60) is None
+    assert len(cache) == 0
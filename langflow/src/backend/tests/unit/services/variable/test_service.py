@@ -75,6 +75,28 @@ async def test_get_variable(service, session: AsyncSession):
     assert result == value
 
 
+async def test_get_variables(service, session: AsyncSession):
+    user_id = uuid4()
+    await service.create_variable(user_id, "first", "first value", session=session)
+    await service.create_variable(user_id, "second", "second value", type_="Generic", session=session)
+    await service.create_variable(uuid4(), "first", "other user value", session=session)
+
+    result = await service.get_variables(user_id, ["first", "second", "missing"], session=session)
+
+    assert result == {"first": (CREDENTIAL_TYPE, "first value"), "second": ("Generic", "second value")}
+
+
+async def test_get_variables_raises_when_a_value_cannot_be_decrypted(service, session: AsyncSession):
+    user_id = uuid4()
+    await service.create_variable(user_id, "name", "value", session=session)
+
+    with (
+        patch("langflow.services.variable.service.auth_utils.decrypt_api_key", side_effect=ValueError("Invalid token")),
+        pytest.raises(ValueError, match="Invalid token"),
+    ):
+        await service.get_variables(user_id, ["name"], session=session)
+
+
 async def test_get_variable__valueerror(service, session: AsyncSession):
     user_id = uuid4()
     name = "name"
@@ -0,0 +1,88 @@
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from langflow.processing.prepared_graph import PreparedGraphCache
+from langflow.services.database.models.flow import Flow
+
+
+@pytest.fixture
+def flow(json_memory_chatbot_no_llm):
+    return Flow(
+        id=uuid4(),
+        name="Memory Chatbot",
+        data=json.loads(json_memory_chatbot_no_llm)["data"],
+        updated_at=datetime.now(timezone.utc),
+    )
+
+
+def test_get_graph_reuses_template(flow):
+    cache = PreparedGraphCache()
+
+    first = cache.get_graph(flow, user_id="user")
+    second = cache.get_graph(flow, user_id="user")
+
+    assert cache.stats() == {"size": 1, "max_size": cache.max_size, "hits": 1, "misses": 1}
+    assert first is not second
+    assert first.get_vertex_ids() == second.get_vertex_ids()
+    assert first.predecessor_map == second.predecessor_map
+    assert first.predecessor_map is not second.predecessor_map
+    for vertex in first.vertices:
+        other = second.get_vertex(vertex.id)
+        assert vertex is not other
+        assert vertex.custom_component is not other.custom_component
+        assert vertex.graph is first
+        assert other.graph is second
+
+
+def test_get_graph_does_not_modify_flow_data(flow):
+    cache = PreparedGraphCache()
+    original = json.dumps(flow.data, sort_keys=True)
+    node_id = flow.data["nodes"][0]["id"]
+
+    cache.get_graph(flow, {node_id: {"input_value": "tweaked"}})
+
+    assert json.dumps(flow.data, sort_keys=True) == original
+
+
+def test_get_graph_keys_on_tweaks_and_version(flow):
+    cache = PreparedGraphCache()
+    node_id = flow.data["nodes"][0]["id"]
+
+    cache.get_graph(flow)
+    cache.get_graph(flow, {node_id: {"input_value": "tweaked"}})
+    cache.get_graph(flow, stream=True)
+    flow.updated_at += timedelta(seconds=1)
+    cache.get_graph(flow)
+
+    assert cache.misses == 4
+    assert len(cache) == 4
+
+
+def test_invalidate_flow(flow):
+    cache = PreparedGraphCache()
+    other_flow = Flow(id=uuid4(), name="Other", data=flow.data, updated_at=flow.updated_at)
+    cache.get_graph(flow)
+    cache.get_graph(other_flow)
+
+    cache.invalidate(str(flow.id))
+
+    assert len(cache) == 1
+    cache.get_graph(flow)
+    assert cache.misses == 3
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_get_graph_evicts_least_recently_used(flow):
+    cache = PreparedGraphCache(max_size=1)
+    node_id = flow.data["nodes"][0]["id"]
+
+    cache.get_graph(flow)
+    cache.get_graph(flow, {node_id: {"input_value": "tweaked"}})
+    cache.get_graph(flow)
+
+    assert len(cache) == 1
+    assert cache.misses == 3
@@ -0,0 +1,207 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+import numpy as np
+from .model_registry import ModelRegistry, get_model_registry
+
+class EmbeddingExecutor:
+    """Coalesces concurrent embedding requests for one model into micro-batches
+    
+    A single worker thread encodes with the model shared through the registry. It waits
+    at most max_latency_ms after the first queued request for others to join its batch.
+    """
+    
+    def __init__(self,
+                 model_name: str,
+                 max_batch_size: int = 32,
+                 max_latency_ms: float = 5.0,
+                 registry: Optional[ModelRegistry] = None):
+        """
+        Initialize the embedding executor
+        
+        Args:
+            model_name: Name of the SentenceTransformer model
+            max_batch_size: Maximum number of texts encoded at once
+            max_latency_ms: Longest time a request waits for others to join its batch
+            registry: Registry of loaded models, the process-wide one by default
+        """
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_latency_ms = max_latency_ms
+        self.registry = registry or get_model_registry()
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+        self._queue: "queue.Queue[Optional[Tuple[List[str], Future]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        # Requests are queued under this lock, so none can be queued after the stop sentinel
+        self._submit_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"embedding-executor-{model_name}", daemon=True)
+        self._thread.start()
+    
+    def submit(self, text: str) -> Future:
+        """
+        Queue a text for embedding
+        
+        Args:
+            text: The text to embed
+        
+        Returns:
+            Future resolving to the embedding vector
+        """
+        future = self.submit_many([text])
+        single = Future()
+        
+        def unwrap(done: Future):
+            if done.cancelled():
+                single.cancel()
+            elif done.exception() is not None:
+                single.set_exception(done.exception())
+            else:
+                single.set_result(done.result()[0])
+        
+        future.add_done_callback(unwrap)
+        return single
+    
+    def submit_many(self, texts: Sequence[str]) -> Future:
+        """
+        Queue several texts for embedding, they are encoded in the same batch
+        
+        Args:
+            texts: The texts to embed
+        
+        Returns:
+            Future resolving to a matrix with one embedding per text
+        """
+        future = Future()
+        with self._submit_lock:
+            if self._closed:
+                future.set_exception(RuntimeError("Embedding executor is closed"))
+            else:
+                self._queue.put((list(texts), future))
+        return future
+    
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed several texts, blocking until they are encoded
+        
+        Has the signature of SentenceTransformer.encode for lists, so it can be passed to
+        EmbeddingCache.encode.
+        
+        Args:
+            texts: The texts to embed
+        
+        Returns:
+            Matrix with one embedding per text
+        """
+        return self.submit_many(texts).result()
+    
+    def _run(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            batch = [request]
+            size = len(request[0])
+            stop = False
+            
+            # Gather more requests until the batch is full or the first one has waited long enough
+            deadline = time.monotonic() + self.max_latency_ms / 1000
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+                size += len(request[0])
+            
+            self._encode_batch(batch)
+            if stop:
+                return
+    
+    def _encode_batch(self, batch: List[Tuple[List[str], Future]]):
+        # Callers may have given up on their request in the meantime
+        batch = [(texts, future) for texts, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        
+        try:
+            model = self.registry.get_sentence_transformer(self.model_name)
+            embeddings = np.asarray(model.encode(texts, batch_size=self.max_batch_size))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        
+        with self._lock:
+            self.requests += len(batch)
+            self.batches += 1
+            self.texts += len(texts)
+        
+        start = 0
+        for request_texts, future in batch:
+            future.set_result(embeddings[start:start + len(request_texts)])
+            start += len(request_texts)
+    
+    @property
+    def closed(self) -> bool:
+        """Whether the executor was closed and rejects new requests"""
+        return self._closed
+    
+    def close(self):
+        """Stop the worker once the queued requests are encoded"""
+        with self._submit_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        self._thread.join()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get executor statistics
+        
+        Returns:
+            Dictionary with the number of requests, batches and texts, and the mean batch size
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "texts": self.texts,
+                "mean_batch_size": self.texts / self.batches if self.batches else 0.0,
+                "queued": self._queue.qsize()
+            }
+
+
+_executors: Dict[str, EmbeddingExecutor] = {}
+_executors_lock = threading.Lock()
+
+def get_embedding_executor(model_name: str,
+                           max_batch_size: int = 32,
+                           max_latency_ms: float = 5.0) -> EmbeddingExecutor:
+    """
+    Get the embedding executor of a model, shared by every session of the process
+    
+    Args:
+        model_name: Name of the SentenceTransformer model
+        max_batch_size: Maximum batch size, applied when the executor is created
+        max_latency_ms: Maximum batching delay, applied when the executor is created
+    
+    Returns:
+        Shared EmbeddingExecutor
+    """
+    with _executors_lock:
+        executor = _executors.get(model_name)
+        if executor is None or executor.closed:
+            executor = _executors[model_name] = EmbeddingExecutor(model_name, max_batch_size, max_latency_ms)
+        return executor
@@ -1,19 +1,26 @@
 from typing import Dict, List, Any, Optional, Union
 from .base_model import BaseModel
+from .model_registry import ModelRegistry, get_model_registry
+from utils.embedding_cache import EmbeddingCache
 
 class HuggingFaceModel(BaseModel):
     """Integration with Hugging Face models"""
     
-    def __init__(self, token: Optional[str] = None):
+    def __init__(self,
+                 token: Optional[str] = None,
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 registry: Optional[ModelRegistry] = None):
         """
         Initialize the Hugging Face model
         
         Args:
             token: Hugging Face API token (optional)
+            embedding_cache: Optional cache of previously generated embeddings
+            registry: Registry of loaded models, the process-wide one by default
         """
         self.token = token
-        self.embedding_model = None
-        self.embedding_model_name = None
+        self.registry = registry or get_model_registry()
+        self.embedding_cache = embedding_cache
     
     def query(self, 
              prompt: str, 
@@ -35,18 +42,15 @@ class HuggingFaceModel(BaseModel):
             Response from the model
         """
         try:
-            # Import here to avoid loading dependencies unless needed
-            from transformers import pipeline
-            
             # Combine system prompt and user prompt if provided
             input_text = prompt
             if system_prompt:
                 input_text = f"{system_prompt}\n\n{prompt}"
             
-            # Create pipeline
-            generator = pipeline(
-                "text-generation", 
-                model=model,
+            # Reuse the pipeline loaded by earlier calls
+            generator = self.registry.get_pipeline(
+                "text-generation",
+                model,
                 token=self.token if self.token else None
             )
             
@@ -90,16 +94,14 @@ class HuggingFaceModel(BaseModel):
             Embedding vector as a list of floats, or None if an error occurs
         """
         try:
-            # Import here to avoid loading dependencies unless needed
-            from sentence_transformers import SentenceTransformer
-            
-            # Load model if not loaded or if model name changed
-            if self.embedding_model is None or self.embedding_model_name != model_name:
-                self.embedding_model = SentenceTransformer(model_name)
-                self.embedding_model_name = model_name
+            # Fetched on each call so that the registry can free the model when it is evicted
+            embedding_model = self.registry.get_sentence_transformer(model_name)
             
             # Generate embedding
-            embedding = self.embedding_model.encode(text)
+            if self.embedding_cache is not None:
+                embedding = self.embedding_cache.encode(model_name, [text], embedding_model.encode)[0]
+            else:
+                embedding = embedding_model.encode(text)
             
             # Convert to list and return
             return embedding.tolist()
@@ -119,16 +121,14 @@ class HuggingFaceModel(BaseModel):
             List of embedding vectors, or None if an error occurs
         """
         try:
-            # Import here to avoid loading dependencies unless needed
-            from sentence_transformers import SentenceTransformer
-            
-            # Load model if not loaded or if model name changed
-            if self.embedding_model is None or self.embedding_model_name != model_name:
-                self.embedding_model = SentenceTransformer(model_name)
-                self.embedding_model_name = model_name
-            
-            # Generate embeddings
-            embeddings = self.embedding_model.encode(texts)
+            # Fetched on each call so that the registry can free the model when it is evicted
+            embedding_model = self.registry.get_sentence_transformer(model_name)
+            
+            # Generate embeddings, only encoding the texts that are not cached
+            if self.embedding_cache is not None:
+                embeddings = self.embedding_cache.encode(model_name, texts, embedding_model.encode)
+            else:
+                embeddings = embedding_model.encode(texts)
             
             # Convert to list and return
             return embeddings.tolist()
@@ -0,0 +1,202 @@
+import gc
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+class ModelRegistry:
+    """Process-wide registry of loaded Hugging Face pipelines and SentenceTransformers"""
+    
+    def __init__(self, max_memory_mb: int = 4096):
+        """
+        Initialize the model registry
+        
+        Args:
+            max_memory_mb: Memory budget for loaded models, least recently used are unloaded first
+        """
+        self.max_memory_mb = max_memory_mb
+        # key -> (model, size in bytes), least recently used first
+        self._models: "OrderedDict[Tuple, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One lock per key so that a model is only loaded once when requested concurrently
+        self._load_locks: Dict[Tuple, threading.Lock] = {}
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self._warm_up_thread = None
+    
+    @staticmethod
+    def _key(kind: str, model: str, options: Dict[str, Any]) -> Tuple:
+        return (kind, model, tuple(sorted((name, repr(value)) for name, value in options.items())))
+    
+    def get_pipeline(self, task: str, model: str, token: Optional[str] = None, **options) -> Any:
+        """
+        Get a transformers pipeline, loading it on first use
+        
+        Args:
+            task: Pipeline task, e.g. "text-generation"
+            model: The model name
+            token: Hugging Face API token, only used to download the model
+            **options: Other pipeline arguments, part of the registry key
+        
+        Returns:
+            The pipeline
+        """
+        def load():
+            # Import here to avoid loading dependencies unless needed
+            from transformers import pipeline
+            return pipeline(task, model=model, token=token, **options)
+        
+        return self._get(self._key(f"pipeline:{task}", model, options), load)
+    
+    def get_sentence_transformer(self, model_name: str, **options) -> Any:
+        """
+        Get a SentenceTransformer, loading it on first use
+        
+        Args:
+            model_name: The model name
+            **options: Other SentenceTransformer arguments, part of the registry key
+        
+        Returns:
+            The SentenceTransformer
+        """
+        def load():
+            # Import here to avoid loading dependencies unless needed
+            from sentence_transformers import SentenceTransformer
+            return SentenceTransformer(model_name, **options)
+        
+        return self._get(self._key("sentence_transformer", model_name, options), load)
+    
+    def _get(self, key: Tuple, load: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return self._models[key][0]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        
+        with load_lock:
+            # Another thread may have loaded it while we waited
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self.hits += 1
+                    return self._models[key][0]
+            
+            model = load()
+            size = self._memory_usage(model)
+            
+            with self._lock:
+                self._models[key] = (model, size)
+                self.loads += 1
+                self._load_locks.pop(key, None)
+                self._evict(keep=key)
+            return model
+    
+    @staticmethod
+    def _memory_usage(model: Any) -> int:
+        # Pipelines wrap the torch module, SentenceTransformers are one
+        module = getattr(model, "model", model)
+        try:
+            return sum(p.numel() * p.element_size() for p in module.parameters())
+        except Exception:
+            return 0
+    
+    def _evict(self, keep: Tuple):
+        budget = self.max_memory_mb * 1024 * 1024
+        usage = sum(size for _, size in self._models.values())
+        for key in list(self._models):
+            if usage <= budget:
+                break
+            if key == keep:
+                continue
+            _, size = self._models.pop(key)
+            usage -= size
+            self.evictions += 1
+        # Release the weights of evicted models right away
+        gc.collect()
+    
+    def warm_up(self, models: List[Dict[str, Any]]):
+        """
+        Load models ahead of their first use
+        
+        Args:
+            models: Model specs, either {"sentence_transformer": name} or
+                {"pipeline": task, "model": name} with optional "options"
+        """
+        for spec in models:
+            try:
+                if "sentence_transformer" in spec:
+                    self.get_sentence_transformer(spec["sentence_transformer"], **spec.get("options", {}))
+                else:
+                    self.get_pipeline(spec["pipeline"], spec["model"], **spec.get("options", {}))
+            except Exception as e:
+                print(f"Error warming up model {spec}: {e}")
+    
+    def warm_up_in_background(self, models: List[Dict[str, Any]]) -> threading.Thread:
+        """
+        Load models ahead of their first use without blocking the caller
+        
+        Only the first call starts loading, later calls return the same thread.
+        
+        Args:
+            models: Model specs, as for warm_up
+        
+        Returns:
+            The thread loading the models
+        """
+        with self._lock:
+            if self._warm_up_thread is None:
+                self._warm_up_thread = threading.Thread(target=self.warm_up, args=(models,), daemon=True)
+                self._warm_up_thread.start()
+            return self._warm_up_thread
+    
+    def unload(self, model: Optional[str] = None):
+        """
+        Unload models
+        
+        Args:
+            model: Name of the model to unload, or None to unload every model
+        """
+        with self._lock:
+            for key in [key for key in self._models if model is None or key[1] == model]:
+                del self._models[key]
+        gc.collect()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get registry statistics
+        
+        Returns:
+            Dictionary with the loaded models, their memory usage and the hit, load and eviction counts
+        """
+        with self._lock:
+            return {
+                "models": {f"{key[0]}:{key[1]}": size / (1024 * 1024) for key, (_, size) in self._models.items()},
+                "memory_mb": sum(size for _, size in self._models.values()) / (1024 * 1024),
+                "max_memory_mb": self.max_memory_mb,
+                "hits": self.hits,
+                "loads": self.loads,
+                "evictions": self.evictions
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_model_registry(max_memory_mb: Optional[int] = None) -> ModelRegistry:
+    """
+    Get the model registry shared by every session of the process
+    
+    Args:
+        max_memory_mb: Memory budget, applied when given
+    
+    Returns:
+        Shared ModelRegistry
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        if max_memory_mb is not None:
+            _registry.max_memory_mb = max_memory_mb
+        return _registry
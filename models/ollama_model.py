@@ -1,19 +1,44 @@
-import requests
+import httpx
 import json
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, AsyncIterator
 from .base_model import BaseModel
+from utils.http_client import HTTPClient, get_http_client
 
 class OllamaModel(BaseModel):
     """Integration with Ollama models"""
     
-    def __init__(self, base_url: str = "http://localhost:11434"):
+    def __init__(self, base_url: str = "http://localhost:11434", http_client: Optional[HTTPClient] = None):
         """
         Initialize the Ollama model
         
         Args:
             base_url: Base URL for the Ollama API
+            http_client: Client used for requests, the shared pooled client by default
         """
         self.base_url = base_url
+        self.http_client = http_client or get_http_client()
+    
+    def _payload(self,
+                 prompt: str,
+                 model: str,
+                 system_prompt: Optional[str],
+                 temperature: float,
+                 max_tokens: int,
+                 stream: bool) -> Dict[str, Any]:
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens
+            }
+        }
+        
+        if system_prompt:
+            payload["system"] = system_prompt
+        
+        return payload
     
     def query(self, 
              prompt: str, 
@@ -35,32 +60,84 @@ class OllamaModel(BaseModel):
             Response from the model
         """
         # Prepare request payload
-        payload = {
-            "model": model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": temperature,
-                "num_predict": max_tokens
-            }
-        }
-        
-        if system_prompt:
-            payload["system"] = system_prompt
+        payload = self._payload(prompt, model, system_prompt, temperature, max_tokens, stream=False)
         
         try:
-            # Make request to Ollama API
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json=payload,
-                timeout=30
+            # Make request to Ollama API over a pooled connection
+            result = self.http_client.request_json(
+                self.provider_name, "POST", f"{self.base_url}/api/generate", json_data=payload
             )
             
-            # Check if request was successful
-            response.raise_for_status()
+            return {
+                "text": result.get("response", ""),
+                "model": model,
+                "provider": self.provider_name,
+                "tokens_used": result.get("eval_count", 0)
+            }
             
-            # Parse response
-            result = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            return {
+                "error": str(e),
+                "model": model,
+                "provider": self.provider_name
+            }
+    
+    def stream(self,
+               prompt: str,
+               model: str = "llama2",
+               system_prompt: Optional[str] = None,
+               temperature: float = 0.7,
+               max_tokens: int = 1000) -> Iterator[str]:
+        """
+        Query an Ollama model and yield the response tokens as they are generated
+        
+        Args:
+            prompt: The user prompt
+            model: The model name
+            system_prompt: Optional system prompt
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens to generate
+            
+        Yields:
+            Pieces of the response text
+        
+        Raises:
+            httpx.HTTPError: If the request fails
+            ValueError: If the response isn't JSON
+        """
+        payload = self._payload(prompt, model, system_prompt, temperature, max_tokens, stream=True)
+        
+        for chunk in self.http_client.stream_json_lines(self.provider_name, f"{self.base_url}/api/generate", payload):
+            if chunk.get("response"):
+                yield chunk["response"]
+            if chunk.get("done"):
+                break
+    
+    async def aquery(self,
+                     prompt: str,
+                     model: str = "llama2",
+                     system_prompt: Optional[str] = None,
+                     temperature: float = 0.7,
+                     max_tokens: int = 1000) -> Dict[str, Any]:
+        """
+        Async version of query
+        
+        Args:
+            prompt: The user prompt
+            model: The model name
+            system_prompt: Optional system prompt
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens to generate
+            
+        Returns:
+            Response from the model
+        """
+        payload = self._payload(prompt, model, system_prompt, temperature, max_tokens, stream=False)
+        
+        try:
+            result = await self.http_client.arequest_json(
+                self.provider_name, "POST", f"{self.base_url}/api/generate", json_data=payload
+            )
             
             return {
                 "text": result.get("response", ""),
@@ -69,13 +146,46 @@ class OllamaModel(BaseModel):
                 "tokens_used": result.get("eval_count", 0)
             }
             
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             return {
                 "error": str(e),
                 "model": model,
                 "provider": self.provider_name
             }
     
+    async def astream(self,
+                      prompt: str,
+                      model: str = "llama2",
+                      system_prompt: Optional[str] = None,
+                      temperature: float = 0.7,
+                      max_tokens: int = 1000) -> AsyncIterator[str]:
+        """
+        Async version of stream
+        
+        Args:
+            prompt: The user prompt
+            model: The model name
+            system_prompt: Optional system prompt
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens to generate
+            
+        Yields:
+            Pieces of the response text
+        
+        Raises:
+            httpx.HTTPError: If the request fails
+            ValueError: If the response isn't JSON
+        """
+        payload = self._payload(prompt, model, system_prompt, temperature, max_tokens, stream=True)
+        
+        async for chunk in self.http_client.astream_json_lines(
+            self.provider_name, f"{self.base_url}/api/generate", payload
+        ):
+            if chunk.get("response"):
+                yield chunk["response"]
+            if chunk.get("done"):
+                break
+    
     def get_available_models(self) -> List[str]:
         """
         Get a list of available models from Ollama
@@ -85,23 +195,14 @@ class OllamaModel(BaseModel):
         """
         try:
             # Make request to Ollama API
-            response = requests.get(
-                f"{self.base_url}/api/tags",
-                timeout=10
-            )
-            
-            # Check if request was successful
-            response.raise_for_status()
-            
-            # Parse response
-            result = response.json()
+            result = self.http_client.request_json(self.provider_name, "GET", f"{self.base_url}/api/tags", timeout=10)
             
             # Extract model names
             models = [model["name"] for model in result.get("models", [])]
             
             return models
             
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             print(f"Error getting available models: {e}")
             return []
     
@@ -1,12 +1,126 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable
+import os
 import ast
 import re
+import copy
+import json
+import bisect
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+class _AnalysisVisitor(ast.NodeVisitor):
+    """Collects complexity, code smells, suggestions and metrics in a single pass over the tree"""
+    
+    def __init__(self, long_method: int):
+        self.long_method = long_method
+        self.complexity = 0
+        self.classes = 0
+        self.functions = 0
+        self.imports = 0
+        self.smells: List[Dict[str, Any]] = []
+        self.class_suggestions: List[str] = []
+    
+    def _count_control_flow(self, node: ast.AST):
+        self.complexity += 1
+        self.generic_visit(node)
+    
+    visit_If = visit_For = visit_While = visit_Try = _count_control_flow
+    
+    def visit_BoolOp(self, node: ast.BoolOp):
+        self.complexity += len(node.values) - 1
+        self.generic_visit(node)
+    
+    def _count_import(self, node: ast.AST):
+        self.imports += 1
+        self.generic_visit(node)
+    
+    visit_Import = visit_ImportFrom = _count_import
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self.functions += 1
+        lines = node.end_lineno - node.lineno + 1
+        if lines > self.long_method:
+            self.smells.append({
+                'type': 'long_method',
+                'message': f'Method {node.name} is too long ({lines} lines)',
+                'location': node.lineno
+            })
+        self.generic_visit(node)
+    
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.classes += 1
+        methods = [n for n in node.body if isinstance(n, ast.FunctionDef)]
+        if len(methods) > 10:
+            self.class_suggestions.append(f'Class {node.name} might benefit from being split into smaller classes')
+        self.generic_visit(node)
+
+
+def _analyze_source(code: str, patterns: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse code once and compute its analysis and metrics
+    
+    Module-level so that it can run in worker processes.
+    
+    Args:
+        code: The source code to analyze
+        patterns: Code smell thresholds and best practice patterns
+    
+    Returns:
+        Dictionary with 'analysis' and 'metrics', or 'error' if the code doesn't parse
+    """
+    try:
+        tree = ast.parse(code)
+    except Exception as e:
+        return {'error': str(e)}
+    
+    visitor = _AnalysisVisitor(patterns['code_smells']['long_method'])
+    visitor.visit(tree)
+    
+    # Line numbers of regex matches by binary search over the line offsets
+    line_starts = [0] + [match.end() for match in re.finditer('\n', code)]
+    violations = []
+    for pattern in patterns['best_practices']:
+        for match in re.finditer(pattern, code):
+            line_no = bisect.bisect_right(line_starts, match.start())
+            violations.append({
+                'type': 'best_practice',
+                'message': f'Potential violation of best practices at line {line_no}',
+                'location': line_no
+            })
+    
+    suggestions = []
+    if visitor.imports > 10:
+        suggestions.append('Consider organizing imports into logical groups')
+    suggestions.extend(visitor.class_suggestions)
+    
+    return {
+        'analysis': {
+            'complexity_score': visitor.complexity,
+            'code_smells': visitor.smells,
+            'best_practices': violations,
+            'suggestions': suggestions
+        },
+        'metrics': {
+            'loc': len(line_starts),
+            'classes': visitor.classes,
+            'functions': visitor.functions,
+            'imports': visitor.imports
+        }
+    }
+
 
 class CodeAnalysisService:
     """Service for analyzing code and providing AI-powered insights"""
     
-    def __init__(self):
-        """Initialize the code analysis service"""
+    def __init__(self, cache_path: Optional[str] = None, max_memory_entries: int = 256):
+        """Initialize the code analysis service
+        
+        Args:
+            cache_path: SQLite file caching results by content hash across runs, None to only cache in memory
+            max_memory_entries: Number of results kept in memory
+        """
         self.patterns = {
             'code_smells': {
                 'long_method': 50,  # lines threshold
@@ -19,114 +133,184 @@ class CodeAnalysisService:
                 r'\b(TODO|FIXME)\b'  # pending tasks
             ]
         }
+        self.cache_path = cache_path
+        self.max_memory_entries = max_memory_entries
+        # content hash -> result, least recently used first
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # path -> (mtime, size, content hash), unchanged files are not even read again
+        self._file_hashes: Dict[str, tuple] = {}
+        self._conn = None
+        self._lock = threading.Lock()
     
     def analyze_code(self, code: str) -> Dict[str, Any]:
         """Analyze code for potential improvements and issues
         
         Args:
             code: The source code to analyze
-            
+        
         Returns:
             Dictionary containing analysis results
         """
-        try:
-            tree = ast.parse(code)
-            
-            analysis = {
-                'complexity_score': self._calculate_complexity(tree),
-                'code_smells': self._detect_code_smells(code, tree),
-                'best_practices': self._check_best_practices(code),
-                'suggestions': self._generate_suggestions(code, tree)
-            }
-            
-            return analysis
-        except Exception as e:
-            return {'error': str(e)}
-    
-    def _calculate_complexity(self, tree: ast.AST) -> float:
-        """Calculate code complexity score"""
-        complexity = 0
-        
-        for node in ast.walk(tree):
-            # Count control flow statements
-            if isinstance(node, (ast.If, ast.For, ast.While, ast.Try)):
-                complexity += 1
-            # Count logical operators
-            elif isinstance(node, ast.BoolOp):
-                complexity += len(node.values) - 1
-        
-        return complexity
-    
-    def _detect_code_smells(self, code: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect potential code smells"""
-        smells = []
-        
-        # Check for long methods
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                lines = len(code.split('\n')[node.lineno-1:node.end_lineno])
-                if lines > self.patterns['code_smells']['long_method']:
-                    smells.append({
-                        'type': 'long_method',
-                        'message': f'Method {node.name} is too long ({lines} lines)',
-                        'location': node.lineno
-                    })
-        
-        return smells
-    
-    def _check_best_practices(self, code: str) -> List[Dict[str, Any]]:
-        """Check adherence to best practices"""
-        violations = []
-        
-        for pattern in self.patterns['best_practices']:
-            matches = re.finditer(pattern, code)
-            for match in matches:
-                line_no = code.count('\n', 0, match.start()) + 1
-                violations.append({
-                    'type': 'best_practice',
-                    'message': f'Potential violation of best practices at line {line_no}',
-                    'location': line_no
-                })
-        
-        return violations
-    
-    def _generate_suggestions(self, code: str, tree: ast.AST) -> List[str]:
-        """Generate improvement suggestions"""
-        suggestions = []
-        
-        # Analyze imports
-        imports = [node for node in ast.walk(tree) if isinstance(node, (ast.Import, ast.ImportFrom))]
-        if len(imports) > 10:
-            suggestions.append('Consider organizing imports into logical groups')
-        
-        # Analyze class complexity
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                methods = [n for n in node.body if isinstance(n, ast.FunctionDef)]
-                if len(methods) > 10:
-                    suggestions.append(f'Class {node.name} might benefit from being split into smaller classes')
-        
-        return suggestions
+        result = self._analyze(code)
+        # A copy, callers must not change the cached result
+        return copy.deepcopy(result.get('analysis', result))
     
     def get_code_metrics(self, code: str) -> Dict[str, Any]:
         """Calculate various code metrics
         
         Args:
             code: The source code to analyze
-            
+        
         Returns:
             Dictionary containing code metrics
         """
-        try:
-            tree = ast.parse(code)
+        result = self._analyze(code)
+        return copy.deepcopy(result.get('metrics', result))
+    
+    def analyze_paths(self,
+                      paths: Iterable[str],
+                      max_workers: Optional[int] = None,
+                      extensions: Iterable[str] = (".py",)) -> Dict[str, Dict[str, Any]]:
+        """Analyze files across a process pool, reusing results of unchanged files
+        
+        Args:
+            paths: Files or directories, directories are searched recursively
+            max_workers: Number of worker processes, defaults to the number of CPUs
+            extensions: File extensions to include when searching directories
+        
+        Returns:
+            Dictionary mapping each file path to its own copy of its 'analysis' and 'metrics', or 'error'
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        # content hash -> (code, paths with that content)
+        pending: Dict[str, tuple] = {}
+        
+        for path in self._expand_paths(paths, tuple(extensions)):
+            try:
+                digest, code = self._file_hash(path)
+            except (OSError, UnicodeDecodeError) as e:
+                results[path] = {'error': str(e)}
+                continue
             
-            metrics = {
-                'loc': len(code.split('\n')),
-                'classes': len([node for node in ast.walk(tree) if isinstance(node, ast.ClassDef)]),
-                'functions': len([node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]),
-                'imports': len([node for node in ast.walk(tree) if isinstance(node, (ast.Import, ast.ImportFrom))])
-            }
+            cached = self._cache_get(digest)
+            if cached is not None:
+                results[path] = copy.deepcopy(cached)
+            elif digest in pending:
+                pending[digest][1].append(path)
+            else:
+                if code is None:
+                    code = self._read(path)
+                pending[digest] = (code, [path])
+        
+        if pending:
+            digests = list(pending)
+            codes = [pending[digest][0] for digest in digests]
+            patterns = [self.patterns] * len(codes)
+            workers = max_workers or os.cpu_count() or 1
+            if len(codes) == 1 or workers == 1:
+                computed = list(map(_analyze_source, codes, patterns))
+            else:
+                # Several files per task keep the inter-process overhead low
+                chunksize = max(1, len(codes) // (4 * workers))
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    computed = list(executor.map(_analyze_source, codes, patterns, chunksize=chunksize))
             
-            return metrics
-        except Exception as e:
-            return {'error': str(e)}
\ No newline at end of file
+            self._cache_put_many(zip(digests, computed, strict=True))
+            for digest, result in zip(digests, computed, strict=True):
+                for path in pending[digest][1]:
+                    results[path] = copy.deepcopy(result)
+        
+        return results
+    
+    @staticmethod
+    def _expand_paths(paths: Iterable[str], extensions: tuple) -> Iterable[str]:
+        for path in paths:
+            if not os.path.isdir(path):
+                yield path
+                continue
+            for root, dirs, files in os.walk(path):
+                # Skip hidden directories such as .git
+                dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+                for name in sorted(files):
+                    if name.endswith(extensions):
+                        yield os.path.join(root, name)
+    
+    @staticmethod
+    def _read(path: str) -> str:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    def _file_hash(self, path: str) -> tuple:
+        # Returns the content hash and, if the file had to be read, its code
+        stat = os.stat(path)
+        known = self._file_hashes.get(path)
+        if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            return known[2], None
+        code = self._read(path)
+        digest = self._content_hash(code)
+        self._file_hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest, code
+    
+    def _content_hash(self, code: str) -> str:
+        # Results depend on the patterns as well as the code
+        settings = json.dumps(self.patterns, sort_keys=True)
+        return hashlib.sha256(f"{settings}\0{code}".encode('utf-8')).hexdigest()
+    
+    def _analyze(self, code: str) -> Dict[str, Any]:
+        # analyze_code and get_code_metrics are usually called on the same code, it is parsed once
+        digest = self._content_hash(code)
+        result = self._cache_get(digest)
+        if result is None:
+            result = _analyze_source(code, self.patterns)
+            self._cache_put(digest, result)
+        return result
+    
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self.cache_path is None:
+            return None
+        if self._conn is None:
+            directory = os.path.dirname(self.cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.cache_path, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS results (hash TEXT PRIMARY KEY, result TEXT NOT NULL)")
+            self._conn.commit()
+        return self._conn
+    
+    def _cache_get(self, digest: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._memory.get(digest)
+            if result is not None:
+                self._memory.move_to_end(digest)
+                return result
+            
+            conn = self._db()
+            if conn is None:
+                return None
+            row = conn.execute("SELECT result FROM results WHERE hash = ?", (digest,)).fetchone()
+            if row is None:
+                return None
+            result = json.loads(row[0])
+            self._remember(digest, result)
+            return result
+    
+    def _cache_put(self, digest: str, result: Dict[str, Any]):
+        self._cache_put_many([(digest, result)])
+    
+    def _cache_put_many(self, items: Iterable[tuple]):
+        items = list(items)
+        with self._lock:
+            for digest, result in items:
+                self._remember(digest, result)
+            conn = self._db()
+            if conn is not None:
+                # One transaction for the whole batch
+                conn.executemany("INSERT OR REPLACE INTO results (hash, result) VALUES (?, ?)",
+                                 [(digest, json.dumps(result)) for digest, result in items])
+                conn.commit()
+    
+    def _remember(self, digest: str, result: Dict[str, Any]):
+        self._memory[digest] = result
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
@@ -1,14 +1,46 @@
 import os
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Optional, Union
 import numpy as np
+from utils.embedding_cache import EmbeddingCache
+from models.model_registry import get_model_registry
+from models.embedding_executor import EmbeddingExecutor, get_embedding_executor
 
 class EmbeddingService:
     """Service for generating embeddings from text using various models"""
     
-    def __init__(self):
-        """Initialize the embedding service"""
-        self.model = None
+    def __init__(self,
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 micro_batching: bool = True,
+                 max_batch_size: int = 32,
+                 max_latency_ms: float = 5.0):
+        """
+        Initialize the embedding service
+        
+        Args:
+            embedding_cache: Optional cache of previously generated embeddings
+            micro_batching: Whether single texts are encoded through the executor shared by all
+                sessions, which batches concurrent requests together
+            max_batch_size: Maximum micro-batch size
+            max_latency_ms: Longest time a text waits for others to join its micro-batch
+        """
         self.model_name = None
+        self.embedding_cache = embedding_cache
+        self.micro_batching = micro_batching
+        self.max_batch_size = max_batch_size
+        self.max_latency_ms = max_latency_ms
+        self.executor: Optional[EmbeddingExecutor] = None
+    
+    @property
+    def model(self) -> Any:
+        """
+        The SentenceTransformer of the loaded model, or None if no model is loaded
+        
+        It is fetched from the registry on each use rather than kept, so that the registry can
+        actually free it when it is evicted.
+        """
+        if self.model_name is None:
+            return None
+        return get_model_registry().get_sentence_transformer(self.model_name)
     
     def load_model(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
         """
@@ -18,12 +50,11 @@ class EmbeddingService:
             model_name: Name of the model to load
         """
         try:
-            # Import here to avoid loading dependencies unless needed
-            from sentence_transformers import SentenceTransformer
-            
-            # Load the model
-            self.model = SentenceTransformer(model_name)
+            # Load the model, or reuse the one already loaded by another session
+            get_model_registry().get_sentence_transformer(model_name)
             self.model_name = model_name
+            if self.micro_batching:
+                self.executor = get_embedding_executor(model_name, self.max_batch_size, self.max_latency_ms)
             
             return True
         except Exception as e:
@@ -40,13 +71,17 @@ class EmbeddingService:
         Returns:
             Embedding vector as a list of floats, or None if an error occurs
         """
-        if self.model is None:
+        if self.model_name is None:
             if not self.load_model():
                 return None
         
         try:
-            # Generate embedding
-            embedding = self.model.encode(text)
+            # Generate embedding, batched with the concurrent requests of other sessions
+            encode = self.executor.encode if self.executor is not None else self.model.encode
+            if self.embedding_cache is not None:
+                embedding = self.embedding_cache.encode(self.model_name, [text], encode)[0]
+            else:
+                embedding = encode([text])[0]
             
             # Convert to list and return
             return embedding.tolist()
@@ -64,13 +99,17 @@ class EmbeddingService:
         Returns:
             List of embedding vectors, or None if an error occurs
         """
-        if self.model is None:
+        if self.model_name is None:
             if not self.load_model():
                 return None
         
         try:
-            # Generate embeddings
-            embeddings = self.model.encode(texts)
+            # Generate embeddings, only encoding the texts that are not cached
+            model = self.model
+            if self.embedding_cache is not None:
+                embeddings = self.embedding_cache.encode(self.model_name, texts, model.encode)
+            else:
+                embeddings = model.encode(texts)
             
             # Convert to list and return
             return embeddings.tolist()
@@ -78,6 +117,47 @@ class EmbeddingService:
             print(f"Error generating embeddings: {e}")
             return None
     
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        """
+        Count the tokens of several texts with the model's tokenizer in one batch
+        
+        Args:
+            texts: Texts to count tokens of
+            
+        Returns:
+            Number of tokens of each text, without special tokens
+        """
+        if self.model_name is None:
+            if not self.load_model():
+                raise RuntimeError("Embedding model could not be loaded")
+        
+        encoded = self.model.tokenizer(
+            texts,
+            add_special_tokens=False,
+            return_attention_mask=False,
+            return_token_type_ids=False
+        )
+        return [len(ids) for ids in encoded["input_ids"]]
+    
+    def max_tokens(self) -> Optional[int]:
+        """
+        Get the number of tokens of text the model embeds before truncating
+        
+        Returns:
+            Maximum sequence length without special tokens, or None if unknown
+        """
+        if self.model_name is None:
+            if not self.load_model():
+                return None
+        
+        model = self.model
+        max_seq_length = getattr(model, "max_seq_length", None)
+        if not max_seq_length:
+            return None
+        # Room for the special tokens, e.g. [CLS] and [SEP]
+        special = model.tokenizer.num_special_tokens_to_add(pair=False)
+        return max_seq_length - special
+    
     def compute_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """
         Compute cosine similarity between two embeddings
@@ -104,30 +184,214 @@ class EmbeddingService:
         
         return dot_product / (norm1 * norm2)
     
+    def build_index(self, embeddings: List[List[float]], metric: str = "cosine") -> "SimilarityIndex":
+        """
+        Build a similarity index that can be reused across queries
+        
+        Args:
+            embeddings: List of embedding vectors to search
+            metric: Similarity metric, one of "cosine", "dot" or "l2"
+            
+        Returns:
+            SimilarityIndex over the embeddings
+        """
+        return SimilarityIndex(embeddings, metric=metric)
+    
     def find_most_similar(self, 
                          query_embedding: List[float], 
-                         embeddings: List[List[float]], 
-                         top_k: int = 5) -> List[Dict[str, Any]]:
+                         embeddings: Union[List[List[float]], "SimilarityIndex"], 
+                         top_k: int = 5,
+                         metric: str = "cosine") -> List[Dict[str, Any]]:
         """
         Find the most similar embeddings to a query embedding
         
         Args:
             query_embedding: The query embedding vector
-            embeddings: List of embedding vectors to compare against
+            embeddings: List of embedding vectors to compare against, or an index from build_index
             top_k: Number of top results to return
+            metric: Similarity metric used when embeddings is a list
             
         Returns:
             List of dictionaries with index and similarity score
         """
-        similarities = []
+        return self.find_most_similar_batch([query_embedding], embeddings, top_k=top_k, metric=metric)[0]
+    
+    def find_most_similar_batch(self,
+                                query_embeddings: List[List[float]],
+                                embeddings: Union[List[List[float]], "SimilarityIndex"],
+                                top_k: int = 5,
+                                metric: str = "cosine") -> List[List[Dict[str, Any]]]:
+        """
+        Find the most similar embeddings to each of several query embeddings
+        
+        Args:
+            query_embeddings: The query embedding vectors
+            embeddings: List of embedding vectors to compare against, or an index from build_index
+            top_k: Number of top results to return per query
+            metric: Similarity metric used when embeddings is a list
+            
+        Returns:
+            One list of dictionaries with index and similarity score per query
+        """
+        index = embeddings if isinstance(embeddings, SimilarityIndex) else SimilarityIndex(embeddings, metric=metric)
+        return index.search_batch(query_embeddings, top_k=top_k)
+
+
+class SimilarityIndex:
+    """Matrix of embeddings scored with vectorized NumPy operations"""
+    
+    METRICS = ("cosine", "dot", "l2")
+    
+    def __init__(self, embeddings: List[List[float]], metric: str = "cosine"):
+        """
+        Initialize the index
+        
+        Args:
+            embeddings: List of embedding vectors
+            metric: Similarity metric, one of "cosine", "dot" or "l2"
+        """
+        if metric not in self.METRICS:
+            raise ValueError(f"Unknown similarity metric: {metric}")
+        
+        self.metric = metric
+        
+        # Keep a single contiguous float32 matrix so that scoring is one BLAS call
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.size == 0:
+            matrix = matrix.reshape(0, 0)
+        elif matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        self._matrix = np.ascontiguousarray(matrix)
+        self._size = self._matrix.shape[0]
+        
+        # Norms only depend on the embeddings, so they are computed once
+        self._squared_norms = np.einsum("ij,ij->i", self._matrix, self._matrix)
+        self._norms = np.sqrt(self._squared_norms)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @property
+    def matrix(self) -> np.ndarray:
+        """Matrix of the embeddings, one per row"""
+        return self._matrix[:self._size]
+    
+    @property
+    def squared_norms(self) -> np.ndarray:
+        """Squared norm of each embedding"""
+        return self._squared_norms[:self._size]
+    
+    @property
+    def norms(self) -> np.ndarray:
+        """Norm of each embedding"""
+        return self._norms[:self._size]
+    
+    def add(self, embeddings: List[List[float]]) -> None:
+        """
+        Append embeddings to the index, they get the next indexes
+        
+        Args:
+            embeddings: List of embedding vectors of the same dimension as the index
+        """
+        vectors = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        if vectors.size == 0:
+            return
+        if self._size and vectors.shape[1] != self._matrix.shape[1]:
+            raise ValueError(f"Expected embeddings of dimension {self._matrix.shape[1]}, got {vectors.shape[1]}")
+        
+        end = self._size + vectors.shape[0]
+        if end > self._matrix.shape[0] or not self._size:
+            # Grow geometrically so that adding one embedding at a time stays linear overall
+            capacity = max(end, 2 * self._matrix.shape[0])
+            matrix = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+            squared_norms = np.empty(capacity, dtype=np.float32)
+            norms = np.empty(capacity, dtype=np.float32)
+            if self._size:
+                matrix[:self._size] = self.matrix
+                squared_norms[:self._size] = self.squared_norms
+                norms[:self._size] = self.norms
+            self._matrix, self._squared_norms, self._norms = matrix, squared_norms, norms
+        
+        self._matrix[self._size:end] = vectors
+        self._squared_norms[self._size:end] = np.einsum("ij,ij->i", vectors, vectors)
+        self._norms[self._size:end] = np.sqrt(self._squared_norms[self._size:end])
+        self._size = end
+    
+    def score(self, query_embeddings: List[List[float]]) -> np.ndarray:
+        """
+        Score every embedding against each query
+        
+        Args:
+            query_embeddings: The query embedding vectors
+            
+        Returns:
+            Matrix of shape (queries, embeddings) where a higher score means more similar
+        """
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        dot_products = queries @ self.matrix.T
+        
+        if self.metric == "dot":
+            return dot_products
+        
+        query_squared_norms = np.einsum("ij,ij->i", queries, queries)
+        
+        if self.metric == "cosine":
+            denominators = np.outer(np.sqrt(query_squared_norms), self.norms)
+            # Zero vectors have a similarity of 0, as in compute_similarity
+            return np.divide(dot_products, denominators,
+                             out=np.zeros_like(dot_products), where=denominators > 0)
+        
+        # ||q - x||^2 = ||q||^2 + ||x||^2 - 2 q.x, clipped for rounding errors
+        squared_distances = query_squared_norms[:, None] + self.squared_norms[None, :] - 2 * dot_products
+        distances = np.sqrt(np.maximum(squared_distances, 0))
+        # Same distance to score conversion as VectorStoreService.search
+        return 1 / (1 + distances)
+    
+    def search(self, query_embedding: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Find the embeddings most similar to a query
+        
+        Args:
+            query_embedding: The query embedding vector
+            top_k: Number of top results to return
+            
+        Returns:
+            List of dictionaries with index and similarity score
+        """
+        return self.search_batch([query_embedding], top_k=top_k)[0]
+    
+    def search_batch(self, query_embeddings: List[List[float]], top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Find the embeddings most similar to each query
+        
+        Args:
+            query_embeddings: The query embedding vectors
+            top_k: Number of top results to return per query
+            
+        Returns:
+            One list of dictionaries with index and similarity score per query, best first
+        """
+        if len(query_embeddings) == 0:
+            return []
+        
+        k = min(top_k, len(self))
+        if k <= 0:
+            return [[] for _ in range(len(query_embeddings))]
         
-        # Compute similarities
-        for i, embedding in enumerate(embeddings):
-            similarity = self.compute_similarity(query_embedding, embedding)
-            similarities.append({"index": i, "score": similarity})
+        scores = self.score(query_embeddings)
         
-        # Sort by similarity score (descending)
-        similarities.sort(key=lambda x: x["score"], reverse=True)
+        # Select the top-k in linear time, then only sort those k
+        if k < scores.shape[1]:
+            top_indices = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top_indices = np.broadcast_to(np.arange(k), (scores.shape[0], k))
+        top_scores = np.take_along_axis(scores, top_indices, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top_indices = np.take_along_axis(top_indices, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
         
-        # Return top-k results
-        return similarities[:top_k]
+        return [
+            [{"index": int(index), "score": float(score)}
+             for index, score in zip(row_indices, row_scores, strict=True)]
+            for row_indices, row_scores in zip(top_indices, top_scores, strict=True)
+        ]
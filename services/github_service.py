@@ -1,16 +1,34 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Iterable, Tuple
+import re
 import requests
 import base64
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from requests.utils import parse_header_links
+from utils.http_cache import HTTPCache
 
 class GitHubService:
     """Service for interacting with GitHub API"""
     
-    def __init__(self, token: Optional[str] = None):
+    def __init__(self,
+                 token: Optional[str] = None,
+                 cache_path: Optional[str] = "./data/github_cache.db",
+                 cache_max_entries: int = 20000,
+                 cache_ttl: Optional[float] = 30 * 86400,
+                 max_workers: int = 8,
+                 per_page: int = 100,
+                 timeout: float = 30):
         """Initialize the GitHub service
         
         Args:
             token: GitHub personal access token
+            cache_path: SQLite file caching responses for conditional requests, None to disable
+            cache_max_entries: Maximum number of cached responses
+            cache_ttl: Seconds a cached response is kept after it was last validated, None for no limit
+            max_workers: Number of concurrent requests when fetching blobs
+            per_page: Page size of paginated lists, at most 100
+            timeout: Request timeout in seconds
         """
         self.token = token
         self.base_url = "https://api.github.com"
@@ -18,6 +36,17 @@ class GitHubService:
         if token:
             self.headers["Authorization"] = f"token {token}"
         self.headers["Accept"] = "application/vnd.github.v3+json"
+        self.max_workers = max_workers
+        self.per_page = per_page
+        self.timeout = timeout
+        self.rate_limit_remaining: Optional[int] = None
+        
+        # One pooled session, large enough for the concurrent blob fetches
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(max_workers, 10))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.cache = HTTPCache(cache_path, max_entries=cache_max_entries, ttl=cache_ttl) if cache_path else None
     
     def set_token(self, token: str) -> None:
         """Set or update the GitHub token
@@ -28,17 +57,108 @@ class GitHubService:
         self.token = token
         self.headers["Authorization"] = f"token {token}"
     
+    def _get(self, url: str, params: Optional[Dict[str, Any]] = None,
+             immutable: bool = False) -> Tuple[int, Any, Dict[str, str]]:
+        """Make a GET request, revalidating cached responses
+        
+        Cached responses are sent with If-None-Match / If-Modified-Since, GitHub answers
+        304 Not Modified without counting the request against the rate limit.
+        
+        Args:
+            url: API path or absolute URL
+            params: Query parameters
+            immutable: Whether the response can never change, e.g. a blob, cached responses
+                are then used without any request
+            
+        Returns:
+            Status code, parsed body (None unless 200) and the Link header URLs by relation
+        """
+        if not url.startswith(("http://", "https://")):
+            url = f"{self.base_url}{url}"
+        headers = dict(self.headers)
+        key = entry = None
+        
+        if self.cache is not None:
+            key = self.cache.key(url, params, self.headers.get("Authorization"))
+            entry = self.cache.get(key)
+            if entry is not None and immutable:
+                self.cache.record("hit")
+                return 200, entry["body"], self._links(entry["link"])
+            headers.update(self.cache.validators(entry))
+        
+        response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        if remaining is not None:
+            self.rate_limit_remaining = int(remaining)
+        
+        if response.status_code == 304 and entry is not None:
+            self.cache.record("revalidated")
+            self.cache.refresh(key)
+            return 200, entry["body"], self._links(entry["link"])
+        if response.status_code != 200:
+            return response.status_code, None, {}
+        
+        body = response.json()
+        link = response.headers.get("Link")
+        if self.cache is not None:
+            self.cache.record("miss")
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified or immutable:
+                self.cache.put(key, body, etag=etag, last_modified=last_modified, link=link)
+        return 200, body, self._links(link)
+    
+    @staticmethod
+    def _links(link: Optional[str]) -> Dict[str, str]:
+        if not link:
+            return {}
+        return {item["rel"]: item["url"] for item in parse_header_links(link) if "rel" in item}
+    
+    @staticmethod
+    def _decode(content: Dict[str, Any]) -> Dict[str, Any]:
+        if content.get("encoding") == "base64" and content.get("content"):
+            # Decode base64 content, binary files are left without decoded_content
+            try:
+                content["decoded_content"] = base64.b64decode(content["content"]).decode("utf-8")
+            except UnicodeDecodeError:
+                pass
+        return content
+    
+    def paginate(self, url: str, params: Optional[Dict[str, Any]] = None,
+                 error: str = "Failed to list items") -> Iterator[Dict[str, Any]]:
+        """Iterate over every item of a paginated list, following the Link header
+        
+        Pages are requested as the iteration reaches them.
+        
+        Args:
+            url: API path or absolute URL
+            params: Query parameters of the first page
+            error: Message of the error item yielded if a page fails
+            
+        Yields:
+            List items, or a final {"error": ...} item if a page fails
+        """
+        params = {"per_page": self.per_page, **(params or {})}
+        while url:
+            status, body, links = self._get(url, params)
+            if status != 200:
+                yield {"error": f"{error}: {status}"}
+                return
+            yield from body
+            # The next URL already carries the query parameters
+            url, params = links.get("next"), None
+    
     def get_user_info(self) -> Dict[str, Any]:
         """Get authenticated user information
         
         Returns:
             Dictionary containing user information
         """
-        response = requests.get(f"{self.base_url}/user", headers=self.headers)
-        if response.status_code == 200:
-            return response.json()
+        status, body, _ = self._get("/user")
+        if status == 200:
+            return body
         else:
-            return {"error": f"Failed to get user info: {response.status_code}"}
+            return {"error": f"Failed to get user info: {status}"}
     
     def list_repositories(self) -> List[Dict[str, Any]]:
         """List repositories for the authenticated user
@@ -46,11 +166,7 @@ class GitHubService:
         Returns:
             List of repositories
         """
-        response = requests.get(f"{self.base_url}/user/repos", headers=self.headers)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return [{"error": f"Failed to list repositories: {response.status_code}"}]
+        return list(self.paginate("/user/repos", error="Failed to list repositories"))
     
     def get_repository(self, owner: str, repo: str) -> Dict[str, Any]:
         """Get repository information
@@ -62,11 +178,11 @@ class GitHubService:
         Returns:
             Repository information
         """
-        response = requests.get(f"{self.base_url}/repos/{owner}/{repo}", headers=self.headers)
-        if response.status_code == 200:
-            return response.json()
+        status, body, _ = self._get(f"/repos/{owner}/{repo}")
+        if status == 200:
+            return body
         else:
-            return {"error": f"Failed to get repository: {response.status_code}"}
+            return {"error": f"Failed to get repository: {status}"}
     
     def get_file_contents(self, owner: str, repo: str, path: str, ref: str = "main") -> Dict[str, Any]:
         """Get file contents from a repository
@@ -80,18 +196,12 @@ class GitHubService:
         Returns:
             File content and metadata
         """
-        url = f"{self.base_url}/repos/{owner}/{repo}/contents/{path}?ref={ref}"
-        response = requests.get(url, headers=self.headers)
+        status, body, _ = self._get(f"/repos/{owner}/{repo}/contents/{path}", {"ref": ref})
         
-        if response.status_code == 200:
-            content = response.json()
-            if content.get("encoding") == "base64" and content.get("content"):
-                # Decode base64 content
-                decoded_content = base64.b64decode(content["content"]).decode("utf-8")
-                content["decoded_content"] = decoded_content
-            return content
+        if status == 200:
+            return self._decode(dict(body))
         else:
-            return {"error": f"Failed to get file contents: {response.status_code}"}
+            return {"error": f"Failed to get file contents: {status}"}
     
     def list_issues(self, owner: str, repo: str, state: str = "open") -> List[Dict[str, Any]]:
         """List issues for a repository
@@ -104,16 +214,11 @@ class GitHubService:
         Returns:
             List of issues
         """
-        response = requests.get(
-            f"{self.base_url}/repos/{owner}/{repo}/issues",
-            headers=self.headers,
-            params={"state": state}
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return [{"error": f"Failed to list issues: {response.status_code}"}]
+        return list(self.paginate(
+            f"/repos/{owner}/{repo}/issues",
+            params={"state": state},
+            error="Failed to list issues"
+        ))
     
     def create_issue(self, owner: str, repo: str, title: str, body: str, labels: List[str] = None) -> Dict[str, Any]:
         """Create a new issue
@@ -136,10 +241,11 @@ class GitHubService:
         if labels:
             data["labels"] = labels
         
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/repos/{owner}/{repo}/issues",
             headers=self.headers,
-            json=data
+            json=data,
+            timeout=self.timeout
         )
         
         if response.status_code == 201:
@@ -158,18 +264,14 @@ class GitHubService:
         Returns:
             List of pull requests
         """
-        response = requests.get(
-            f"{self.base_url}/repos/{owner}/{repo}/pulls",
-            headers=self.headers,
-            params={"state": state}
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return [{"error": f"Failed to list pull requests: {response.status_code}"}]
+        return list(self.paginate(
+            f"/repos/{owner}/{repo}/pulls",
+            params={"state": state},
+            error="Failed to list pull requests"
+        ))
     
-    def get_repository_structure(self, owner: str, repo: str, path: str = "", ref: str = "main") -> List[Dict[str, Any]]:
+    def get_repository_structure(self, owner: str, repo: str, path: str = "",
+                                 ref: str = "main") -> List[Dict[str, Any]]:
         """Get repository file structure
         
         Args:
@@ -181,10 +283,115 @@ class GitHubService:
         Returns:
             List of files and directories
         """
-        url = f"{self.base_url}/repos/{owner}/{repo}/contents/{path}?ref={ref}"
-        response = requests.get(url, headers=self.headers)
+        status, body, _ = self._get(f"/repos/{owner}/{repo}/contents/{path}", {"ref": ref})
         
-        if response.status_code == 200:
-            return response.json()
+        if status == 200:
+            return body
+        else:
+            return [{"error": f"Failed to get repository structure: {status}"}]
+    
+    def get_tree(self, owner: str, repo: str, ref: str = "main", recursive: bool = True) -> Dict[str, Any]:
+        """Get the whole file tree of a repository in one request
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            ref: Branch, tag or commit SHA
+            recursive: Whether to include the contents of subdirectories
+            
+        Returns:
+            Tree with its "sha", the "tree" entries (path, type, sha, size) and whether it was "truncated"
+        """
+        params = {"recursive": 1} if recursive else None
+        # The tree of a commit SHA never changes
+        immutable = re.fullmatch(r"[0-9a-f]{40}", ref) is not None
+        status, body, _ = self._get(f"/repos/{owner}/{repo}/git/trees/{ref}", params, immutable=immutable)
+        
+        if status == 200:
+            return body
+        else:
+            return {"error": f"Failed to get repository tree: {status}"}
+    
+    def get_blob(self, owner: str, repo: str, sha: str) -> Dict[str, Any]:
+        """Get a blob by its SHA
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            sha: Blob SHA
+            
+        Returns:
+            Blob content and metadata
+        """
+        # Blobs are content-addressed, a cached blob is never requested again
+        status, body, _ = self._get(f"/repos/{owner}/{repo}/git/blobs/{sha}", immutable=True)
+        
+        if status == 200:
+            return self._decode(dict(body))
         else:
-            return [{"error": f"Failed to get repository structure: {response.status_code}"}]
\ No newline at end of file
+            return {"error": f"Failed to get blob: {status}"}
+    
+    def get_blobs(self, owner: str, repo: str, shas: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several blobs concurrently
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            shas: Blob SHAs
+            
+        Returns:
+            Blob content and metadata by SHA
+        """
+        shas = list(dict.fromkeys(shas))
+        
+        def fetch(sha: str) -> Dict[str, Any]:
+            try:
+                return self.get_blob(owner, repo, sha)
+            except requests.RequestException as e:
+                return {"error": f"Failed to get blob: {e}"}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(zip(shas, executor.map(fetch, shas), strict=True))
+    
+    def get_repository_files(self,
+                             owner: str,
+                             repo: str,
+                             ref: str = "main",
+                             extensions: Optional[Iterable[str]] = None,
+                             max_file_size: int = 1024 * 1024) -> Dict[str, Any]:
+        """Get the contents of every file of a repository for whole-repository analysis
+        
+        Uses one tree request and concurrent blob requests instead of walking the contents API.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            ref: Branch, tag or commit SHA
+            extensions: File extensions to include, e.g. [".py", ".js"], None for every file
+            max_file_size: Files larger than this many bytes are skipped
+            
+        Returns:
+            Dictionary with the decoded "files" by path, the "errors" by path and whether the tree was "truncated"
+        """
+        tree = self.get_tree(owner, repo, ref)
+        if "error" in tree:
+            return tree
+        
+        extensions = tuple(extensions) if extensions else None
+        entries = [
+            entry for entry in tree.get("tree", [])
+            if entry["type"] == "blob"
+            and entry.get("size", 0) <= max_file_size
+            and (extensions is None or entry["path"].endswith(extensions))
+        ]
+        blobs = self.get_blobs(owner, repo, [entry["sha"] for entry in entries])
+        
+        files, errors = {}, {}
+        for entry in entries:
+            blob = blobs[entry["sha"]]
+            if "error" in blob:
+                errors[entry["path"]] = blob["error"]
+            elif "decoded_content" in blob or blob.get("size") == 0:
+                files[entry["path"]] = blob.get("decoded_content", "")
+        
+        return {"files": files, "errors": errors, "truncated": tree.get("truncated", False)}
\ No newline at end of file
@@ -1,18 +1,68 @@
-import requests
+import httpx
 import json
 import os
-from typing import Dict, List, Any, Optional
+import time
+import random
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Iterator, AsyncIterator
+from utils.http_client import HTTPClient, get_http_client
+from utils.response_cache import ResponseCache
 
 class ModelService:
     """Service for interacting with various AI model providers"""
     
-    def __init__(self):
-        """Initialize the model service"""
+    def __init__(self, http_client: Optional[HTTPClient] = None, response_cache: Optional[ResponseCache] = None):
+        """
+        Initialize the model service
+        
+        Args:
+            http_client: Client used for provider requests, the shared pooled client by default
+            response_cache: Optional cache of previous responses
+        """
         self.providers = {}
+        self.http_client = http_client or get_http_client()
+        self.response_cache = response_cache
     
     def set_provider_config(self, provider_configs: Dict[str, Dict[str, Any]]):
         """Set the provider configurations"""
         self.providers = provider_configs
+        
+        # Providers may set their own timeout and concurrency limit
+        for provider, config in provider_configs.items():
+            self.http_client.configure(
+                provider,
+                timeout=config.get("timeout"),
+                max_concurrency=config.get("max_concurrency")
+            )
+    
+    def _ollama_request(self,
+                        prompt: str,
+                        model: str,
+                        system_prompt: Optional[str],
+                        temperature: float,
+                        max_tokens: int,
+                        stream: bool) -> tuple:
+        if not self.providers.get("ollama", {}).get("active", False):
+            raise ValueError("Ollama provider is not active")
+        
+        base_url = self.providers.get("ollama", {}).get("base_url", "http://localhost:11434")
+        
+        # Prepare request payload
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens
+            }
+        }
+        
+        if system_prompt:
+            payload["system"] = system_prompt
+        
+        return f"{base_url}/api/generate", payload
     
     def query_ollama(self, 
                     prompt: str, 
@@ -33,38 +83,80 @@ class ModelService:
         Returns:
             Response from the model
         """
-        if not self.providers.get("ollama", {}).get("active", False):
-            raise ValueError("Ollama provider is not active")
-        
-        base_url = self.providers.get("ollama", {}).get("base_url", "http://localhost:11434")
+        url, payload = self._ollama_request(prompt, model, system_prompt, temperature, max_tokens, stream=False)
         
-        # Prepare request payload
-        payload = {
-            "model": model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": temperature,
-                "num_predict": max_tokens
+        try:
+            # Make request to Ollama API over a pooled connection
+            result = self.http_client.request_json("ollama", "POST", url, json_data=payload)
+            
+            return {
+                "text": result.get("response", ""),
+                "model": model,
+                "provider": "ollama",
+                "tokens_used": result.get("eval_count", 0)
             }
-        }
-        
-        if system_prompt:
-            payload["system"] = system_prompt
+            
+        except (httpx.HTTPError, ValueError) as e:
+            return {
+                "error": str(e),
+                "model": model,
+                "provider": "ollama"
+            }
+    
+    def stream_ollama(self,
+                      prompt: str,
+                      model: str = "llama2",
+                      system_prompt: Optional[str] = None,
+                      temperature: float = 0.7,
+                      max_tokens: int = 1000) -> Iterator[str]:
+        """
+        Query an Ollama model and yield the response tokens as they are generated
         
-        try:
-            # Make request to Ollama API
-            response = requests.post(
-                f"{base_url}/api/generate",
-                json=payload,
-                timeout=30
-            )
+        Args:
+            prompt: The user prompt
+            model: The model name
+            system_prompt: Optional system prompt
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens to generate
             
-            # Check if request was successful
-            response.raise_for_status()
+        Yields:
+            Pieces of the response text
+        
+        Raises:
+            httpx.HTTPError: If the request fails
+            ValueError: If the response isn't JSON
+        """
+        url, payload = self._ollama_request(prompt, model, system_prompt, temperature, max_tokens, stream=True)
+        
+        for chunk in self.http_client.stream_json_lines("ollama", url, payload):
+            if chunk.get("response"):
+                yield chunk["response"]
+            if chunk.get("done"):
+                break
+    
+    async def aquery_ollama(self,
+                            prompt: str,
+                            model: str = "llama2",
+                            system_prompt: Optional[str] = None,
+                            temperature: float = 0.7,
+                            max_tokens: int = 1000) -> Dict[str, Any]:
+        """
+        Async version of query_ollama
+        
+        Args:
+            prompt: The user prompt
+            model: The model name
+            system_prompt: Optional system prompt
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens to generate
             
-            # Parse response
-            result = response.json()
+        Returns:
+            Response from the model
+        """
+        url, payload = self._ollama_request(prompt, model, system_prompt, temperature, max_tokens, stream=False)
+        
+        try:
+            result = await self.http_client.arequest_json("ollama", "POST", url, json_data=payload)
             
             return {
                 "text": result.get("response", ""),
@@ -73,13 +165,44 @@ class ModelService:
                 "tokens_used": result.get("eval_count", 0)
             }
             
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             return {
                 "error": str(e),
                 "model": model,
                 "provider": "ollama"
             }
     
+    async def astream_ollama(self,
+                             prompt: str,
+                             model: str = "llama2",
+                             system_prompt: Optional[str] = None,
+                             temperature: float = 0.7,
+                             max_tokens: int = 1000) -> AsyncIterator[str]:
+        """
+        Async version of stream_ollama
+        
+        Args:
+            prompt: The user prompt
+            model: The model name
+            system_prompt: Optional system prompt
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens to generate
+            
+        Yields:
+            Pieces of the response text
+        
+        Raises:
+            httpx.HTTPError: If the request fails
+            ValueError: If the response isn't JSON
+        """
+        url, payload = self._ollama_request(prompt, model, system_prompt, temperature, max_tokens, stream=True)
+        
+        async for chunk in self.http_client.astream_json_lines("ollama", url, payload):
+            if chunk.get("response"):
+                yield chunk["response"]
+            if chunk.get("done"):
+                break
+    
     def query_openai(self, 
                     prompt: str, 
                     model: str = "gpt-3.5-turbo", 
@@ -168,7 +291,8 @@ class ModelService:
                   model: str,
                   system_prompt: Optional[str] = None,
                   temperature: float = 0.7,
-                  max_tokens: int = 1000) -> Dict[str, Any]:
+                  max_tokens: int = 1000,
+                  use_cache: Optional[bool] = None) -> Dict[str, Any]:
         """
         Query a model from the specified provider
         
@@ -179,10 +303,37 @@ class ModelService:
             system_prompt: Optional system prompt
             temperature: Temperature for generation
             max_tokens: Maximum tokens to generate
+            use_cache: Whether to use the response cache, by default only for deterministic
+                queries (temperature 0), True forces it for any temperature
             
         Returns:
-            Response from the model
+            Response from the model, with "cached" set when it comes from the cache
         """
+        if use_cache is None:
+            use_cache = temperature == 0
+        if not use_cache or self.response_cache is None:
+            return self._query_provider(prompt, provider, model, system_prompt, temperature, max_tokens)
+        
+        cache_args = dict(provider=provider, model=model, system_prompt=system_prompt,
+                          temperature=temperature, max_tokens=max_tokens)
+        cached, embedding = self.response_cache.lookup(prompt, **cache_args)
+        if cached is not None:
+            # Nothing was generated, so no tokens were used
+            return {**cached, "cached": True, "tokens_used": 0}
+        
+        response = self._query_provider(prompt, provider, model, system_prompt, temperature, max_tokens)
+        # Errors are usually transient, don't keep them
+        if "error" not in response:
+            self.response_cache.put(prompt, response=response, embedding=embedding, **cache_args)
+        return response
+    
+    def _query_provider(self,
+                        prompt: str,
+                        provider: str,
+                        model: str,
+                        system_prompt: Optional[str],
+                        temperature: float,
+                        max_tokens: int) -> Dict[str, Any]:
         if provider == "ollama":
             return self.query_ollama(
                 prompt=prompt,
@@ -209,46 +360,376 @@ class ModelService:
             )
         else:
             raise ValueError(f"Unsupported provider: {provider}")
+    
+    def stream_model(self,
+                     prompt: str,
+                     provider: str,
+                     model: str,
+                     system_prompt: Optional[str] = None,
+                     temperature: float = 0.7,
+                     max_tokens: int = 1000) -> Iterator[str]:
+        """
+        Query a model from the specified provider and yield the response as it is generated
+        
+        Providers without streaming support yield their whole response at once.
+        
+        Args:
+            prompt: The user prompt
+            provider: The provider name
+            model: The model name
+            system_prompt: Optional system prompt
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens to generate
+            
+        Yields:
+            Pieces of the response text
+        """
+        if provider == "ollama":
+            yield from self.stream_ollama(
+                prompt=prompt,
+                model=model,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            return
+        
+        response = self.query_model(
+            prompt=prompt,
+            provider=provider,
+            model=model,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        yield response.get("text", "")
 
-    def generate_response(self, question: str) -> str:
+    async def aquery_model(self,
+                           prompt: str,
+                           provider: str,
+                           model: str,
+                           system_prompt: Optional[str] = None,
+                           temperature: float = 0.7,
+                           max_tokens: int = 1000,
+                           use_cache: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Async version of query_model
+        
+        Args:
+            prompt: The user prompt
+            provider: The provider name
+            model: The model name
+            system_prompt: Optional system prompt
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens to generate
+            use_cache: Whether to use the response cache, by default only for deterministic
+                queries (temperature 0), True forces it for any temperature
+            
+        Returns:
+            Response from the model, with "cached" set when it comes from the cache
+        """
+        if use_cache is None:
+            use_cache = temperature == 0
+        if not use_cache or self.response_cache is None:
+            return await self._aquery_provider(prompt, provider, model, system_prompt, temperature, max_tokens)
+        
+        # The cache reads SQLite and may embed the prompt, keep that off the event loop
+        cache_args = dict(provider=provider, model=model, system_prompt=system_prompt,
+                          temperature=temperature, max_tokens=max_tokens)
+        cached, embedding = await asyncio.to_thread(self.response_cache.lookup, prompt, **cache_args)
+        if cached is not None:
+            # Nothing was generated, so no tokens were used
+            return {**cached, "cached": True, "tokens_used": 0}
+        
+        response = await self._aquery_provider(prompt, provider, model, system_prompt, temperature, max_tokens)
+        # Errors are usually transient, don't keep them
+        if "error" not in response:
+            await asyncio.to_thread(self.response_cache.put, prompt, response=response, embedding=embedding,
+                                    **cache_args)
+        return response
+    
+    async def _aquery_provider(self,
+                               prompt: str,
+                               provider: str,
+                               model: str,
+                               system_prompt: Optional[str],
+                               temperature: float,
+                               max_tokens: int) -> Dict[str, Any]:
+        if provider == "ollama":
+            return await self.aquery_ollama(
+                prompt=prompt,
+                model=model,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+        
+        # Providers without an async client run in a worker thread
+        return await asyncio.to_thread(
+            self._query_provider, prompt, provider, model, system_prompt, temperature, max_tokens
+        )
+    
+    async def astream_model(self,
+                            prompt: str,
+                            provider: str,
+                            model: str,
+                            system_prompt: Optional[str] = None,
+                            temperature: float = 0.7,
+                            max_tokens: int = 1000) -> AsyncIterator[str]:
+        """
+        Async version of stream_model
+        
+        Args:
+            prompt: The user prompt
+            provider: The provider name
+            model: The model name
+            system_prompt: Optional system prompt
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens to generate
+            
+        Yields:
+            Pieces of the response text
+        """
+        if provider == "ollama":
+            async for token in self.astream_ollama(
+                prompt=prompt,
+                model=model,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens
+            ):
+                yield token
+            return
+        
+        response = await self.aquery_model(
+            prompt=prompt,
+            provider=provider,
+            model=model,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        yield response.get("text", "")
+    
+    @staticmethod
+    def _retry_delay(attempt: int, retry_delay: float) -> float:
+        # Exponential backoff with jitter so that parallel retries don't hit the provider together
+        return retry_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
+    
+    @staticmethod
+    def _batch_result(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        failed = sum(1 for result in results if "error" in result)
+        return {
+            "results": results,
+            "tokens_used": sum(result.get("tokens_used", 0) for result in results),
+            "succeeded": len(results) - failed,
+            "failed": failed
+        }
+    
+    def query_many(self,
+                   prompts: List[str],
+                   provider: str,
+                   model: str,
+                   system_prompt: Optional[str] = None,
+                   temperature: float = 0.7,
+                   max_tokens: int = 1000,
+                   max_concurrency: int = 4,
+                   max_retries: int = 2,
+                   retry_delay: float = 1.0) -> Dict[str, Any]:
+        """
+        Query a model with several prompts in parallel
+        
+        Args:
+            prompts: The user prompts
+            provider: The provider name
+            model: The model name
+            system_prompt: Optional system prompt used for every prompt
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens to generate per prompt
+            max_concurrency: Maximum number of prompts in flight at once
+            max_retries: Number of retries of a failed prompt
+            retry_delay: Base delay in seconds before the first retry, doubled for each further retry
+            
+        Returns:
+            Dictionary with one response per prompt in order (failed ones have an "error"),
+            the total tokens used and the number of succeeded and failed prompts
+        """
+        def query(prompt: str) -> Dict[str, Any]:
+            for attempt in range(max_retries + 1):
+                try:
+                    result = self.query_model(
+                        prompt=prompt,
+                        provider=provider,
+                        model=model,
+                        system_prompt=system_prompt,
+                        temperature=temperature,
+                        max_tokens=max_tokens
+                    )
+                except ValueError as e:
+                    # Configuration errors won't go away by retrying
+                    return {"error": str(e), "model": model, "provider": provider, "attempts": attempt + 1}
+                
+                if "error" not in result or attempt == max_retries:
+                    return {**result, "attempts": attempt + 1}
+                time.sleep(self._retry_delay(attempt, retry_delay))
+        
+        if not prompts:
+            return self._batch_result([])
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(prompts)))) as executor:
+            results = list(executor.map(query, prompts))
+        
+        return self._batch_result(results)
+    
+    async def aquery_many(self,
+                          prompts: List[str],
+                          provider: str,
+                          model: str,
+                          system_prompt: Optional[str] = None,
+                          temperature: float = 0.7,
+                          max_tokens: int = 1000,
+                          max_concurrency: int = 4,
+                          max_retries: int = 2,
+                          retry_delay: float = 1.0) -> Dict[str, Any]:
+        """
+        Async version of query_many
+        
+        Args:
+            prompts: The user prompts
+            provider: The provider name
+            model: The model name
+            system_prompt: Optional system prompt used for every prompt
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens to generate per prompt
+            max_concurrency: Maximum number of prompts in flight at once
+            max_retries: Number of retries of a failed prompt
+            retry_delay: Base delay in seconds before the first retry, doubled for each further retry
+            
+        Returns:
+            Dictionary with one response per prompt in order (failed ones have an "error"),
+            the total tokens used and the number of succeeded and failed prompts
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def query(prompt: str) -> Dict[str, Any]:
+            for attempt in range(max_retries + 1):
+                try:
+                    async with semaphore:
+                        result = await self.aquery_model(
+                            prompt=prompt,
+                            provider=provider,
+                            model=model,
+                            system_prompt=system_prompt,
+                            temperature=temperature,
+                            max_tokens=max_tokens
+                        )
+                except ValueError as e:
+                    # Configuration errors won't go away by retrying
+                    return {"error": str(e), "model": model, "provider": provider, "attempts": attempt + 1}
+                
+                if "error" not in result or attempt == max_retries:
+                    return {**result, "attempts": attempt + 1}
+                # Wait outside the semaphore so that other prompts can use the slot
+                await asyncio.sleep(self._retry_delay(attempt, retry_delay))
+        
+        results = await asyncio.gather(*(query(prompt) for prompt in prompts))
+        
+        return self._batch_result(list(results))
+    
+    HELPMATE_SYSTEM_PROMPT = "You are a helpful AI assistant integrated with CoderAI. Answer the user's question concisely and accurately."
+    
+    def _helpmate_model(self) -> Optional[tuple]:
+        # The first active provider and its default model
+        if self.providers.get("ollama", {}).get("active", False):
+            return "ollama", "llama2"
+        elif self.providers.get("openai", {}).get("active", False):
+            return "openai", "gpt-3.5-turbo"
+        elif self.providers.get("anthropic", {}).get("active", False):
+            return "anthropic", "claude-3-haiku"
+        return None
+    
+    def generate_response(self, question: str, use_cache: bool = True) -> str:
         """
         Generate a response to a question from Helpmate-AI
         
         Args:
             question: The question from Helpmate-AI
+            use_cache: Whether to reuse the answers to earlier identical questions
             
         Returns:
             A response string
         """
         try:
-            # Find the first active provider
-            active_provider = None
-            active_model = None
-            
-            if self.providers.get("ollama", {}).get("active", False):
-                active_provider = "ollama"
-                active_model = "llama2"  # Default model for Ollama
-            elif self.providers.get("openai", {}).get("active", False):
-                active_provider = "openai"
-                active_model = "gpt-3.5-turbo"  # Default model for OpenAI
-            elif self.providers.get("anthropic", {}).get("active", False):
-                active_provider = "anthropic"
-                active_model = "claude-3-haiku"  # Default model for Anthropic
-            
-            if not active_provider:
+            active = self._helpmate_model()
+            if not active:
                 return "No active AI providers found. Please configure a provider in the CoderAI settings."
             
             # Generate response using the active provider
-            system_prompt = "You are a helpful AI assistant integrated with CoderAI. Answer the user's question concisely and accurately."
-            
             response = self.query_model(
                 prompt=question,
-                provider=active_provider,
-                model=active_model,
-                system_prompt=system_prompt
+                provider=active[0],
+                model=active[1],
+                system_prompt=self.HELPMATE_SYSTEM_PROMPT,
+                use_cache=use_cache
             )
             
             return response.get("text", "Sorry, I couldn't generate a response.")
             
         except Exception as e:
             return f"Error generating response: {str(e)}"
+    
+    async def agenerate_response(self, question: str, use_cache: bool = True) -> str:
+        """
+        Async version of generate_response
+        
+        Args:
+            question: The question from Helpmate-AI
+            use_cache: Whether to reuse the answers to earlier identical questions
+            
+        Returns:
+            A response string
+        """
+        try:
+            active = self._helpmate_model()
+            if not active:
+                return "No active AI providers found. Please configure a provider in the CoderAI settings."
+            
+            response = await self.aquery_model(
+                prompt=question,
+                provider=active[0],
+                model=active[1],
+                system_prompt=self.HELPMATE_SYSTEM_PROMPT,
+                use_cache=use_cache
+            )
+            
+            return response.get("text", "Sorry, I couldn't generate a response.")
+            
+        except Exception as e:
+            return f"Error generating response: {str(e)}"
+    
+    async def astream_response(self, question: str) -> AsyncIterator[str]:
+        """
+        Generate a response to a question from Helpmate-AI and yield it as it is generated
+        
+        Args:
+            question: The question from Helpmate-AI
+            
+        Yields:
+            Pieces of the response text
+        """
+        active = self._helpmate_model()
+        if not active:
+            yield "No active AI providers found. Please configure a provider in the CoderAI settings."
+            return
+        
+        async for token in self.astream_model(
+            prompt=question,
+            provider=active[0],
+            model=active[1],
+            system_prompt=self.HELPMATE_SYSTEM_PROMPT
+        ):
+            yield token
@@ -1,47 +1,286 @@
 import os
 import json
+import sqlite3
+import threading
+from collections import OrderedDict
 import numpy as np
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional
 import faiss
 import pickle
 
+class MetadataStore:
+    """SQLite table of vector metadata indexed by FAISS label and vector id"""
+    
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the metadata store
+        
+        Args:
+            path: SQLite database file, or None to keep the metadata in memory until persisted
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS metadata "
+            "(label INTEGER PRIMARY KEY, id INTEGER NOT NULL, data TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS metadata_id ON metadata (id)")
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM metadata").fetchone()[0]
+    
+    def add(self, labels: List[int], ids: List[int], metadata_list: List[Dict[str, Any]]):
+        """
+        Add the metadata of new vectors
+        
+        Args:
+            labels: FAISS labels of the vectors
+            ids: Vector ids
+            metadata_list: Metadata dictionary of each vector
+        """
+        rows = [(int(label), int(id_), json.dumps(metadata))
+                for label, id_, metadata in zip(labels, ids, metadata_list, strict=True)]
+        with self._lock:
+            self._conn.executemany("INSERT INTO metadata (label, id, data) VALUES (?, ?, ?)", rows)
+    
+    def get(self, labels: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Get the metadata of vectors by FAISS label
+        
+        Args:
+            labels: FAISS labels of the vectors
+        
+        Returns:
+            Mapping of label to vector id and metadata, deleted labels are left out
+        """
+        if not labels:
+            return {}
+        placeholders = ",".join("?" * len(labels))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT label, id, data FROM metadata WHERE label IN ({placeholders})",
+                [int(label) for label in labels]
+            ).fetchall()
+        return {label: {"id": id_, "metadata": json.loads(data)} for label, id_, data in rows}
+    
+    def labels_for_ids(self, ids: List[int]) -> List[int]:
+        """
+        Get the FAISS labels of vectors by vector id
+        
+        Args:
+            ids: Vector ids
+        
+        Returns:
+            List of labels
+        """
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT label FROM metadata WHERE id IN ({placeholders})", [int(id_) for id_ in ids]
+            ).fetchall()
+        return [row[0] for row in rows]
+    
+    def get_by_ids(self, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Get the metadata of vectors by vector id
+        
+        Args:
+            ids: Vector ids
+        
+        Returns:
+            Mapping of vector id to metadata
+        """
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, data FROM metadata WHERE id IN ({placeholders})", [int(id_) for id_ in ids]
+            ).fetchall()
+        return {id_: json.loads(data) for id_, data in rows}
+    
+    def delete(self, labels: List[int]):
+        """
+        Delete the metadata of vectors by FAISS label
+        
+        Args:
+            labels: FAISS labels of the vectors
+        """
+        with self._lock:
+            self._conn.executemany("DELETE FROM metadata WHERE label = ?", [(int(label),) for label in labels])
+    
+    def labels(self) -> List[int]:
+        """
+        Get the labels of every vector in the store
+        
+        Returns:
+            List of labels in increasing order
+        """
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT label FROM metadata ORDER BY label")]
+    
+    def max_label(self) -> int:
+        """
+        Get the highest label in the store
+        
+        Returns:
+            Highest label, or -1 if the store is empty
+        """
+        with self._lock:
+            value = self._conn.execute("SELECT MAX(label) FROM metadata").fetchone()[0]
+        return -1 if value is None else value
+    
+    def persist(self, path: str):
+        """
+        Write pending changes to disk
+        
+        The first call for a path copies the whole store there, later calls only commit
+        the rows changed since the previous call.
+        
+        Args:
+            path: SQLite database file
+        """
+        with self._lock:
+            if self.path == path:
+                self._conn.commit()
+                return
+            
+            self._conn.commit()
+            if os.path.exists(path):
+                os.remove(path)
+            target = sqlite3.connect(path, check_same_thread=False)
+            self._conn.backup(target)
+            self._conn.close()
+            self._conn = target
+            self.path = path
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
 class VectorStoreService:
     """Service for managing vector storage and retrieval"""
     
-    def __init__(self, vector_db_path: str = "./data/vector_db"):
+    INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+    
+    # Share of deleted vectors above which an HNSW index is rebuilt when saved
+    COMPACTION_THRESHOLD = 0.25
+    
+    # Everything that makes up the current index, kept together when it is parked in memory
+    STATE_ATTRIBUTES = ("index", "metadata", "dimension", "name", "index_config", "next_label",
+                        "pending_vectors", "pending_labels", "_index_dirty", "_mmapped")
+    
+    def __init__(self,
+                 vector_db_path: str = "./data/vector_db",
+                 index_type: str = "flat",
+                 max_resident_mb: int = 1024,
+                 use_mmap: bool = True):
         """
         Initialize the vector store service
         
         Args:
             vector_db_path: Path to store vector database files
+            index_type: Type of the index created when vectors are added before create_index
+            max_resident_mb: Memory budget for the indexes kept loaded, least recently used are released first
+            use_mmap: Map index files into memory on load instead of reading them
         """
         self.vector_db_path = vector_db_path
+        self.index_type = index_type
+        self.max_resident_mb = max_resident_mb
+        self.use_mmap = use_mmap
+        # Named indexes kept loaded while another one is current, least recently used first
+        self.resident = OrderedDict()
         self.index = None
-        self.metadata = []
+        self.metadata = None
         self.dimension = None
+        self.name = None
+        self.index_config = {}
+        self.next_label = 0
+        # Vectors waiting for enough training data before they can be added to an IVF index
+        self.pending_vectors = None
+        self.pending_labels = None
+        self._index_dirty = False
+        self._mmapped = False
         
         # Create directory if it doesn't exist
         os.makedirs(vector_db_path, exist_ok=True)
     
-    def create_index(self, dimension: int = 384):
+    def create_index(self,
+                     dimension: int = 384,
+                     index_type: str = "flat",
+                     nlist: int = 1024,
+                     pq_m: int = 16,
+                     hnsw_m: int = 32,
+                     train_size: Optional[int] = None,
+                     nprobe: int = 16,
+                     ef_search: int = 64):
         """
         Create a new FAISS index
         
         Args:
             dimension: Dimension of the embedding vectors
+            index_type: "flat" (exact), "ivf_flat", "ivf_pq" or "hnsw"
+            nlist: Number of IVF clusters
+            pq_m: Number of PQ sub-quantizers, must divide the dimension
+            hnsw_m: Number of HNSW neighbors per node
+            train_size: Number of vectors buffered to train an IVF index, 39 per cluster by default
+            nprobe: Default number of IVF clusters visited per query
+            ef_search: Default HNSW search depth
         """
+        if index_type not in self.INDEX_TYPES:
+            raise ValueError(f"Unknown index type: {index_type}")
+        if index_type == "ivf_pq" and dimension % pq_m != 0:
+            raise ValueError(f"pq_m ({pq_m}) must divide the dimension ({dimension})")
+        
+        self._park()
         self.dimension = dimension
-        self.index = faiss.IndexFlatL2(dimension)
-        self.metadata = []
+        self.index_config = {
+            "index_type": index_type,
+            "nlist": nlist,
+            "pq_m": pq_m,
+            "hnsw_m": hnsw_m,
+            "train_size": train_size or 39 * nlist,
+            "nprobe": nprobe,
+            "ef_search": ef_search
+        }
+        self.index = faiss.index_factory(dimension, self._factory_string())
+        self.metadata = MetadataStore()
+        self.name = None
+        self.next_label = 0
+        self.pending_vectors = None
+        self.pending_labels = None
+        self._index_dirty = True
     
-    def add_vectors(self, vectors: List[List[float]], metadata_list: List[Dict[str, Any]]) -> bool:
+    def _factory_string(self) -> str:
+        config = self.index_config
+        index_type = config["index_type"]
+        # IVF indexes store our labels themselves, the others need an IDMap2 to keep them
+        if index_type == "ivf_flat":
+            return f"IVF{config['nlist']},Flat"
+        if index_type == "ivf_pq":
+            return f"IVF{config['nlist']},PQ{config['pq_m']}"
+        if index_type == "hnsw":
+            return f"IDMap2,HNSW{config['hnsw_m']}"
+        return "IDMap2,Flat"
+    
+    def add_vectors(self,
+                    vectors: List[List[float]],
+                    metadata_list: List[Dict[str, Any]],
+                    ids: Optional[List[int]] = None) -> bool:
         """
         Add vectors to the index
         
         Args:
             vectors: List of embedding vectors
             metadata_list: List of metadata dictionaries for each vector
-            
+            ids: Optional vector ids, the assigned labels are used by default
+        
         Returns:
             True if successful, False otherwise
         """
@@ -49,53 +288,230 @@ class VectorStoreService:
             if self.dimension is None and vectors:
                 # Auto-detect dimension from first vector
                 self.dimension = len(vectors[0])
-                self.create_index(self.dimension)
+                self.create_index(self.dimension, index_type=self.index_type)
             else:
                 return False
         
         try:
             # Convert to numpy array
-            vectors_np = np.array(vectors).astype('float32')
+            vectors_np = np.asarray(vectors, dtype='float32').reshape(-1, self.dimension)
+            labels = np.arange(self.next_label, self.next_label + len(vectors_np), dtype='int64')
             
-            # Add vectors to index
-            self.index.add(vectors_np)
+            self._add_to_index(vectors_np, labels)
+            self.next_label += len(vectors_np)
             
             # Add metadata
-            self.metadata.extend(metadata_list)
+            self.metadata.add(labels.tolist(), labels.tolist() if ids is None else ids, metadata_list)
             
             return True
         except Exception as e:
             print(f"Error adding vectors: {e}")
             return False
     
-    def search(self, query_vector: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
+    def _add_to_index(self, vectors: np.ndarray, labels: np.ndarray):
+        self._ensure_writable()
+        self._index_dirty = True
+        
+        if self.index.is_trained:
+            self.index.add_with_ids(vectors, labels)
+            return
+        
+        # Buffer until there are enough vectors to train on
+        if self.pending_vectors is None:
+            self.pending_vectors, self.pending_labels = vectors, labels
+        else:
+            self.pending_vectors = np.vstack([self.pending_vectors, vectors])
+            self.pending_labels = np.concatenate([self.pending_labels, labels])
+        
+        if len(self.pending_vectors) >= self.index_config.get("train_size", 0):
+            self.train()
+    
+    def train(self) -> bool:
+        """
+        Train the index on the buffered vectors and add them to it
+        
+        Called automatically once train_size vectors were added, can be called earlier
+        as long as there are at least as many vectors as IVF clusters.
+        
+        Returns:
+            True if the index is trained, False otherwise
+        """
+        if self.index is None:
+            return False
+        if self.index.is_trained:
+            return True
+        if self.pending_vectors is None:
+            return False
+        
+        try:
+            self._ensure_writable()
+            self.index.train(self.pending_vectors)
+            self.index.add_with_ids(self.pending_vectors, self.pending_labels)
+            self.pending_vectors = None
+            self.pending_labels = None
+            self._index_dirty = True
+            return True
+        except Exception as e:
+            print(f"Error training index: {e}")
+            return False
+    
+    def delete_vectors(self, ids: List[int]) -> int:
+        """
+        Delete vectors by id
+        
+        HNSW indexes can't remove vectors: deleted vectors are only hidden through the metadata
+        and still count in index.ntotal. Saving rebuilds the index without them once they make up
+        COMPACTION_THRESHOLD of it, compact() does it right away.
+        
+        Args:
+            ids: Vector ids
+        
+        Returns:
+            Number of vectors deleted
+        """
+        if self.index is None:
+            return 0
+        
+        labels = self.metadata.labels_for_ids(ids)
+        if not labels:
+            return 0
+        
+        self.metadata.delete(labels)
+        labels_np = np.asarray(labels, dtype='int64')
+        
+        if self.pending_vectors is not None:
+            keep = ~np.isin(self.pending_labels, labels_np)
+            self.pending_vectors = self.pending_vectors[keep]
+            self.pending_labels = self.pending_labels[keep]
+        
+        self._ensure_writable()
+        try:
+            self.index.remove_ids(labels_np)
+        except RuntimeError:
+            # Indexes like HNSW can't remove vectors, their results are filtered by the metadata instead
+            pass
+        self._index_dirty = True
+        
+        return len(labels)
+    
+    def upsert_vectors(self,
+                       ids: List[int],
+                       vectors: List[List[float]],
+                       metadata_list: List[Dict[str, Any]]) -> bool:
+        """
+        Add vectors, replacing the existing vectors with the same ids
+        
+        Args:
+            ids: Vector ids
+            vectors: List of embedding vectors
+            metadata_list: List of metadata dictionaries for each vector
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        self.delete_vectors(ids)
+        return self.add_vectors(vectors, metadata_list, ids=ids)
+    
+    def compact(self) -> int:
+        """
+        Rebuild an HNSW index without its deleted vectors
+        
+        Returns:
+            Number of vectors removed from the index
+        """
+        if self.index is None or self.index_config.get("index_type") != "hnsw":
+            return 0
+        removed = self.index.ntotal - len(self.metadata)
+        if removed <= 0:
+            return 0
+        
+        labels = np.asarray(self.metadata.labels(), dtype='int64')
+        vectors = np.vstack([self.index.reconstruct(int(label)) for label in labels]) if len(labels) else None
+        index = faiss.index_factory(self.dimension, self._factory_string())
+        if vectors is not None:
+            index.add_with_ids(vectors, labels)
+        self.index = index
+        self._mmapped = False
+        self._index_dirty = True
+        return removed
+    
+    def _deleted_share(self) -> float:
+        if self.index is None or self.index.ntotal == 0 or self.index_config.get("index_type") != "hnsw":
+            return 0.0
+        return 1 - len(self.metadata) / self.index.ntotal
+    
+    def get_metadata(self, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Get the metadata of vectors by id, read from disk on demand
+        
+        Args:
+            ids: Vector ids
+        
+        Returns:
+            Mapping of vector id to metadata
+        """
+        if self.metadata is None:
+            return {}
+        return self.metadata.get_by_ids(ids)
+    
+    def search(self,
+               query_vector: List[float],
+               top_k: int = 5,
+               nprobe: Optional[int] = None,
+               ef_search: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Search for similar vectors
         
         Args:
             query_vector: Query embedding vector
             top_k: Number of top results to return
-            
+            nprobe: IVF clusters visited, more is slower but more accurate
+            ef_search: HNSW search depth, more is slower but more accurate
+        
         Returns:
             List of dictionaries with metadata and similarity score
         """
-        if self.index is None or not self.metadata:
+        # Counting the metadata rows would cost more than the search itself
+        if self.index is None or (self.index.ntotal == 0 and
+                                  (self.pending_vectors is None or len(self.pending_vectors) == 0)):
             return []
         
         try:
             # Convert to numpy array
-            query_np = np.array([query_vector]).astype('float32')
+            query_np = np.asarray([query_vector], dtype='float32')
             
-            # Search index
-            distances, indices = self.index.search(query_np, top_k)
+            self._set_search_parameters(nprobe, ef_search)
+            
+            candidates = self._search_pending(query_np, top_k)
+            
+            k = top_k
+            while self.index.ntotal > 0:
+                # Search index
+                distances, indices = self.index.search(query_np, min(k, self.index.ntotal))
+                found = [(float(distance), int(label))
+                         for distance, label in zip(distances[0], indices[0], strict=True) if label != -1]
+                metadata = self.metadata.get([label for _, label in found])
+                live = [(distance, label) for distance, label in found if label in metadata]
+                # Ask for more when deleted vectors took some of the top-k slots
+                if len(live) >= top_k or len(found) < k or k >= self.index.ntotal:
+                    break
+                k *= 2
+            else:
+                live = []
+            
+            candidates.extend(live)
+            candidates.sort()
+            candidates = candidates[:top_k]
+            metadata = self.metadata.get([label for _, label in candidates])
             
             # Prepare results
             results = []
-            for i, idx in enumerate(indices[0]):
-                if idx < len(self.metadata) and idx != -1:
+            for distance, label in candidates:
+                if label in metadata:
                     result = {
-                        "score": float(1 / (1 + distances[0][i])),  # Convert distance to similarity score
-                        **self.metadata[idx]
+                        "score": float(1 / (1 + distance)),  # Convert distance to similarity score
+                        "vector_id": metadata[label]["id"],
+                        **metadata[label]["metadata"]
                     }
                     results.append(result)
             
@@ -104,13 +520,33 @@ class VectorStoreService:
             print(f"Error searching vectors: {e}")
             return []
     
+    def _set_search_parameters(self, nprobe: Optional[int], ef_search: Optional[int]):
+        index_type = self.index_config.get("index_type", "flat")
+        parameters = faiss.ParameterSpace()
+        if index_type in ("ivf_flat", "ivf_pq"):
+            parameters.set_index_parameter(self.index, "nprobe", nprobe or self.index_config["nprobe"])
+        elif index_type == "hnsw":
+            parameters.set_index_parameter(self.index, "efSearch", ef_search or self.index_config["ef_search"])
+    
+    def _search_pending(self, query: np.ndarray, top_k: int) -> List[tuple]:
+        # Exact search over the vectors not yet in the untrained index
+        if self.pending_vectors is None or len(self.pending_vectors) == 0:
+            return []
+        distances = ((self.pending_vectors - query) ** 2).sum(axis=1)
+        k = min(top_k, len(distances))
+        top = np.argpartition(distances, k - 1)[:k]
+        return [(float(distances[i]), int(self.pending_labels[i])) for i in top]
+    
     def save(self, name: str = "default") -> bool:
         """
         Save the index and metadata to disk
         
+        Saving again under the same name only writes what changed: the metadata rows added or
+        deleted since the last save, and the index only if vectors were added or deleted.
+        
         Args:
             name: Name of the index
-            
+        
         Returns:
             True if successful, False otherwise
         """
@@ -121,21 +557,33 @@ class VectorStoreService:
             # Create index directory
             index_dir = os.path.join(self.vector_db_path, name)
             os.makedirs(index_dir, exist_ok=True)
-            
-            # Save index
-            index_path = os.path.join(index_dir, "index.faiss")
-            faiss.write_index(self.index, index_path)
+            same_index = name == self.name
             
             # Save metadata
-            metadata_path = os.path.join(index_dir, "metadata.json")
-            with open(metadata_path, 'w') as f:
-                json.dump(self.metadata, f)
+            self.metadata.persist(os.path.join(index_dir, "metadata.db"))
             
-            # Save dimension
-            config_path = os.path.join(index_dir, "config.pkl")
-            with open(config_path, 'wb') as f:
-                pickle.dump({"dimension": self.dimension}, f)
+            # Save index
+            if self._deleted_share() >= self.COMPACTION_THRESHOLD:
+                self.compact()
+            if self._index_dirty or not same_index:
+                index_path = os.path.join(index_dir, "index.faiss")
+                faiss.write_index(self.index, index_path + ".tmp")
+                os.replace(index_path + ".tmp", index_path)
+                
+                pending_path = os.path.join(index_dir, "pending.npz")
+                if self.pending_vectors is not None:
+                    np.savez(pending_path, vectors=self.pending_vectors, labels=self.pending_labels)
+                elif os.path.exists(pending_path):
+                    os.remove(pending_path)
             
+            # Save configuration
+            config_path = os.path.join(index_dir, "config.json")
+            with open(config_path, 'w') as f:
+                json.dump({"dimension": self.dimension, "next_label": self.next_label, **self.index_config}, f)
+            
+            self.name = name
+            self._index_dirty = False
+            self._evict_resident()
             return True
         except Exception as e:
             print(f"Error saving index: {e}")
@@ -145,38 +593,167 @@ class VectorStoreService:
         """
         Load the index and metadata from disk
         
+        Indexes that were loaded before and are still within the memory budget are switched
+        to without reading them again. Index files are memory-mapped, and only copied into
+        memory once vectors are added or deleted. Metadata is read on demand.
+        
         Args:
             name: Name of the index
-            
+        
         Returns:
             True if successful, False otherwise
         """
+        if self.index is not None and self.name == name:
+            return True
+        
+        if name in self.resident:
+            self._park()
+            self._restore(self.resident.pop(name))
+            return True
+        
         try:
             # Check if index directory exists
             index_dir = os.path.join(self.vector_db_path, name)
             if not os.path.exists(index_dir):
                 return False
             
+            self._park()
+            self._index_dirty = False
+            
             # Load index
             index_path = os.path.join(index_dir, "index.faiss")
-            self.index = faiss.read_index(index_path)
+            io_flags = self._mmap_flags() if self.use_mmap else 0
+            self.index = faiss.read_index(index_path, io_flags)
+            self._mmapped = bool(io_flags)
+            
+            # Load configuration
+            config_path = os.path.join(index_dir, "config.json")
+            if os.path.exists(config_path):
+                with open(config_path, 'r') as f:
+                    config = json.load(f)
+            else:
+                # Indexes saved before index types were configurable
+                with open(os.path.join(index_dir, "config.pkl"), 'rb') as f:
+                    config = pickle.load(f)
+            self.dimension = config.pop("dimension", None)
+            next_label = config.pop("next_label", None)
+            self.index_config = config
+            if "index_type" not in config:
+                self._migrate_index()
             
             # Load metadata
-            metadata_path = os.path.join(index_dir, "metadata.json")
-            with open(metadata_path, 'r') as f:
-                self.metadata = json.load(f)
+            metadata_path = os.path.join(index_dir, "metadata.db")
+            if os.path.exists(metadata_path):
+                self.metadata = MetadataStore(metadata_path)
+            else:
+                self.metadata = self._migrate_metadata(index_dir, metadata_path)
+            
+            pending_path = os.path.join(index_dir, "pending.npz")
+            if os.path.exists(pending_path):
+                with np.load(pending_path) as pending:
+                    self.pending_vectors = pending["vectors"]
+                    self.pending_labels = pending["labels"]
             
-            # Load dimension
-            config_path = os.path.join(index_dir, "config.pkl")
-            with open(config_path, 'rb') as f:
-                config = pickle.load(f)
-                self.dimension = config.get("dimension")
+            self.next_label = next_label if next_label is not None else self.metadata.max_label() + 1
+            self.name = name
+            self._evict_resident()
             
             return True
         except Exception as e:
             print(f"Error loading index: {e}")
             return False
     
+    def _migrate_index(self):
+        # Older indexes were a plain IndexFlatL2 labelled by position, rebuild it with stable labels
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        self.index_config = {"index_type": "flat"}
+        self.index = faiss.index_factory(self.dimension, self._factory_string())
+        self.index.add_with_ids(vectors, np.arange(len(vectors), dtype='int64'))
+        self._index_dirty = True
+        self._mmapped = False
+    
+    def _migrate_metadata(self, index_dir: str, metadata_path: str) -> MetadataStore:
+        # Older indexes stored metadata as a JSON list, where a vector's position is its label
+        with open(os.path.join(index_dir, "metadata.json"), 'r') as f:
+            metadata_list = json.load(f)
+        store = MetadataStore()
+        labels = list(range(len(metadata_list)))
+        store.add(labels, labels, metadata_list)
+        store.persist(metadata_path)
+        return store
+    
+    @staticmethod
+    def _mmap_flags() -> int:
+        # Zero-copy flat codes need a recent FAISS, older ones can still map IVF lists
+        return getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+    
+    def _ensure_writable(self):
+        # Memory-mapped indexes are read-only, copy the index into memory before changing it
+        if self._mmapped:
+            self.index = faiss.read_index(os.path.join(self.vector_db_path, self.name, "index.faiss"))
+            self._mmapped = False
+    
+    def _park(self):
+        # Keep the current index loaded so that switching back to it is free
+        if self.index is None or self.name is None:
+            self.close()
+            return
+        
+        self.resident[self.name] = {attribute: getattr(self, attribute) for attribute in self.STATE_ATTRIBUTES}
+        self.resident.move_to_end(self.name)
+        self.metadata = None
+        self.close()
+    
+    def _restore(self, state: Dict[str, Any]):
+        for attribute, value in state.items():
+            setattr(self, attribute, value)
+    
+    def _memory_usage(self, state: Dict[str, Any]) -> int:
+        index = state["index"]
+        if state["name"] and not state["_index_dirty"]:
+            # Saved indexes take about the size of their file, mapped or not
+            size = os.path.getsize(os.path.join(self.vector_db_path, state["name"], "index.faiss"))
+        else:
+            size = index.ntotal * index.d * 4
+        if state["pending_vectors"] is not None:
+            size += state["pending_vectors"].nbytes
+        return size
+    
+    def _evict_resident(self):
+        budget = self.max_resident_mb * 1024 * 1024
+        usage = sum(self._memory_usage(state) for state in self.resident.values())
+        if self.index is not None:
+            usage += self._memory_usage({attribute: getattr(self, attribute) for attribute in self.STATE_ATTRIBUTES})
+        
+        # Unsaved changes of an evicted index are lost, as when switching indexes without saving
+        while self.resident and usage > budget:
+            _, state = self.resident.popitem(last=False)
+            usage -= self._memory_usage(state)
+            state["metadata"].close()
+    
+    def resident_indexes(self) -> Dict[str, float]:
+        """
+        List the indexes kept loaded in memory
+        
+        Returns:
+            Mapping of index name to its approximate memory usage in MB, least recently used first
+        """
+        states = list(self.resident.values())
+        if self.index is not None and self.name is not None:
+            states.append({attribute: getattr(self, attribute) for attribute in self.STATE_ATTRIBUTES})
+        return {state["name"]: self._memory_usage(state) / (1024 * 1024) for state in states}
+    
+    def close(self):
+        """Release the current index and its metadata store"""
+        if self.metadata is not None:
+            self.metadata.close()
+        self.index = None
+        self.metadata = None
+        self.name = None
+        self.pending_vectors = None
+        self.pending_labels = None
+        self._mmapped = False
+    
     def list_indexes(self) -> List[str]:
         """
         List available indexes
@@ -186,7 +763,7 @@ class VectorStoreService:
         """
         try:
             # Get subdirectories in vector_db_path
-            return [d for d in os.listdir(self.vector_db_path) 
+            return [d for d in os.listdir(self.vector_db_path)
                    if os.path.isdir(os.path.join(self.vector_db_path, d))]
         except Exception as e:
             print(f"Error listing indexes: {e}")
@@ -198,7 +775,7 @@ class VectorStoreService:
         
         Args:
             name: Name of the index
-            
+        
         Returns:
             True if successful, False otherwise
         """
@@ -210,15 +787,16 @@ class VectorStoreService:
             if not os.path.exists(index_dir):
                 return False
             
-            # Delete directory
-            shutil.rmtree(index_dir)
-            
             # Reset if current index was deleted
-            if self.index is not None:
-                self.index = None
-                self.metadata = []
+            if name in self.resident:
+                self.resident.pop(name)["metadata"].close()
+            if self.index is not None and self.name == name:
+                self.close()
                 self.dimension = None
             
+            # Delete directory
+            shutil.rmtree(index_dir)
+            
             return True
         except Exception as e:
             print(f"Error deleting index: {e}")
@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.requests.append(payload)
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            status, text = server.respond(payload)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+        if status != 200:
+            self._send(status, "application/json", json.dumps({"error": text}).encode())
+        elif server.content_type != "application/json":
+            # E.g. the error page of a proxy
+            self._send(200, server.content_type, text.encode())
+        elif payload.get("stream"):
+            self._stream([{"response": token, "done": False} for token in text.split(" ")]
+                         + [{"response": "", "done": True, "eval_count": len(text.split(" "))}])
+        else:
+            self._send(200, "application/json", json.dumps({"response": text, "eval_count": len(text)}).encode())
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, chunks):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            line = (json.dumps(chunk) + "\n").encode()
+            self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that timed out have closed the connection
+        pass
+
+
+@pytest.fixture
+def ollama_server():
+    """Local server answering Ollama's /api/generate, `respond` maps a payload to (status, text)
+
+    Any other `content_type` than JSON sends the text as is.
+    """
+    server = FakeOllamaServer(("127.0.0.1", 0), FakeOllamaHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.connections = 0
+    server.in_flight = 0
+    server.peak = 0
+    server.delay = 0
+    server.content_type = "application/json"
+    server.respond = lambda payload: (200, f"echo {payload['prompt']}")
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
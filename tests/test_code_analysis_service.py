@@ -0,0 +1,105 @@
+import pytest
+
+from services import code_analysis_service
+from services.code_analysis_service import CodeAnalysisService
+
+CODE = '''import os
+import sys
+
+
+def long_function(x):
+    if x and os.sep or sys.argv:
+        print(x)
+''' + "    x += 1\n" * 50 + '''    return x
+
+
+def short():
+    try:
+        return 1
+    except:
+        pass  # TODO narrow
+'''
+
+
+def test_analysis_and_metrics():
+    service = CodeAnalysisService()
+
+    analysis = service.analyze_code(CODE)
+    metrics = service.get_code_metrics(CODE)
+
+    # One if, one try and two extra boolean operands
+    assert analysis['complexity_score'] == 4
+    assert [smell['message'] for smell in analysis['code_smells']] == ['Method long_function is too long (54 lines)']
+    assert sorted(item['location'] for item in analysis['best_practices']) == [7, 64, 65]
+    assert metrics == {'loc': CODE.count('\n') + 1, 'classes': 0, 'functions': 2, 'imports': 2}
+
+
+def test_invalid_code_reports_the_syntax_error():
+    service = CodeAnalysisService()
+
+    assert 'error' in service.analyze_code('def broken(:')
+    assert 'error' in service.get_code_metrics('def broken(:')
+
+
+def test_cached_results_are_parsed_once_and_returned_as_copies(monkeypatch):
+    service = CodeAnalysisService()
+    calls = []
+    analyze_source = code_analysis_service._analyze_source
+    monkeypatch.setattr(code_analysis_service, '_analyze_source',
+                        lambda *args: calls.append(1) or analyze_source(*args))
+
+    first = service.analyze_code(CODE)
+    first['code_smells'].clear()
+    service.get_code_metrics(CODE)['loc'] = 0
+
+    assert len(service.analyze_code(CODE)['code_smells']) == 1
+    assert service.get_code_metrics(CODE)['loc'] > 0
+    assert len(calls) == 1
+
+
+def test_results_persist_across_instances(tmp_path, monkeypatch):
+    cache_path = str(tmp_path / 'analysis.db')
+    expected = CodeAnalysisService(cache_path=cache_path).analyze_code(CODE)
+
+    monkeypatch.setattr(code_analysis_service, '_analyze_source', pytest.fail)
+    assert CodeAnalysisService(cache_path=cache_path).analyze_code(CODE) == expected
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_analyze_paths(tmp_path, max_workers):
+    (tmp_path / 'pkg').mkdir()
+    (tmp_path / '.git').mkdir()
+    (tmp_path / 'a.py').write_text(CODE)
+    (tmp_path / 'pkg' / 'b.py').write_text(CODE)
+    (tmp_path / 'pkg' / 'c.py').write_text('x = 1\n')
+    (tmp_path / 'pkg' / 'notes.txt').write_text('print(')
+    (tmp_path / '.git' / 'hook.py').write_text('x = 1\n')
+    service = CodeAnalysisService()
+
+    results = service.analyze_paths([str(tmp_path), str(tmp_path / 'missing.py')], max_workers=max_workers)
+
+    assert sorted(results) == sorted([str(tmp_path / 'a.py'), str(tmp_path / 'pkg' / 'b.py'),
+                                      str(tmp_path / 'pkg' / 'c.py'), str(tmp_path / 'missing.py')])
+    assert results[str(tmp_path / 'a.py')] == results[str(tmp_path / 'pkg' / 'b.py')]
+    assert results[str(tmp_path / 'a.py')] is not results[str(tmp_path / 'pkg' / 'b.py')]
+    assert results[str(tmp_path / 'a.py')]['analysis'] == service.analyze_code(CODE)
+    assert results[str(tmp_path / 'pkg' / 'c.py')]['metrics']['loc'] == 2
+    assert 'error' in results[str(tmp_path / 'missing.py')]
+
+
+def test_analyze_paths_does_not_read_unchanged_files_again(tmp_path, monkeypatch):
+    path = tmp_path / 'a.py'
+    path.write_text(CODE)
+    service = CodeAnalysisService()
+    first = service.analyze_paths([str(path)])
+
+    reads = []
+    read = CodeAnalysisService._read
+    monkeypatch.setattr(CodeAnalysisService, '_read', staticmethod(lambda p: reads.append(p) or read(p)))
+
+    assert service.analyze_paths([str(path)]) == first
+    assert reads == []
+
+    path.write_text('x = 1\n')
+    assert service.analyze_paths([str(path)])[str(path)]['metrics']['loc'] == 2
+    assert reads == [str(path)]
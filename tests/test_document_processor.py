@@ -0,0 +1,60 @@
+from utils.document_processor import DocumentProcessor
+
+
+class FakeEmbeddingService:
+    def __init__(self):
+        self.batches = []
+
+    def generate_embeddings(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def count_tokens(self, texts):
+        return [len(text.split()) for text in texts]
+
+    def max_tokens(self):
+        return 8
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.vectors = []
+        self.metadata = []
+        self.saved = []
+
+    def add_vectors(self, vectors, metadata_list):
+        self.vectors.extend(vectors)
+        self.metadata.extend(metadata_list)
+        return True
+
+    def save(self, name):
+        self.saved.append(name)
+        return True
+
+
+def test_ingest_embeds_and_indexes_chunks_in_batches():
+    text = "\n\n".join(f"Paragraph {i} " + "word " * 30 for i in range(10))
+    embedding_service, vector_store = FakeEmbeddingService(), FakeVectorStore()
+    progress = []
+
+    indexed = DocumentProcessor.ingest(text, "txt", embedding_service, vector_store, metadata={"source": "doc.txt"},
+                                       chunk_size=200, overlap=20, batch_size=4, chunk_unit="characters",
+                                       progress_callback=progress.append, index_name="docs")
+
+    assert indexed == len(vector_store.vectors) == len(vector_store.metadata)
+    assert all(len(batch) <= 4 for batch in embedding_service.batches)
+    assert progress[-1] == indexed
+    assert [meta["chunk_index"] for meta in vector_store.metadata] == list(range(indexed))
+    assert all(meta["source"] == "doc.txt" and len(meta["text"]) <= 200 for meta in vector_store.metadata)
+    assert vector_store.saved == ["docs"]
+
+
+def test_ingest_in_tokens_caps_chunks_at_the_model_length():
+    text = " ".join(f"word{i}" for i in range(100))
+    vector_store = FakeVectorStore()
+
+    # Tokens are the default unit, as in AppConfig
+    indexed = DocumentProcessor.ingest(text, "txt", FakeEmbeddingService(), vector_store, chunk_size=1000, overlap=2)
+
+    assert indexed > 1
+    assert all(len(meta["text"].split()) <= 8 for meta in vector_store.metadata)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from utils.embedding_cache import EmbeddingCache, get_embedding_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "embedding_cache")
+
+
+def test_instances_sharing_a_directory_do_not_overwrite_each_other(cache_dir):
+    first = EmbeddingCache(cache_dir)
+    second = EmbeddingCache(cache_dir)
+
+    first.put_many("model", ["x"], np.ones((1, 4)))
+    second.put_many("model", ["y"], np.full((1, 4), 2.0))
+
+    assert first.get_many("model", ["x"])[0].tolist() == [1.0] * 4
+    x, y = EmbeddingCache(cache_dir).get_many("model", ["x", "y"])
+    assert x.tolist() == [1.0] * 4
+    assert y.tolist() == [2.0] * 4
+
+
+def test_get_embedding_cache_is_shared_per_directory(cache_dir, tmp_path):
+    assert get_embedding_cache(cache_dir) is get_embedding_cache(cache_dir + "/")
+    assert get_embedding_cache(cache_dir, max_entries=10).max_entries == 10
+    assert get_embedding_cache(str(tmp_path / "other")) is not get_embedding_cache(cache_dir)
+
+
+def test_encode_only_encodes_missing_texts(cache_dir):
+    cache = EmbeddingCache(cache_dir)
+    encoded = []
+
+    def encode(texts):
+        encoded.append(list(texts))
+        return np.array([[len(text), 0.0] for text in texts])
+
+    cache.encode("model", ["a", "bb"], encode)
+    vectors = cache.encode("model", ["bb", "ccc", " ccc  "], encode)
+
+    assert encoded == [["a", "bb"], ["ccc"]]
+    assert vectors.tolist() == [[2.0, 0.0], [3.0, 0.0], [3.0, 0.0]]
+    assert cache.stats()["entries"] == {"model": 3}
+
+
+def test_least_recently_used_entries_are_evicted(cache_dir):
+    cache = EmbeddingCache(cache_dir, max_entries=10)
+    cache.put_many("model", [f"text {i}" for i in range(10)], np.ones((10, 2)))
+    cache.get_many("model", ["text 0"])
+
+    cache.put_many("model", ["text 10"], np.ones((1, 2)))
+
+    assert cache.stats()["entries"] == {"model": 10}
+    assert cache.get_many("model", ["text 0"])[0] is not None
+    assert cache.get_many("model", ["text 10"])[0] is not None
+
+
+def test_vectors_of_another_size_replace_the_model_entries(cache_dir):
+    cache = EmbeddingCache(cache_dir)
+    cache.put_many("model", ["a", "b"], np.ones((2, 4)))
+
+    cache.put_many("model", ["c"], np.ones((1, 8)))
+
+    assert cache.get_many("model", ["a", "c"])[0] is None
+    assert cache.stats()["entries"] == {"model": 1}
@@ -0,0 +1,142 @@
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from models import embedding_executor
+from models.embedding_executor import EmbeddingExecutor
+
+
+class FakeModel:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    def encode(self, texts, batch_size=32):
+        self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("out of memory")
+        return np.array([[float(len(text)), 1.0] for text in texts])
+
+
+class FakeRegistry:
+    def __init__(self, model):
+        self.model = model
+
+    def get_sentence_transformer(self, model_name):
+        return self.model
+
+
+@pytest.fixture
+def model():
+    return FakeModel()
+
+
+@pytest.fixture
+def executor(model):
+    executor = EmbeddingExecutor("model", max_batch_size=8, max_latency_ms=50, registry=FakeRegistry(model))
+    yield executor
+    executor.close()
+
+
+def test_concurrent_requests_are_encoded_together(executor, model):
+    barrier = threading.Barrier(6)
+    results = {}
+
+    def embed(i):
+        barrier.wait()
+        results[i] = executor.submit("x" * i).result(timeout=5)
+
+    threads = [threading.Thread(target=embed, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert {i: list(vector) for i, vector in results.items()} == {i: [float(i), 1.0] for i in range(6)}
+    assert len(model.batches) < 6
+    assert executor.stats()["requests"] == 6
+
+
+def test_batches_are_capped_and_keep_request_order(executor, model):
+    futures = [executor.submit_many([f"{i}" * (i + 1)] * 3) for i in range(5)]
+
+    for i, future in enumerate(futures):
+        assert future.result(timeout=5).tolist() == [[float(i + 1), 1.0]] * 3
+    assert max(len(batch) for batch in model.batches) <= 9
+    assert executor.stats()["texts"] == 15
+
+
+def test_encode_errors_reach_every_request_of_the_batch():
+    executor = EmbeddingExecutor("model", max_latency_ms=50, registry=FakeRegistry(FakeModel(fail=True)))
+    futures = [executor.submit("a"), executor.submit_many(["b", "c"])]
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="out of memory"):
+            future.result(timeout=5)
+    executor.close()
+
+
+def test_cancelled_requests_are_not_encoded(model):
+    executor = EmbeddingExecutor("model", max_latency_ms=200, registry=FakeRegistry(model))
+    cancelled = executor.submit_many(["cancelled"])
+    assert cancelled.cancel()
+    kept = executor.submit_many(["kept"])
+
+    assert kept.result(timeout=5).tolist() == [[4.0, 1.0]]
+    assert model.batches == [["kept"]]
+    executor.close()
+
+
+def test_close_encodes_queued_requests_and_rejects_new_ones(executor):
+    queued = executor.submit_many(["queued"])
+    executor.close()
+
+    assert queued.result(timeout=5).tolist() == [[6.0, 1.0]]
+    with pytest.raises(RuntimeError, match="closed"):
+        executor.submit("late").result(timeout=5)
+    # Closing again does nothing
+    executor.close()
+
+
+def submit_while_closing(executor, submitters=4, requests=20):
+    futures: list[Future] = []
+    start = threading.Barrier(submitters + 1)
+
+    def submit():
+        start.wait()
+        for _ in range(requests):
+            futures.append(executor.submit_many(["text"]))
+
+    threads = [threading.Thread(target=submit) for _ in range(submitters)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    executor.close()
+    for thread in threads:
+        thread.join()
+    return futures
+
+
+def test_requests_racing_close_are_either_encoded_or_rejected(model):
+    for _ in range(20):
+        futures = submit_while_closing(EmbeddingExecutor("model", max_latency_ms=1, registry=FakeRegistry(model)))
+
+        for future in futures:
+            # None is left waiting on a stopped worker
+            assert future.exception(timeout=5) is None or "closed" in str(future.exception())
+
+
+def test_shared_executors_are_replaced_once_closed(monkeypatch):
+    monkeypatch.setattr(embedding_executor, "_executors", {})
+    monkeypatch.setattr(embedding_executor, "get_model_registry", lambda: FakeRegistry(FakeModel()))
+
+    executor = embedding_executor.get_embedding_executor("model")
+    assert embedding_executor.get_embedding_executor("model") is executor
+
+    executor.close()
+    replacement = embedding_executor.get_embedding_executor("model")
+    assert replacement is not executor
+    assert replacement.submit("text").result(timeout=5).tolist() == [4.0, 1.0]
+    replacement.close()
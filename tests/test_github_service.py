@@ -0,0 +1,175 @@
+import base64
+import itertools
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.github_service import GitHubService
+from utils.http_cache import HTTPCache
+
+TREE_SHA = "a" * 40
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.headers.get("If-None-Match")))
+        route = server.routes.get(self.path)
+        if route is None:
+            return self._send(404, {"message": "Not Found"})
+        body, headers = route
+        etag = headers.get("ETag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            return self._send(304, None, headers)
+        self._send(200, body, headers)
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value.replace("{url}", self.server.url))
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def github_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHubHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.routes = {}
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def github(tmp_path, github_server):
+    service = GitHubService(token="secret", cache_path=str(tmp_path / "github.db"), max_workers=4)
+    service.base_url = github_server.url
+    return service
+
+
+def blob(text):
+    data = text if isinstance(text, bytes) else text.encode()
+    return {"content": base64.b64encode(data).decode(), "encoding": "base64", "size": len(data)}, {}
+
+
+def paths(server):
+    return [path for path, _ in server.requests]
+
+
+def test_unchanged_responses_are_revalidated_with_etags(github, github_server):
+    github_server.routes["/repos/o/r"] = ({"name": "r"}, {"ETag": '"v1"'})
+
+    assert github.get_repository("o", "r") == {"name": "r"}
+    assert github.get_repository("o", "r") == {"name": "r"}
+
+    assert github_server.requests == [("/repos/o/r", None), ("/repos/o/r", '"v1"')]
+    assert github.cache.stats()["revalidated"] == 1
+
+    github_server.routes["/repos/o/r"] = ({"name": "renamed"}, {"ETag": '"v2"'})
+    assert github.get_repository("o", "r") == {"name": "renamed"}
+
+
+def test_pagination_follows_link_headers_including_cached_pages(github, github_server):
+    github_server.routes["/user/repos?per_page=100"] = (
+        [{"id": 1}, {"id": 2}], {"ETag": '"p1"', "Link": '<{url}/user/repos?per_page=100&page=2>; rel="next"'}
+    )
+    github_server.routes["/user/repos?per_page=100&page=2"] = ([{"id": 3}], {"ETag": '"p2"'})
+
+    assert github.list_repositories() == [{"id": 1}, {"id": 2}, {"id": 3}]
+    # The second listing is served from 304s and still reaches the second page
+    assert github.list_repositories() == [{"id": 1}, {"id": 2}, {"id": 3}]
+    assert github.cache.stats()["revalidated"] == 2
+
+
+def test_failed_pages_end_with_an_error(github, github_server):
+    github_server.routes["/user/repos?per_page=100"] = (
+        [{"id": 1}], {"Link": '<{url}/user/repos?per_page=100&page=2>; rel="next"'}
+    )
+
+    assert github.list_repositories() == [{"id": 1}, {"error": "Failed to list repositories: 404"}]
+
+
+def test_blobs_are_fetched_once(github, github_server):
+    github_server.routes["/repos/o/r/git/blobs/b1"] = blob("print('hi')\n")
+
+    assert github.get_blob("o", "r", "b1")["decoded_content"] == "print('hi')\n"
+    assert github.get_blob("o", "r", "b1")["decoded_content"] == "print('hi')\n"
+
+    assert paths(github_server) == ["/repos/o/r/git/blobs/b1"]
+    assert github.cache.stats()["hits"] == 1
+
+
+def test_get_repository_files_reads_the_tree_and_blobs(github, github_server):
+    tree = [
+        {"path": "main.py", "type": "blob", "sha": "b1", "size": 12},
+        {"path": "copy.py", "type": "blob", "sha": "b1", "size": 12},
+        {"path": "empty.py", "type": "blob", "sha": "b2", "size": 0},
+        {"path": "big.py", "type": "blob", "sha": "b3", "size": 10_000},
+        {"path": "logo.png", "type": "blob", "sha": "b4", "size": 4},
+        {"path": "gone.py", "type": "blob", "sha": "b5", "size": 4},
+        {"path": "pkg", "type": "tree", "sha": "t1"},
+    ]
+    github_server.routes[f"/repos/o/r/git/trees/{TREE_SHA}?recursive=1"] = ({"tree": tree, "truncated": False}, {})
+    github_server.routes["/repos/o/r/git/blobs/b1"] = blob("print('hi')\n")
+    github_server.routes["/repos/o/r/git/blobs/b2"] = ({"content": "", "encoding": "base64", "size": 0}, {})
+
+    result = github.get_repository_files("o", "r", ref=TREE_SHA, extensions=[".py"], max_file_size=1000)
+
+    assert result["files"] == {"main.py": "print('hi')\n", "copy.py": "print('hi')\n", "empty.py": ""}
+    assert result["errors"] == {"gone.py": "Failed to get blob: 404"}
+    assert result["truncated"] is False
+    # Duplicate blobs are fetched once, skipped files are not fetched
+    assert sorted(paths(github_server)[1:]) == [f"/repos/o/r/git/blobs/{sha}" for sha in ("b1", "b2", "b5")]
+
+    # The tree of a commit SHA and its blobs are immutable
+    github_server.requests.clear()
+    github.get_repository_files("o", "r", ref=TREE_SHA, extensions=[".py"], max_file_size=1000)
+    assert paths(github_server) == ["/repos/o/r/git/blobs/b5"]
+
+
+def test_http_cache_evicts_least_recently_used_responses(tmp_path, monkeypatch):
+    clock = itertools.count(1000.0)
+    monkeypatch.setattr("utils.http_cache.time.time", lambda: next(clock))
+    cache = HTTPCache(str(tmp_path / "http.db"), max_entries=100)
+    for i in range(100):
+        cache.put(f"key{i}", {"i": i})
+    # Recently used entries survive
+    cache.get("key0")
+
+    for i in range(100, 110):
+        cache.put(f"key{i}", {"i": i})
+
+    assert cache.stats()["entries"] <= 100
+    assert cache.get("key0") == {"etag": None, "last_modified": None, "link": None, "body": {"i": 0}}
+    assert cache.get("key109") is not None
+    assert cache.get("key1") is None
+
+
+def test_http_cache_expires_responses_unless_revalidated(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("utils.http_cache.time.time", lambda: now[0])
+    cache = HTTPCache(str(tmp_path / "http.db"), ttl=60)
+    cache.put("old", {"v": 1}, etag='"1"')
+    cache.put("refreshed", {"v": 2}, etag='"2"')
+
+    now[0] += 50
+    cache.refresh("refreshed")
+    now[0] += 20
+
+    assert cache.get("old") is None
+    assert cache.get("refreshed")["body"] == {"v": 2}
+    assert cache.purge_expired() == 1
@@ -0,0 +1,121 @@
+import gzip
+import json
+
+import httpx
+import pytest
+
+pytest.importorskip("starlette")
+pytest.importorskip("uvicorn")
+
+from components.helpmate_bridge import create_app, precompress_static_files  # noqa: E402
+
+SCRIPT = "console.log('helpmate');\n" * 100
+
+
+class FakeModelService:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    async def agenerate_response(self, question):
+        return f"answer to {question}"
+
+    async def astream_response(self, question):
+        for token in ["answer", " to ", question]:
+            yield token
+        if self.fail:
+            raise RuntimeError("provider went away")
+
+
+@pytest.fixture
+def static_folder(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<html>helpmate</html>")
+    (tmp_path / "assets" / "app.js").write_text(SCRIPT)
+    (tmp_path.parent / "secret.txt").write_text("secret")
+    return tmp_path
+
+
+def make_client(static_folder, model_service=None):
+    app = create_app(model_service or FakeModelService(), str(static_folder))
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bridge")
+
+
+@pytest.mark.asyncio
+async def test_chat_answers_as_json(static_folder):
+    async with make_client(static_folder) as client:
+        response = await client.post("/api/chat", json={"question": "why?"})
+
+    assert response.json() == {"answer": "answer to why?"}
+    assert response.headers["content-security-policy"] == "frame-ancestors *"
+
+
+@pytest.mark.asyncio
+async def test_chat_rejects_invalid_requests(static_folder):
+    async with make_client(static_folder) as client:
+        invalid = await client.post("/api/chat", content=b"not json")
+        missing = await client.post("/api/chat", json={"stream": True})
+
+    assert (invalid.status_code, invalid.json()) == (400, {"error": "Invalid JSON body"})
+    assert (missing.status_code, missing.json()) == (400, {"error": "Missing question"})
+
+
+@pytest.mark.asyncio
+async def test_chat_streams_server_sent_events(static_folder):
+    async with make_client(static_folder) as client:
+        response = await client.post("/api/chat", json={"question": "why?", "stream": True})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+    assert events == [{"token": "answer"}, {"token": " to "}, {"token": "why?"}, {"done": True}]
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_reports_errors_as_events(static_folder):
+    async with make_client(static_folder, FakeModelService(fail=True)) as client:
+        response = await client.post("/api/chat", json={"question": "why?"},
+                                     headers={"Accept": "text/event-stream"})
+
+    assert response.text.endswith('event: error\ndata: {"error": "provider went away"}\n\n')
+
+
+@pytest.mark.asyncio
+async def test_static_files_are_cached_by_kind(static_folder):
+    async with make_client(static_folder) as client:
+        index = await client.get("/")
+        script = await client.get("/assets/app.js")
+        missing = await client.get("/assets/missing.js")
+        outside = await client.get("/..%2Fsecret.txt")
+
+    assert index.text == "<html>helpmate</html>"
+    assert index.headers["cache-control"] == "no-cache"
+    assert script.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert missing.status_code == outside.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_precompressed_files_are_served_to_clients_accepting_them(static_folder):
+    assert precompress_static_files(str(static_folder)) >= 1
+    # Up to date siblings are not written again
+    assert precompress_static_files(str(static_folder)) == 0
+
+    async with make_client(static_folder) as client:
+        compressed = await client.get("/assets/app.js", headers={"Accept-Encoding": "gzip"})
+        plain = await client.get("/assets/app.js", headers={"Accept-Encoding": "identity"})
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["content-type"].startswith(("text/javascript", "application/javascript"))
+    assert compressed.text == SCRIPT
+    assert int(compressed.headers["content-length"]) == len(gzip.compress(SCRIPT.encode(), compresslevel=9, mtime=0))
+    assert "content-encoding" not in plain.headers
+    assert plain.text == SCRIPT
+
+
+@pytest.mark.asyncio
+async def test_unchanged_files_are_not_modified(static_folder):
+    async with make_client(static_folder) as client:
+        first = await client.get("/assets/app.js")
+        second = await client.get("/assets/app.js", headers={"If-None-Match": first.headers["etag"]})
+
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == first.headers["etag"]
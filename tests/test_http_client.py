@@ -0,0 +1,113 @@
+import threading
+
+import httpx
+import pytest
+
+from models.ollama_model import OllamaModel
+from services.model_service import ModelService
+from utils.http_client import HTTPClient
+
+
+@pytest.fixture
+def client():
+    client = HTTPClient()
+    yield client
+    client.close()
+
+
+def make_service(client, ollama_server, **config):
+    service = ModelService(http_client=client)
+    service.set_provider_config({"ollama": {"active": True, "base_url": ollama_server.url, **config}})
+    return service
+
+
+def test_requests_reuse_pooled_connections(client, ollama_server):
+    url = f"{ollama_server.url}/api/generate"
+
+    results = [client.request_json("ollama", "POST", url, json_data={"prompt": str(i)}) for i in range(5)]
+
+    assert [result["response"] for result in results] == [f"echo {i}" for i in range(5)]
+    assert ollama_server.connections == 1
+
+
+def test_http_errors_are_raised(client, ollama_server):
+    ollama_server.respond = lambda payload: (500, "boom")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        client.request_json("ollama", "POST", f"{ollama_server.url}/api/generate", json_data={"prompt": "x"})
+
+
+def test_concurrency_is_limited_per_provider(client, ollama_server):
+    client.configure("ollama", max_concurrency=2)
+    ollama_server.delay = 0.05
+    url = f"{ollama_server.url}/api/generate"
+
+    def request():
+        client.request_json("ollama", "POST", url, json_data={"prompt": "x"})
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(ollama_server.requests) == 6
+    assert ollama_server.peak == 2
+
+
+def test_provider_timeout_applies(client, ollama_server):
+    client.configure("ollama", timeout=0.05)
+    ollama_server.delay = 0.5
+
+    with pytest.raises(httpx.TimeoutException):
+        client.request_json("ollama", "POST", f"{ollama_server.url}/api/generate", json_data={"prompt": "x"})
+
+
+def test_query_and_stream_ollama(client, ollama_server):
+    service = make_service(client, ollama_server)
+
+    result = service.query_ollama("hello there", model="llama")
+    tokens = list(service.stream_ollama("hello there", model="llama"))
+
+    assert result == {"text": "echo hello there", "model": "llama", "provider": "ollama", "tokens_used": 16}
+    assert tokens == ["echo", "hello", "there"]
+    assert [request["stream"] for request in ollama_server.requests] == [False, True]
+
+
+def test_query_ollama_returns_errors(client, ollama_server):
+    ollama_server.respond = lambda payload: (503, "busy")
+
+    result = make_service(client, ollama_server).query_ollama("hello")
+
+    assert "503" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_responses_that_are_not_json_are_errors(client, ollama_server):
+    ollama_server.content_type = "text/html"
+    ollama_server.respond = lambda payload: (200, "<html>Bad Gateway</html>")
+    service = make_service(client, ollama_server)
+    model = OllamaModel(ollama_server.url, http_client=client)
+
+    results = [service.query_ollama("hello"), await service.aquery_ollama("hello"),
+               model.query("hello"), await model.aquery("hello")]
+
+    assert all(result["error"] and result["provider"] == "ollama" for result in results)
+    with pytest.raises(ValueError):
+        list(service.stream_ollama("hello"))
+    with pytest.raises(ValueError):
+        [token async for token in service.astream_ollama("hello")]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_async_query_and_stream_ollama(client, ollama_server):
+    service = make_service(client, ollama_server)
+
+    result = await service.aquery_ollama("hello there", system_prompt="be brief")
+    tokens = [token async for token in service.astream_ollama("hello there")]
+
+    assert result["text"] == "echo hello there"
+    assert tokens == ["echo", "hello", "there"]
+    assert ollama_server.requests[0]["system"] == "be brief"
+    await client.aclose()
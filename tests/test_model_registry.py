@@ -0,0 +1,124 @@
+import gc
+import threading
+import weakref
+
+import numpy as np
+import pytest
+
+from models import huggingface_model
+from models.model_registry import ModelRegistry
+from services import embedding_service as embedding_service_module
+from services.embedding_service import EmbeddingService
+
+MB = 1024 * 1024
+
+
+class FakeParameter:
+    def __init__(self, size):
+        self.size = size
+
+    def numel(self):
+        return self.size
+
+    def element_size(self):
+        return 1
+
+
+class FakeModel:
+    def __init__(self, name, size_mb=1):
+        self.name = name
+        self.size_mb = size_mb
+
+    def parameters(self):
+        return [FakeParameter(self.size_mb * MB)]
+
+    def encode(self, texts, **kwargs):
+        return np.array([[float(len(text)), 1.0] for text in texts])
+
+
+class FakeRegistry(ModelRegistry):
+    def __init__(self, max_memory_mb=4096):
+        super().__init__(max_memory_mb)
+        self.loaded = []
+
+    def get_sentence_transformer(self, model_name, **options):
+        def load():
+            self.loaded.append(model_name)
+            return FakeModel(model_name)
+
+        return self._get(self._key("sentence_transformer", model_name, options), load)
+
+
+def test_models_are_loaded_once_and_shared():
+    registry = FakeRegistry()
+    models = []
+
+    def get():
+        models.append(registry.get_sentence_transformer("model"))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert registry.loaded == ["model"]
+    assert all(model is models[0] for model in models)
+    assert registry.stats()["hits"] == 7
+
+
+def test_least_recently_used_models_are_evicted_over_budget():
+    registry = FakeRegistry(max_memory_mb=2)
+    registry.get_sentence_transformer("a")
+    registry.get_sentence_transformer("b")
+    registry.get_sentence_transformer("a")
+
+    registry.get_sentence_transformer("c")
+
+    assert set(registry.stats()["models"]) == {"sentence_transformer:a", "sentence_transformer:c"}
+    assert registry.stats()["evictions"] == 1
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = FakeRegistry(max_memory_mb=1)
+    monkeypatch.setattr(embedding_service_module, "get_model_registry", lambda: registry)
+    return registry
+
+
+def test_embedding_service_does_not_keep_evicted_models(registry):
+    service = EmbeddingService(micro_batching=False)
+    assert service.generate_embeddings(["text"]) == [[4.0, 1.0]]
+    model = weakref.ref(service.model)
+
+    # Loading another model evicts the first one, which must then be freed
+    EmbeddingService(micro_batching=False).load_model("other")
+    gc.collect()
+    assert model() is None
+
+    # It is loaded again on next use
+    assert service.generate_embedding("text") == [4.0, 1.0]
+    default = "sentence-transformers/all-MiniLM-L6-v2"
+    assert registry.loaded == [default, "other", default]
+
+
+def test_huggingface_model_does_not_keep_evicted_models():
+    registry = FakeRegistry(max_memory_mb=1)
+    hf_model = huggingface_model.HuggingFaceModel(registry=registry)
+    assert hf_model.get_embeddings(["text"], model_name="first") == [[4.0, 1.0]]
+    model = weakref.ref(registry.get_sentence_transformer("first"))
+
+    hf_model.get_embedding("text", model_name="second")
+    gc.collect()
+
+    assert model() is None
+    assert registry.loaded == ["first", "second"]
+
+
+def test_warm_up_in_background_only_starts_once():
+    registry = FakeRegistry()
+    thread = registry.warm_up_in_background([{"sentence_transformer": "model"}])
+    assert registry.warm_up_in_background([{"sentence_transformer": "other"}]) is thread
+
+    thread.join(timeout=5)
+    assert registry.loaded == ["model"]
@@ -0,0 +1,85 @@
+import time
+from collections import Counter
+
+import pytest
+
+from services.model_service import ModelService
+from utils.http_client import HTTPClient
+
+
+@pytest.fixture
+def service(ollama_server):
+    client = HTTPClient()
+    service = ModelService(http_client=client)
+    service.set_provider_config({"ollama": {"active": True, "base_url": ollama_server.url}})
+    yield service
+    client.close()
+
+
+def slow_first_prompts(payload):
+    # Earlier prompts finish last
+    time.sleep(0.05 / (1 + int(payload["prompt"])))
+    return 200, f"echo {payload['prompt']}"
+
+
+def flaky(failures):
+    attempts = Counter()
+
+    def respond(payload):
+        attempts[payload["prompt"]] += 1
+        if attempts[payload["prompt"]] <= failures.get(payload["prompt"], 0):
+            return 503, "busy"
+        return 200, f"echo {payload['prompt']}"
+
+    return respond
+
+
+def test_query_many_keeps_the_order_of_the_prompts(service, ollama_server):
+    ollama_server.respond = slow_first_prompts
+    prompts = [str(i) for i in range(8)]
+
+    batch = service.query_many(prompts, "ollama", "llama", max_concurrency=4)
+
+    assert [result["text"] for result in batch["results"]] == [f"echo {i}" for i in range(8)]
+    assert batch["succeeded"] == 8 and batch["failed"] == 0
+    assert batch["tokens_used"] == sum(len(f"echo {i}") for i in range(8))
+    assert ollama_server.peak <= 4
+
+
+def test_query_many_retries_failed_prompts(service, ollama_server):
+    ollama_server.respond = flaky({"1": 1, "2": 5})
+
+    batch = service.query_many(["0", "1", "2"], "ollama", "llama", max_retries=2, retry_delay=0)
+
+    first, retried, failed = batch["results"]
+    assert (first["text"], first["attempts"]) == ("echo 0", 1)
+    assert (retried["text"], retried["attempts"]) == ("echo 1", 2)
+    assert "503" in failed["error"] and failed["attempts"] == 3
+    assert batch["succeeded"] == 2 and batch["failed"] == 1
+
+
+def test_query_many_does_not_retry_configuration_errors(service, ollama_server):
+    batch = service.query_many(["0"], "unknown", "llama", retry_delay=0)
+
+    assert batch["results"][0]["attempts"] == 1
+    assert "Unsupported provider" in batch["results"][0]["error"]
+    assert ollama_server.requests == []
+
+
+@pytest.mark.asyncio
+async def test_aquery_many_keeps_order_and_retries(service, ollama_server):
+    responses = flaky({"3": 1})
+
+    def respond(payload):
+        slow_first_prompts(payload)
+        return responses(payload)
+
+    ollama_server.respond = respond
+    prompts = [str(i) for i in range(6)]
+
+    batch = await service.aquery_many(prompts, "ollama", "llama", max_concurrency=2, retry_delay=0)
+
+    assert [result["text"] for result in batch["results"]] == [f"echo {i}" for i in range(6)]
+    assert [result["attempts"] for result in batch["results"]] == [1, 1, 1, 2, 1, 1]
+    assert ollama_server.peak <= 2
+    await service.http_client.aclose()
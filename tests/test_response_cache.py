@@ -0,0 +1,123 @@
+import time
+import zlib
+
+import numpy as np
+import pytest
+
+from services.model_service import ModelService
+from utils.http_client import HTTPClient
+from utils.response_cache import ResponseCache
+
+SCOPE = {"provider": "ollama", "model": "llama"}
+
+
+class FakeEmbeddingService:
+    """Embeds texts at random, except the ones given the same vector"""
+
+    def __init__(self, same=()):
+        self.embedded = []
+        self.same = {text: "same" for text in same}
+
+    def generate_embedding(self, text):
+        self.embedded.append(text)
+        seed = zlib.crc32(self.same.get(text, text).encode())
+        return np.random.default_rng(seed).normal(size=16).tolist()
+
+
+@pytest.fixture
+def embedding_service():
+    return FakeEmbeddingService(same=["How do I sort a list?", "How can I sort a list?"])
+
+
+def make_cache(tmp_path, **options):
+    return ResponseCache(str(tmp_path / "responses.db"), **options)
+
+
+def test_exact_hits_ignore_whitespace_and_stay_in_scope(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("sort  a list", response={"text": "sorted()"}, **SCOPE)
+
+    assert cache.get(" sort a\nlist ", **SCOPE) == {"text": "sorted()"}
+    assert cache.get("sort a list", provider="ollama", model="other") is None
+    assert cache.get("sort a list", temperature=0.5, **SCOPE) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_responses_persist_and_expire(tmp_path, monkeypatch):
+    make_cache(tmp_path, ttl=10).put("prompt", response={"text": "answer"}, **SCOPE)
+
+    cache = make_cache(tmp_path, ttl=10)
+    assert cache.get("prompt", **SCOPE) == {"text": "answer"}
+
+    now = time.time()
+    monkeypatch.setattr("utils.response_cache.time.time", lambda: now + 11)
+    assert cache.get("prompt", **SCOPE) is None
+    assert cache.purge_expired() == 1
+
+
+def test_semantic_hits_embed_each_prompt_once(tmp_path, embedding_service):
+    cache = make_cache(tmp_path, embedding_service=embedding_service)
+
+    response, embedding = cache.lookup("How do I sort a list?", **SCOPE)
+    assert response is None
+    cache.put("How do I sort a list?", response={"text": "sorted()"}, embedding=embedding, **SCOPE)
+    assert embedding_service.embedded == ["How do I sort a list?"]
+
+    assert cache.get("How can I sort a list?", **SCOPE) == {"text": "sorted()"}
+    assert cache.get("What is a tuple?", **SCOPE) is None
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_puts_extend_the_semantic_index(tmp_path, embedding_service):
+    cache = make_cache(tmp_path, embedding_service=embedding_service)
+    cache.put("What is a tuple?", response={"text": "immutable"}, **SCOPE)
+    assert cache.get("What is a list?", **SCOPE) is None
+    index = next(iter(cache._semantic_indexes.values()))[2]
+
+    for i in range(20):
+        cache.put(f"prompt {i}", response={"text": str(i)}, **SCOPE)
+    cache.put("How do I sort a list?", response={"text": "sorted()"}, **SCOPE)
+
+    # Found in the same index, which was not rebuilt
+    assert cache.get("How can I sort a list?", **SCOPE) == {"text": "sorted()"}
+    assert next(iter(cache._semantic_indexes.values()))[2] is index
+    assert len(index) == 22
+
+
+@pytest.fixture
+def service(tmp_path, ollama_server):
+    client = HTTPClient()
+    service = ModelService(http_client=client, response_cache=make_cache(tmp_path))
+    service.set_provider_config({"ollama": {"active": True, "base_url": ollama_server.url}})
+    yield service
+    client.close()
+
+
+def test_query_model_caches_deterministic_queries(service, ollama_server):
+    first = service.query_model("hello", "ollama", "llama", temperature=0)
+    second = service.query_model("hello", "ollama", "llama", temperature=0)
+    service.query_model("hello", "ollama", "llama", temperature=0.7)
+
+    assert "cached" not in first
+    assert second == {**first, "cached": True, "tokens_used": 0}
+    assert len(ollama_server.requests) == 2
+
+
+def test_query_model_does_not_cache_errors(service, ollama_server):
+    ollama_server.respond = lambda payload: (500, "boom")
+    service.query_model("hello", "ollama", "llama", temperature=0)
+    ollama_server.respond = lambda payload: (200, "fine")
+
+    assert service.query_model("hello", "ollama", "llama", temperature=0)["text"] == "fine"
+
+
+@pytest.mark.asyncio
+async def test_async_queries_use_the_cache(service, ollama_server):
+    first = await service.aquery_model("hello", "ollama", "llama", temperature=0)
+    batch = await service.aquery_many(["hello", "other"], "ollama", "llama", temperature=0)
+    uncached = await service.aquery_model("hello", "ollama", "llama", temperature=0, use_cache=False)
+
+    assert batch["results"][0] == {**first, "cached": True, "tokens_used": 0, "attempts": 1}
+    assert "cached" not in uncached
+    assert [request["prompt"] for request in ollama_server.requests] == ["hello", "other", "hello"]
+    await service.http_client.aclose()
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from services.embedding_service import EmbeddingService, SimilarityIndex
+
+
+def brute_force(queries, embeddings, metric):
+    scores = []
+    for query in queries:
+        row = []
+        for embedding in embeddings:
+            if metric == "cosine":
+                norms = np.linalg.norm(query) * np.linalg.norm(embedding)
+                row.append(np.dot(query, embedding) / norms if norms else 0.0)
+            elif metric == "dot":
+                row.append(np.dot(query, embedding))
+            else:
+                row.append(1 / (1 + np.linalg.norm(query - embedding)))
+        scores.append(row)
+    return np.array(scores)
+
+
+@pytest.mark.parametrize("metric", SimilarityIndex.METRICS)
+def test_search_batch_matches_brute_force(metric):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(50, 16))
+    embeddings[3] = 0
+    queries = rng.normal(size=(4, 16))
+
+    results = SimilarityIndex(embeddings.tolist(), metric=metric).search_batch(queries.tolist(), top_k=5)
+
+    expected = brute_force(queries, embeddings, metric)
+    for result, scores in zip(results, expected, strict=True):
+        assert [item["index"] for item in result] == list(np.argsort(-scores, kind="stable")[:5])
+        assert [item["score"] for item in result] == pytest.approx(sorted(scores, reverse=True)[:5], abs=1e-5)
+
+
+def test_added_embeddings_are_searched_like_initial_ones():
+    embeddings = np.random.default_rng(2).normal(size=(30, 8))
+    index = SimilarityIndex([])
+    for start in range(0, 30, 7):
+        index.add(embeddings[start:start + 7].tolist())
+
+    expected = SimilarityIndex(embeddings.tolist())
+    assert len(index) == 30
+    assert index.search_batch(embeddings[:3].tolist()) == expected.search_batch(embeddings[:3].tolist())
+
+    with pytest.raises(ValueError, match="dimension"):
+        index.add([[1.0, 2.0]])
+
+
+def test_search_returns_every_embedding_when_top_k_is_larger():
+    index = SimilarityIndex([[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+
+    results = index.search([1.0, 0.0], top_k=10)
+
+    assert [item["index"] for item in results] == [0, 2, 1]
+    assert results[0]["score"] == pytest.approx(1.0)
+
+
+def test_search_of_an_empty_index():
+    index = SimilarityIndex([])
+
+    assert len(index) == 0
+    assert index.search_batch([[1.0, 0.0], [0.0, 1.0]]) == [[], []]
+    assert index.search_batch([]) == []
+
+
+def test_unknown_metric_is_rejected():
+    with pytest.raises(ValueError, match="Unknown similarity metric"):
+        SimilarityIndex([[1.0]], metric="manhattan")
+
+
+def test_find_most_similar_agrees_with_compute_similarity():
+    service = EmbeddingService(micro_batching=False)
+    embeddings = np.random.default_rng(1).normal(size=(20, 8)).tolist()
+    query = embeddings[4]
+
+    results = service.find_most_similar(query, embeddings, top_k=3)
+
+    assert results[0]["index"] == 4
+    for item in results:
+        assert item["score"] == pytest.approx(service.compute_similarity(query, embeddings[item["index"]]), abs=1e-5)
@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+from utils.document_processor import DocumentProcessor
+from utils.text_chunker import TextChunker
+
+
+def random_text(seed, words=600):
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(words):
+        roll = rng.random()
+        if roll < 0.02:
+            # A run without whitespace, e.g. base64
+            parts.append("".join(rng.choice("abcdef0123456789") for _ in range(rng.randint(50, 400))))
+        else:
+            parts.append("".join(rng.choice("abcdefghij") for _ in range(rng.randint(1, 12))))
+        parts.append(rng.choice([" "] * 12 + [". ", "\n", "\n\n", "\n\ndef "]))
+    return "".join(parts)
+
+
+def count_words(texts):
+    # A stand-in tokenizer, a token per run of at most 5 non-whitespace characters
+    return [sum(-(-len(word) // 5) for word in text.split()) for text in texts]
+
+
+def assert_covers(text, offsets):
+    # Every non-whitespace character is in a chunk, and chunks move forward
+    covered = bytearray(len(text))
+    for start, end in offsets:
+        covered[start:end] = b"\1" * (end - start)
+    assert all(covered[i] for i in range(len(text)) if not text[i].isspace())
+    starts = [start for start, _ in offsets]
+    assert starts == sorted(set(starts))
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("chunk_size, overlap", [(200, 0), (200, 50), (64, 16)])
+def test_character_chunks_fit_and_cover_the_text(seed, chunk_size, overlap):
+    text = random_text(seed)
+
+    offsets = TextChunker(chunk_size, overlap, batch_size=97).split(text, return_offsets=True)
+
+    assert all(end - start <= chunk_size for start, end in offsets)
+    assert_covers(text, offsets)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_token_chunks_fit_and_cover_the_text(seed):
+    text = random_text(seed)
+
+    offsets = TextChunker(40, 8, length_function=count_words, batch_size=50).split(text, return_offsets=True)
+
+    assert max(count_words([text[start:end] for start, end in offsets])) <= 40
+    assert_covers(text, offsets)
+
+
+def test_chunks_are_cut_at_paragraphs_when_possible():
+    paragraphs = [" ".join(["word"] * 30) + "." for _ in range(6)]
+
+    chunks = TextChunker(400, 0).split("\n\n".join(paragraphs))
+
+    assert len(chunks) > 1
+    assert all(part in paragraphs for chunk in chunks for part in chunk.strip().split("\n\n"))
+
+
+def test_chunks_of_a_stream_match_the_chunks_of_the_joined_text():
+    segments = [random_text(seed, words=80) for seed in range(6)]
+    chunker = TextChunker(150, 30, batch_size=16)
+
+    streamed = list(chunker.iter_chunks(segments))
+
+    assert streamed == chunker.split(TextChunker.SEPARATOR.join(segments))
+
+
+def test_offsets_match_the_chunks():
+    text = random_text(7)
+    chunker = TextChunker(100, 20)
+
+    offsets = chunker.split(text, return_offsets=True)
+
+    assert [text[start:end] for start, end in offsets] == chunker.split(text)
+
+
+def test_short_and_blank_texts_are_one_chunk():
+    assert TextChunker(100, 10).split("short text") == ["short text"]
+    assert TextChunker(100, 10).split("   \n ") == ["   \n "]
+
+
+def test_invalid_sizes_are_rejected():
+    with pytest.raises(ValueError):
+        TextChunker(0, 0)
+    with pytest.raises(ValueError):
+        TextChunker(100, 100)
+
+
+def test_document_processor_clamps_the_overlap():
+    text = random_text(3, words=100)
+
+    chunks = DocumentProcessor.chunk_text(text, chunk_size=50, overlap=80)
+
+    assert chunks == TextChunker(50, 49).split(text)
+    assert list(DocumentProcessor.iter_chunks([text], chunk_size=50, overlap=-5)) == TextChunker(50, 0).split(text)
@@ -0,0 +1,139 @@
+import json
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+from services.vector_store_service import MetadataStore, VectorStoreService  # noqa: E402
+
+DIMENSION = 8
+INDEX_OPTIONS = {
+    "flat": {},
+    "ivf_flat": {"nlist": 4, "train_size": 64},
+    "ivf_pq": {"nlist": 4, "pq_m": 4, "train_size": 256},
+    "hnsw": {"hnsw_m": 8},
+}
+
+
+def make_vectors(count, seed=0):
+    return np.random.default_rng(seed).random((count, DIMENSION), dtype=np.float32)
+
+
+def make_store(path, index_type):
+    store = VectorStoreService(str(path), max_resident_mb=64)
+    store.create_index(DIMENSION, index_type=index_type, nprobe=4, **INDEX_OPTIONS[index_type])
+    return store
+
+
+def top_ids(store, vector, top_k=3):
+    return [result["vector_id"] for result in store.search(vector.tolist(), top_k=top_k)]
+
+
+# Training PQ codebooks takes seconds, only the round trip covers ivf_pq
+FAST_INDEX_TYPES = ["flat", "ivf_flat", "hnsw"]
+
+
+@pytest.mark.parametrize("index_type", FAST_INDEX_TYPES)
+def test_search_finds_the_vector_itself(tmp_path, index_type):
+    store = make_store(tmp_path, index_type)
+    vectors = make_vectors(300)
+    assert store.add_vectors(vectors.tolist(), [{"text": str(i)} for i in range(300)])
+
+    results = store.search(vectors[7].tolist(), top_k=3)
+
+    assert results[0]["vector_id"] == 7
+    assert results[0]["text"] == "7"
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat"])
+def test_search_does_not_count_the_metadata(tmp_path, index_type, monkeypatch):
+    store = make_store(tmp_path, index_type)
+    vectors = make_vectors(10)
+    assert store.search(vectors[0].tolist()) == []
+    # Ten vectors stay pending below the ivf_flat training size
+    store.add_vectors(vectors.tolist(), [{"text": str(i)} for i in range(10)])
+    monkeypatch.setattr(MetadataStore, "__len__", lambda self: pytest.fail("metadata counted"))
+
+    assert top_ids(store, vectors[3])[0] == 3
+
+
+@pytest.mark.parametrize("index_type", FAST_INDEX_TYPES)
+def test_delete_and_upsert(tmp_path, index_type):
+    store = make_store(tmp_path, index_type)
+    vectors = make_vectors(300)
+    store.add_vectors(vectors.tolist(), [{"text": str(i)} for i in range(300)])
+
+    assert store.delete_vectors([7, 8]) == 2
+    assert 7 not in top_ids(store, vectors[7], top_k=10)
+
+    replacement = make_vectors(1, seed=1)[0]
+    assert store.upsert_vectors([9], [replacement.tolist()], [{"text": "new"}])
+    assert store.get_metadata([9]) == {9: {"text": "new"}}
+    assert top_ids(store, replacement)[0] == 9
+
+
+@pytest.mark.parametrize("index_type", list(INDEX_OPTIONS))
+def test_save_and_load_round_trip(tmp_path, index_type):
+    store = make_store(tmp_path, index_type)
+    vectors = make_vectors(300)
+    store.add_vectors(vectors.tolist(), [{"text": str(i)} for i in range(300)])
+    store.delete_vectors([3])
+    assert store.save("docs")
+
+    # Only the changes are written by the next save
+    store.add_vectors(make_vectors(1, seed=2).tolist(), [{"text": "added"}], ids=[1000])
+    assert store.save("docs")
+
+    loaded = VectorStoreService(str(tmp_path))
+    assert loaded.load("docs")
+    assert top_ids(loaded, vectors[5])[0] == 5
+    assert 3 not in top_ids(loaded, vectors[3], top_k=10)
+    assert loaded.get_metadata([1000]) == {1000: {"text": "added"}}
+
+    # Mapped indexes are copied into memory before they change
+    assert loaded.add_vectors(make_vectors(1, seed=3).tolist(), [{"text": "more"}])
+    assert loaded.delete_vectors([5]) == 1
+
+
+def test_hnsw_save_compacts_deleted_vectors(tmp_path):
+    store = make_store(tmp_path, "hnsw")
+    vectors = make_vectors(100)
+    store.add_vectors(vectors.tolist(), [{"text": str(i)} for i in range(100)])
+
+    store.delete_vectors(list(range(10)))
+    store.save("docs")
+    assert store.index.ntotal == 100
+
+    store.delete_vectors(list(range(10, 30)))
+    store.save("docs")
+    assert store.index.ntotal == 70
+
+    loaded = VectorStoreService(str(tmp_path))
+    loaded.load("docs")
+    assert loaded.index.ntotal == 70
+    assert top_ids(loaded, vectors[50])[0] == 50
+    assert not set(top_ids(loaded, vectors[5], top_k=70)) & set(range(30))
+
+
+def test_load_migrates_indexes_of_the_old_format(tmp_path):
+    vectors = make_vectors(20)
+    index_dir = tmp_path / "old"
+    os.makedirs(index_dir)
+    index = faiss.IndexFlatL2(DIMENSION)
+    index.add(vectors)
+    faiss.write_index(index, str(index_dir / "index.faiss"))
+    with open(index_dir / "config.pkl", "wb") as f:
+        pickle.dump({"dimension": DIMENSION}, f)
+    with open(index_dir / "metadata.json", "w") as f:
+        json.dump([{"text": str(i)} for i in range(20)], f)
+
+    store = VectorStoreService(str(tmp_path))
+    assert store.load("old")
+
+    assert store.search(vectors[4].tolist(), top_k=1)[0] == {"score": pytest.approx(1.0), "vector_id": 4, "text": "4"}
+    assert store.delete_vectors([4]) == 1
+    assert store.save("old")
+    assert os.path.exists(index_dir / "metadata.db")
@@ -1,7 +1,6 @@
-import os
-import tempfile
-from typing import Dict, List, Any, Optional, BinaryIO, Union
-import base64
+import io
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator, Tuple, Union
+from utils.text_chunker import TextChunker
 
 class DocumentProcessor:
     """Utility for processing various document types"""
@@ -25,6 +24,25 @@ class DocumentProcessor:
                 return file_content.decode('latin-1')
         return file_content
     
+    @staticmethod
+    def iter_pages_from_pdf(file_content: bytes) -> Iterator[str]:
+        """
+        Extract text from a PDF file one page at a time
+        
+        Args:
+            file_content: Content of the PDF file
+            
+        Yields:
+            Text of each page
+        """
+        # Import here to avoid loading dependencies unless needed
+        import PyPDF2
+        
+        # Read from memory, pages are only parsed when reached
+        reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+        for page in reader.pages:
+            yield page.extract_text() or ""
+    
     @staticmethod
     def extract_text_from_pdf(file_content: bytes) -> str:
         """
@@ -37,30 +55,29 @@ class DocumentProcessor:
             Extracted text
         """
         try:
-            # Import here to avoid loading dependencies unless needed
-            import PyPDF2
-            import io
-            
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                temp_file.write(file_content)
-                temp_path = temp_file.name
-            
-            # Extract text
-            text = ""
-            with open(temp_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                for page_num in range(len(reader.pages)):
-                    text += reader.pages[page_num].extract_text() + "\n\n"
-            
-            # Remove temporary file
-            os.unlink(temp_path)
-            
-            return text
+            return "".join(page + "\n\n" for page in DocumentProcessor.iter_pages_from_pdf(file_content))
         except Exception as e:
             print(f"Error extracting text from PDF: {e}")
             return ""
     
+    @staticmethod
+    def iter_paragraphs_from_docx(file_content: bytes) -> Iterator[str]:
+        """
+        Extract text from a DOCX file one paragraph at a time
+        
+        Args:
+            file_content: Content of the DOCX file
+            
+        Yields:
+            Text of each paragraph
+        """
+        # Import here to avoid loading dependencies unless needed
+        import docx
+        
+        doc = docx.Document(io.BytesIO(file_content))
+        for paragraph in doc.paragraphs:
+            yield paragraph.text
+    
     @staticmethod
     def extract_text_from_docx(file_content: bytes) -> str:
         """
@@ -73,23 +90,7 @@ class DocumentProcessor:
             Extracted text
         """
         try:
-            # Import here to avoid loading dependencies unless needed
-            import docx
-            import io
-            
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as temp_file:
-                temp_file.write(file_content)
-                temp_path = temp_file.name
-            
-            # Extract text
-            doc = docx.Document(temp_path)
-            text = "\n\n".join([paragraph.text for paragraph in doc.paragraphs])
-            
-            # Remove temporary file
-            os.unlink(temp_path)
-            
-            return text
+            return "\n\n".join(DocumentProcessor.iter_paragraphs_from_docx(file_content))
         except Exception as e:
             print(f"Error extracting text from DOCX: {e}")
             return ""
@@ -143,45 +144,174 @@ class DocumentProcessor:
             raise ValueError(f"Unsupported file type: {file_type}")
     
     @staticmethod
-    def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 100) -> List[str]:
+    def iter_text(file_content: Union[str, bytes], file_type: str) -> Iterator[str]:
         """
-        Split text into chunks with overlap
+        Extract text from a file based on its type, one page or paragraph at a time
+        
+        Args:
+            file_content: Content of the file
+            file_type: Type of the file (txt, pdf, docx, md)
+            
+        Yields:
+            Consecutive pieces of the text, each followed by a blank line in the full text
+        """
+        file_type = file_type.lower()
+        
+        if file_type == 'pdf':
+            if isinstance(file_content, str):
+                file_content = file_content.encode('utf-8')
+            yield from DocumentProcessor.iter_pages_from_pdf(file_content)
+        elif file_type == 'docx':
+            if isinstance(file_content, str):
+                file_content = file_content.encode('utf-8')
+            yield from DocumentProcessor.iter_paragraphs_from_docx(file_content)
+        else:
+            yield DocumentProcessor.extract_text(file_content, file_type)
+    
+    @staticmethod
+    def chunk_text(text: str,
+                   chunk_size: int = 1000,
+                   overlap: int = 100,
+                   length_function: Optional[Callable[[List[str]], List[int]]] = None,
+                   return_offsets: bool = False) -> List[Union[str, Tuple[int, int]]]:
+        """
+        Split text into chunks with overlap, at paragraph, code block and sentence boundaries where possible
         
         Args:
             text: Text to split
-            chunk_size: Size of each chunk in characters
-            overlap: Overlap between chunks in characters
+            chunk_size: Size of each chunk, in characters unless length_function is given
+            overlap: Overlap between chunks, clamped below chunk_size
+            length_function: Batched length of texts, e.g. EmbeddingService.count_tokens
+            return_offsets: Whether to return (start, end) offsets into text instead of copies of the chunks
             
         Returns:
-            List of text chunks
+            List of text chunks, or their offsets
+        """
+        chunker = DocumentProcessor._chunker(chunk_size, overlap, length_function)
+        return chunker.split(text, return_offsets=return_offsets)
+    
+    @staticmethod
+    def iter_chunks(segments: Iterable[str],
+                    chunk_size: int = 1000,
+                    overlap: int = 100,
+                    length_function: Optional[Callable[[List[str]], List[int]]] = None,
+                    return_offsets: bool = False) -> Iterator[Union[str, Tuple[int, int]]]:
         """
-        chunks = []
+        Split a stream of text into chunks with overlap, without joining the whole text first
         
-        if len(text) <= chunk_size:
-            chunks.append(text)
-        else:
-            start = 0
-            while start < len(text):
-                end = min(start + chunk_size, len(text))
-                
-                # Adjust end to avoid cutting words
-                if end < len(text):
-                    # Find the last space within the chunk
-                    last_space = text.rfind(' ', start, end)
-                    if last_space != -1:
-                        end = last_space
-                
-                # Add chunk
-                chunks.append(text[start:end])
+        Args:
+            segments: Consecutive pieces of text, e.g. from iter_text
+            chunk_size: Size of each chunk, in characters unless length_function is given
+            overlap: Overlap between chunks, clamped below chunk_size
+            length_function: Batched length of texts, e.g. EmbeddingService.count_tokens
+            return_offsets: Whether to yield (start, end) offsets into the segments joined by blank lines
+            
+        Yields:
+            Text chunks, or their offsets
+        """
+        chunker = DocumentProcessor._chunker(chunk_size, overlap, length_function)
+        yield from chunker.iter_chunks(segments, return_offsets=return_offsets)
+    
+    @staticmethod
+    def _chunker(chunk_size: int,
+                 overlap: int,
+                 length_function: Optional[Callable[[List[str]], List[int]]]) -> TextChunker:
+        # Chunks must advance, an overlap of a whole chunk or more is reduced rather than rejected
+        return TextChunker(chunk_size, max(0, min(overlap, chunk_size - 1)), length_function)
+    
+    @staticmethod
+    def iter_batches(items: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+        """
+        Group items into lists of at most batch_size
+        
+        Args:
+            items: Items to group
+            batch_size: Maximum size of each batch
+            
+        Yields:
+            Batches of items
+        """
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    @staticmethod
+    def ingest(file_content: Union[str, bytes],
+               file_type: str,
+               embedding_service: Any,
+               vector_store: Any,
+               metadata: Optional[Dict[str, Any]] = None,
+               chunk_size: int = 1000,
+               overlap: int = 100,
+               batch_size: int = 64,
+               progress_callback: Optional[Callable[[int], None]] = None,
+               index_name: Optional[str] = None,
+               chunk_unit: str = "tokens") -> int:
+        """
+        Extract, chunk, embed and index a document in batches
+        
+        Pages are read, chunked, embedded and added to the index as a stream, so memory
+        holds about one batch of chunks at a time instead of several copies of the document.
+        
+        Args:
+            file_content: Content of the file
+            file_type: Type of the file (txt, pdf, docx, md)
+            embedding_service: EmbeddingService used to embed the chunks
+            vector_store: VectorStoreService the chunks are added to
+            metadata: Metadata stored with every chunk
+            chunk_size: Size of each chunk
+            overlap: Overlap between chunks
+            batch_size: Number of chunks embedded and added to the index at once
+            progress_callback: Called with the number of chunks indexed so far after each batch
+            index_name: Name to save the index under once the document is indexed, if any
+            chunk_unit: "tokens" of the embedding model, in which case chunk_size is capped at the
+                model's maximum sequence length so that no chunk is truncated, or "characters"
+            
+        Returns:
+            Number of chunks indexed
+        """
+        metadata = metadata or {}
+        indexed = 0
+        
+        try:
+            segments = DocumentProcessor.iter_text(file_content, file_type)
+            length_function = None
+            if chunk_unit == "tokens":
+                length_function = embedding_service.count_tokens
+                max_tokens = embedding_service.max_tokens()
+                if max_tokens:
+                    chunk_size = min(chunk_size, max_tokens)
+                    overlap = min(overlap, chunk_size // 2)
+            chunks = DocumentProcessor.iter_chunks(segments, chunk_size=chunk_size, overlap=overlap,
+                                                   length_function=length_function)
+            chunks = (chunk for chunk in chunks if chunk.strip())
+            for batch in DocumentProcessor.iter_batches(chunks, batch_size):
+                embeddings = embedding_service.generate_embeddings(batch)
+                if embeddings is None:
+                    print("Error ingesting document: embeddings could not be generated")
+                    return indexed
                 
-                # Move start position for next chunk
-                start = end - overlap
+                metadata_list = [
+                    {**metadata, "text": chunk, "chunk_index": indexed + i}
+                    for i, chunk in enumerate(batch)
+                ]
+                if not vector_store.add_vectors(embeddings, metadata_list):
+                    print("Error ingesting document: vectors could not be added to the index")
+                    return indexed
                 
-                # Adjust start to avoid cutting words
-                if start > 0:
-                    # Find the first space after start
-                    first_space = text.find(' ', start)
-                    if first_space != -1 and first_space < start + overlap:
-                        start = first_space + 1
-        
-        return chunks
+                indexed += len(batch)
+                if progress_callback:
+                    progress_callback(indexed)
+        except Exception as e:
+            print(f"Error ingesting document: {e}")
+            return indexed
+        
+        if index_name:
+            vector_store.save(index_name)
+        
+        return indexed
@@ -0,0 +1,292 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from typing import Dict, List, Any, Optional, Callable, Sequence, Tuple
+import numpy as np
+
+class EmbeddingCache:
+    """Persistent on-disk cache of embeddings keyed by model name and text hash
+
+    Embeddings are stored in a SQLite database in cache_dir. SQLite locks the file, so the
+    processes sharing the directory can read and write it concurrently. Within a process, use
+    get_embedding_cache so that every session shares the same instance.
+    """
+
+    # Last-used times are written in batches rather than on every hit
+    TOUCH_BATCH_SIZE = 256
+    # Share of max_entries evicted at once, so that the entries are not counted on every put
+    EVICTION_FRACTION = 0.01
+    # Keys looked up per query, below the SQLite limit of bound parameters
+    QUERY_BATCH_SIZE = 500
+
+    def __init__(self, cache_dir: str = "./data/embedding_cache", max_entries: int = 200000):
+        """
+        Initialize the embedding cache
+
+        Args:
+            cache_dir: Directory to store the cached embeddings
+            max_entries: Maximum number of embeddings kept per model, least recently used are evicted first
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.db_path = os.path.join(cache_dir, "embeddings.db")
+        self.hits = 0
+        self.misses = 0
+        # (model, key) -> last used time, not written yet
+        self._touched: Dict[Tuple[str, str], float] = {}
+        # model -> upper bound of its number of entries, counted again once above max_entries
+        self._counts: Dict[str, int] = {}
+        # model -> size in bytes of its vectors
+        self._vector_sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        # Create directory if it doesn't exist
+        os.makedirs(cache_dir, exist_ok=True)
+        # Wait for the other processes holding the lock rather than failing
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(model TEXT NOT NULL, key TEXT NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL, "
+                "PRIMARY KEY (model, key)) WITHOUT ROWID"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (model, last_used)")
+
+    @staticmethod
+    def text_key(text: str) -> str:
+        """
+        Get the cache key of a text
+
+        Args:
+            text: The text to hash
+
+        Returns:
+            SHA-256 hex digest of the normalized text
+        """
+        # Whitespace differences don't change the tokens seen by the model
+        normalized = re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up the embeddings of several texts
+
+        Args:
+            model_name: Name of the embedding model
+            texts: Texts to look up
+
+        Returns:
+            One embedding per text, or None for texts that are not cached
+        """
+        keys = [self.text_key(text) for text in texts]
+        with self._lock:
+            return self._lookup(model_name, keys)
+
+    def put_many(self, model_name: str, texts: Sequence[str], embeddings: Any) -> None:
+        """
+        Store the embeddings of several texts
+
+        Args:
+            model_name: Name of the embedding model
+            texts: Texts that were encoded
+            embeddings: One embedding per text
+        """
+        if len(texts) == 0:
+            return
+        keys = [self.text_key(text) for text in texts]
+        with self._lock:
+            self._put(model_name, keys, np.asarray(embeddings, dtype=np.float32))
+
+    def encode(self, model_name: str, texts: Sequence[str], encode_fn: Callable[[List[str]], Any]) -> np.ndarray:
+        """
+        Get the embeddings of several texts, only encoding the ones that are not cached
+
+        Args:
+            model_name: Name of the embedding model
+            texts: Texts to get embeddings for
+            encode_fn: Function encoding a list of texts, e.g. SentenceTransformer.encode
+
+        Returns:
+            Matrix with one embedding per text
+        """
+        keys = [self.text_key(text) for text in texts]
+        with self._lock:
+            vectors = self._lookup(model_name, keys)
+
+        # Encode each distinct missing text once
+        missing: Dict[str, List[int]] = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(keys[i], []).append(i)
+
+        if missing:
+            missing_keys = list(missing)
+            missing_texts = [texts[missing[key][0]] for key in missing_keys]
+            encoded = np.asarray(encode_fn(missing_texts), dtype=np.float32).reshape(len(missing_texts), -1)
+            with self._lock:
+                self._put(model_name, missing_keys, encoded)
+            for key, vector in zip(missing_keys, encoded, strict=True):
+                for i in missing[key]:
+                    vectors[i] = vector
+
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack(vectors)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with hits, misses, hit rate and number of cached embeddings per model
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            rows = self._conn.execute("SELECT model, COUNT(*) FROM embeddings GROUP BY model").fetchall()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": dict(rows),
+                "max_entries": self.max_entries
+            }
+
+    def clear(self, model_name: Optional[str] = None) -> None:
+        """
+        Remove cached embeddings
+
+        Args:
+            model_name: Model to clear, or None to clear every model
+        """
+        with self._lock, self._conn:
+            if model_name:
+                self._conn.execute("DELETE FROM embeddings WHERE model = ?", (model_name,))
+                self._touched = {key: used for key, used in self._touched.items() if key[0] != model_name}
+                self._counts.pop(model_name, None)
+                self._vector_sizes.pop(model_name, None)
+            else:
+                self._conn.execute("DELETE FROM embeddings")
+                self._touched.clear()
+                self._counts.clear()
+                self._vector_sizes.clear()
+
+    def close(self) -> None:
+        """Write the pending last-used times and close the database"""
+        with self._lock:
+            with self._conn:
+                self._write_touched()
+            self._conn.close()
+
+    def _lookup(self, model_name: str, keys: List[str]) -> List[Optional[np.ndarray]]:
+        found: Dict[str, bytes] = {}
+        distinct = list(dict.fromkeys(keys))
+        for start in range(0, len(distinct), self.QUERY_BATCH_SIZE):
+            batch = distinct[start:start + self.QUERY_BATCH_SIZE]
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({','.join('?' * len(batch))})",
+                [model_name, *batch]
+            ).fetchall()
+            found.update(rows)
+
+        vector_size = self._vector_sizes.get(model_name)
+        now = time.time()
+        vectors: List[Optional[np.ndarray]] = []
+        for key in keys:
+            blob = found.get(key)
+            if blob is None or (vector_size is not None and len(blob) != vector_size):
+                vectors.append(None)
+                continue
+            self._touched[(model_name, key)] = now
+            vectors.append(np.frombuffer(blob, dtype=np.float32).copy())
+
+        hits = sum(vector is not None for vector in vectors)
+        self.hits += hits
+        self.misses += len(vectors) - hits
+        if len(self._touched) >= self.TOUCH_BATCH_SIZE:
+            with self._conn:
+                self._write_touched()
+        return vectors
+
+    def _put(self, model_name: str, keys: List[str], embeddings: np.ndarray) -> None:
+        embeddings = embeddings.reshape(len(keys), -1)
+        vector_size = embeddings.shape[1] * embeddings.dtype.itemsize
+        now = time.time()
+        with self._conn:
+            if self._vector_sizes.get(model_name) != vector_size:
+                row = self._conn.execute(
+                    "SELECT length(vector) FROM embeddings WHERE model = ? LIMIT 1", (model_name,)
+                ).fetchone()
+                if row is not None and row[0] != vector_size:
+                    # The model now produces vectors of another size
+                    self._conn.execute("DELETE FROM embeddings WHERE model = ?", (model_name,))
+                    self._counts[model_name] = 0
+                self._vector_sizes[model_name] = vector_size
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, key, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(model_name, key, embedding.tobytes(), now) for key, embedding in zip(keys, embeddings, strict=True)]
+            )
+            self._write_touched()
+
+            if model_name not in self._counts:
+                self._counts[model_name] = self._count(model_name)
+            else:
+                # Replaced keys are counted too, so this stays an upper bound
+                self._counts[model_name] += len(keys)
+            if self._counts[model_name] > self.max_entries:
+                self._evict(model_name)
+
+    def _count(self, model_name: str) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (model_name,)).fetchone()[0]
+
+    def _evict(self, model_name: str) -> None:
+        count = self._count(model_name)
+        if count > self.max_entries:
+            # Evict a little more than needed so that the next puts don't count again
+            target = self.max_entries - int(self.max_entries * self.EVICTION_FRACTION)
+            # Least recently used first, read from the (model, last_used) index
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE model = ? AND key IN "
+                "(SELECT key FROM embeddings WHERE model = ? ORDER BY last_used LIMIT ?)",
+                (model_name, model_name, count - target)
+            )
+            count = target
+        self._counts[model_name] = count
+
+    def _write_touched(self) -> None:
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE embeddings SET last_used = max(last_used, ?) WHERE model = ? AND key = ?",
+            [(used, model, key) for (model, key), used in self._touched.items()]
+        )
+        self._touched.clear()
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+def get_embedding_cache(cache_dir: str = "./data/embedding_cache", max_entries: Optional[int] = None) -> EmbeddingCache:
+    """
+    Get the embedding cache of a directory shared by every session of the process
+
+    Args:
+        cache_dir: Directory to store the cached embeddings
+        max_entries: Maximum number of embeddings kept per model, applied when given
+
+    Returns:
+        Shared EmbeddingCache
+    """
+    path = os.path.realpath(cache_dir)
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = EmbeddingCache(cache_dir)
+        if max_entries is not None:
+            _caches[path].max_entries = max_entries
+        return _caches[path]
@@ -0,0 +1,247 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Any, Optional
+
+class HTTPCache:
+    """On-disk cache of GET responses with their validators, for conditional requests"""
+    
+    # Last-used times are written in batches rather than on every hit
+    TOUCH_BATCH_SIZE = 256
+    # Share of max_entries evicted at once, so that the entries are not counted on every put
+    EVICTION_FRACTION = 0.01
+    
+    def __init__(self,
+                 db_path: str = "./data/http_cache.db",
+                 max_entries: int = 20000,
+                 ttl: Optional[float] = 30 * 86400):
+        """
+        Initialize the HTTP cache
+        
+        Args:
+            db_path: SQLite database file
+            max_entries: Maximum number of cached responses, least recently used are evicted first
+            ttl: Seconds a response is kept after it was stored or last revalidated, None to keep
+                responses until they are evicted
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        # key -> last used time, not written yet
+        self._touched: Dict[str, float] = {}
+        # Upper bound of the number of entries, counted again once above max_entries
+        self._count: Optional[int] = None
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, link TEXT, body TEXT NOT NULL, stored_at REAL, "
+            "last_used REAL)"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(responses)")]
+        if "last_used" not in columns:
+            # Caches written before eviction existed
+            self._conn.execute("ALTER TABLE responses ADD COLUMN last_used REAL")
+            self._conn.execute("UPDATE responses SET last_used = stored_at")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+        self.purge_expired()
+    
+    @staticmethod
+    def key(url: str, params: Optional[Dict[str, Any]] = None, credentials: Optional[str] = None) -> str:
+        """
+        Get the cache key of a request
+        
+        Args:
+            url: Request URL
+            params: Query parameters
+            credentials: Authorization header, responses differ between users
+        
+        Returns:
+            SHA-256 hex digest of the request
+        """
+        parts = [url, sorted((params or {}).items()), credentials or ""]
+        return hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response
+        
+        Args:
+            key: Cache key of the request
+        
+        Returns:
+            Dictionary with etag, last_modified, link and body, or None if there is none
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, link, body FROM responses WHERE key = ? AND stored_at > ?",
+                (key, self._expired_before(now))
+            ).fetchone()
+            if row is None:
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.TOUCH_BATCH_SIZE:
+                self._write_touched()
+                self._conn.commit()
+        return {"etag": row[0], "last_modified": row[1], "link": row[2], "body": json.loads(row[3])}
+    
+    def refresh(self, key: str):
+        """
+        Restart the time to live of a response the server confirmed to be unchanged
+        
+        Args:
+            key: Cache key of the request
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE responses SET stored_at = ?, last_used = ? WHERE key = ?", (now, now, key))
+            self._conn.commit()
+            self._touched.pop(key, None)
+    
+    def validators(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Get the conditional request headers for a cached response
+        
+        Args:
+            entry: Cached response from get
+        
+        Returns:
+            If-None-Match and If-Modified-Since headers, empty if nothing is cached
+        """
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+    
+    def put(self, key: str, body: Any, etag: Optional[str] = None,
+            last_modified: Optional[str] = None, link: Optional[str] = None):
+        """
+        Cache a response
+        
+        Args:
+            key: Cache key of the request
+            body: Parsed JSON body
+            etag: ETag header
+            last_modified: Last-Modified header
+            link: Link header, kept so that cached pages can still be paginated
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, last_modified, link, body, stored_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, link, json.dumps(body), now, now)
+            )
+            self._touched.pop(key, None)
+            
+            if self._count is None:
+                self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            else:
+                # Replaced keys are counted too, so this stays an upper bound
+                self._count += 1
+            if self._count > self.max_entries:
+                self._evict(now)
+            self._conn.commit()
+    
+    def _expired_before(self, now: float) -> float:
+        return now - self.ttl if self.ttl is not None else float("-inf")
+    
+    def _evict(self, now: float):
+        self._write_touched()
+        self._conn.execute("DELETE FROM responses WHERE stored_at <= ?", (self._expired_before(now),))
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            # Evict a little more than needed so that the next puts don't count again
+            target = self.max_entries - int(self.max_entries * self.EVICTION_FRACTION)
+            # Least recently used first, read from the last_used index
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                (count - target,)
+            )
+            count = target
+        self._count = count
+    
+    def _write_touched(self):
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE responses SET last_used = max(last_used, ?) WHERE key = ?",
+            [(used, key) for key, used in self._touched.items()]
+        )
+        self._touched.clear()
+    
+    def purge_expired(self) -> int:
+        """
+        Remove expired responses from disk
+        
+        Returns:
+            Number of responses removed
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE stored_at <= ?", (self._expired_before(time.time()),)
+            )
+            self._conn.commit()
+            self._count = None
+            return cursor.rowcount
+    
+    def record(self, outcome: str):
+        """
+        Count a lookup
+        
+        Args:
+            outcome: "hit" for responses served without a request, "revalidated" for 304s, "miss" otherwise
+        """
+        with self._lock:
+            if outcome == "hit":
+                self.hits += 1
+            elif outcome == "revalidated":
+                self.revalidated += 1
+            else:
+                self.misses += 1
+    
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._touched.clear()
+            self._count = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hits, revalidations, misses and number of cached responses
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "entries": self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0],
+                "max_entries": self.max_entries
+            }
+    
+    def close(self):
+        """Write the pending last-used times and close the database"""
+        with self._lock:
+            self._write_touched()
+            self._conn.commit()
+            self._conn.close()
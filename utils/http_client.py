@@ -0,0 +1,255 @@
+import json
+import asyncio
+import threading
+import weakref
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, Any, Optional, Iterator, AsyncIterator
+import httpx
+
+class HTTPClient:
+    """Connection-pooled HTTP client shared by the model providers, with sync and asyncio interfaces"""
+    
+    def __init__(self,
+                 timeouts: Optional[Dict[str, float]] = None,
+                 concurrency_limits: Optional[Dict[str, int]] = None,
+                 default_timeout: float = 30,
+                 default_concurrency: int = 8,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30):
+        """
+        Initialize the HTTP client
+        
+        Args:
+            timeouts: Timeout in seconds per provider, while streaming it applies to each chunk
+            concurrency_limits: Maximum number of concurrent requests per provider
+            default_timeout: Timeout for providers without their own
+            default_concurrency: Concurrency limit for providers without their own
+            max_connections: Maximum number of open connections
+            max_keepalive_connections: Maximum number of idle connections kept open
+            keepalive_expiry: Seconds an idle connection is kept open
+        """
+        self.timeouts = dict(timeouts or {})
+        self.concurrency_limits = dict(concurrency_limits or {})
+        self.default_timeout = default_timeout
+        self.default_concurrency = default_concurrency
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self._client = None
+        # Async clients and semaphores are bound to the event loop that created them
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._async_semaphores = weakref.WeakKeyDictionary()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+    
+    def configure(self,
+                  provider: str,
+                  timeout: Optional[float] = None,
+                  max_concurrency: Optional[int] = None):
+        """
+        Set the timeout and concurrency limit of a provider
+        
+        Args:
+            provider: Provider name
+            timeout: Timeout in seconds
+            max_concurrency: Maximum number of concurrent requests
+        """
+        with self._lock:
+            if timeout is not None:
+                self.timeouts[provider] = timeout
+            if max_concurrency is not None:
+                self.concurrency_limits[provider] = max_concurrency
+                # New requests use the new limit
+                self._semaphores.pop(provider, None)
+                for semaphores in self._async_semaphores.values():
+                    semaphores.pop(provider, None)
+    
+    def _timeout(self, provider: str, timeout: Optional[float]) -> httpx.Timeout:
+        return httpx.Timeout(timeout or self.timeouts.get(provider, self.default_timeout))
+    
+    def _concurrency(self, provider: str) -> int:
+        return self.concurrency_limits.get(provider, self.default_concurrency)
+    
+    @property
+    def client(self) -> httpx.Client:
+        """The pooled synchronous client"""
+        with self._lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.Client(limits=self.limits)
+            return self._client
+    
+    def _async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._async_clients[loop] = httpx.AsyncClient(limits=self.limits)
+            return client
+    
+    @contextmanager
+    def _slot(self, provider: str):
+        with self._lock:
+            semaphore = self._semaphores.get(provider)
+            if semaphore is None:
+                semaphore = self._semaphores[provider] = threading.BoundedSemaphore(self._concurrency(provider))
+        with semaphore:
+            yield
+    
+    @asynccontextmanager
+    async def _async_slot(self, provider: str):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphores = self._async_semaphores.setdefault(loop, {})
+            semaphore = semaphores.get(provider)
+            if semaphore is None:
+                semaphore = semaphores[provider] = asyncio.Semaphore(self._concurrency(provider))
+        async with semaphore:
+            yield
+    
+    def request_json(self,
+                     provider: str,
+                     method: str,
+                     url: str,
+                     json_data: Optional[Dict[str, Any]] = None,
+                     timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Make a request over a pooled connection and parse the JSON response
+        
+        Args:
+            provider: Provider name, selects the timeout and concurrency limit
+            method: HTTP method
+            url: URL to make request to
+            json_data: JSON body
+            timeout: Timeout in seconds overriding the provider's
+        
+        Returns:
+            Response data
+        
+        Raises:
+            httpx.HTTPError: If the request fails
+            ValueError: If the response isn't JSON
+        """
+        with self._slot(provider):
+            response = self.client.request(method, url, json=json_data, timeout=self._timeout(provider, timeout))
+            response.raise_for_status()
+            return response.json()
+    
+    def stream_json_lines(self,
+                          provider: str,
+                          url: str,
+                          json_data: Dict[str, Any],
+                          timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        POST a request and yield each JSON line of the response as soon as it arrives
+        
+        Args:
+            provider: Provider name, selects the timeout and concurrency limit
+            url: URL to make request to
+            json_data: JSON body
+            timeout: Timeout in seconds overriding the provider's
+        
+        Yields:
+            Parsed JSON objects, e.g. the chunks of an Ollama stream
+        
+        Raises:
+            httpx.HTTPError: If the request fails
+            ValueError: If the response isn't JSON
+        """
+        with self._slot(provider):
+            with self.client.stream("POST", url, json=json_data, timeout=self._timeout(provider, timeout)) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if line.strip():
+                        yield json.loads(line)
+    
+    async def arequest_json(self,
+                            provider: str,
+                            method: str,
+                            url: str,
+                            json_data: Optional[Dict[str, Any]] = None,
+                            timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Async version of request_json
+        
+        Args:
+            provider: Provider name, selects the timeout and concurrency limit
+            method: HTTP method
+            url: URL to make request to
+            json_data: JSON body
+            timeout: Timeout in seconds overriding the provider's
+        
+        Returns:
+            Response data
+        
+        Raises:
+            httpx.HTTPError: If the request fails
+            ValueError: If the response isn't JSON
+        """
+        async with self._async_slot(provider):
+            response = await self._async_client().request(
+                method, url, json=json_data, timeout=self._timeout(provider, timeout)
+            )
+            response.raise_for_status()
+            return response.json()
+    
+    async def astream_json_lines(self,
+                                 provider: str,
+                                 url: str,
+                                 json_data: Dict[str, Any],
+                                 timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async version of stream_json_lines
+        
+        Args:
+            provider: Provider name, selects the timeout and concurrency limit
+            url: URL to make request to
+            json_data: JSON body
+            timeout: Timeout in seconds overriding the provider's
+        
+        Yields:
+            Parsed JSON objects, e.g. the chunks of an Ollama stream
+        
+        Raises:
+            httpx.HTTPError: If the request fails
+            ValueError: If the response isn't JSON
+        """
+        async with self._async_slot(provider):
+            client = self._async_client()
+            async with client.stream("POST", url, json=json_data, timeout=self._timeout(provider, timeout)) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line.strip():
+                        yield json.loads(line)
+    
+    def close(self):
+        """Close the pooled synchronous connections"""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+    
+    async def aclose(self):
+        """Close the pooled connections of the running event loop"""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+def get_http_client() -> HTTPClient:
+    """
+    Get the HTTP client shared by the whole application
+    
+    Returns:
+        Shared HTTPClient
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = HTTPClient()
+        return _http_client
@@ -0,0 +1,298 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+
+class ResponseCache:
+    """Cache of model responses, an in-memory LRU in front of a persistent SQLite store"""
+    
+    def __init__(self,
+                 db_path: str = "./data/response_cache.db",
+                 ttl: Optional[float] = 86400,
+                 max_memory_entries: int = 1024,
+                 embedding_service: Any = None,
+                 semantic_threshold: float = 0.95):
+        """
+        Initialize the response cache
+        
+        Args:
+            db_path: SQLite database file
+            ttl: Seconds a response stays valid, None to keep responses forever
+            max_memory_entries: Number of responses kept in memory
+            embedding_service: EmbeddingService enabling semantic hits, prompts whose embedding is
+                at least semantic_threshold similar to a cached prompt reuse its response
+            semantic_threshold: Minimum cosine similarity of a semantic hit
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.embedding_service = embedding_service
+        self.semantic_threshold = semantic_threshold
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        # key -> (response, expires at)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        # scope -> (keys, set of the keys, SimilarityIndex) of the cached prompts, built on first use
+        # and extended by puts
+        self._semantic_indexes: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, scope TEXT NOT NULL, response TEXT NOT NULL, "
+            "embedding BLOB, expires_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_scope ON responses (scope)")
+        self._conn.commit()
+    
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """
+        Normalize a prompt so that trivially different prompts share a cache entry
+        
+        Args:
+            prompt: The user prompt
+        
+        Returns:
+            Prompt with collapsed whitespace
+        """
+        return re.sub(r"\s+", " ", prompt).strip()
+    
+    @staticmethod
+    def _scope(provider: str, model: str, system_prompt: Optional[str], temperature: float, max_tokens: int) -> str:
+        # Everything but the prompt, only responses within the same scope can be reused
+        parts = [provider, model, system_prompt or "", repr(float(temperature)), str(max_tokens)]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+    
+    def _key(self, scope: str, prompt: str) -> str:
+        return hashlib.sha256(f"{scope}:{self.normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+    
+    def get(self,
+            prompt: str,
+            provider: str,
+            model: str,
+            system_prompt: Optional[str] = None,
+            temperature: float = 0.0,
+            max_tokens: int = 1000) -> Optional[Dict[str, Any]]:
+        """
+        Look up the cached response of a prompt
+        
+        Args:
+            prompt: The user prompt
+            provider: The provider name
+            model: The model name
+            system_prompt: Optional system prompt
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens to generate
+        
+        Returns:
+            The cached response, or None if there is none
+        """
+        return self.lookup(prompt, provider, model, system_prompt, temperature, max_tokens)[0]
+    
+    def lookup(self,
+               prompt: str,
+               provider: str,
+               model: str,
+               system_prompt: Optional[str] = None,
+               temperature: float = 0.0,
+               max_tokens: int = 1000) -> Tuple[Optional[Dict[str, Any]], Optional[List[float]]]:
+        """
+        Look up the cached response of a prompt, also returning the embedding of the prompt
+        
+        On a miss, pass the embedding to put so that the prompt is not embedded again.
+        
+        Args:
+            prompt: The user prompt
+            provider: The provider name
+            model: The model name
+            system_prompt: Optional system prompt
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens to generate
+        
+        Returns:
+            The cached response or None, and the embedding of the prompt or None if it was not
+            embedded (exact hits and caches without semantic hits)
+        """
+        scope = self._scope(provider, model, system_prompt, temperature, max_tokens)
+        key = self._key(scope, prompt)
+        now = time.time()
+        
+        with self._lock:
+            response = self._get_exact(key, now)
+            if response is not None:
+                self.hits += 1
+                return response, None
+        
+        embedding = None
+        if self.embedding_service is not None:
+            embedding = self.embedding_service.generate_embedding(self.normalize_prompt(prompt))
+            if embedding is not None:
+                response = self._get_semantic(scope, embedding, now)
+                if response is not None:
+                    with self._lock:
+                        self.semantic_hits += 1
+                    return response, embedding
+        
+        with self._lock:
+            self.misses += 1
+        return None, embedding
+    
+    def _get_exact(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            response, expires_at = entry
+            if expires_at is None or expires_at > now:
+                self._memory.move_to_end(key)
+                return response
+            del self._memory[key]
+        
+        row = self._conn.execute(
+            "SELECT response, expires_at FROM responses WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        response = json.loads(row[0])
+        self._remember(key, response, row[1])
+        return response
+    
+    def _get_semantic(self, scope: str, embedding: List[float], now: float) -> Optional[Dict[str, Any]]:
+        # Import here, the embedding service is only needed for semantic hits
+        from services.embedding_service import SimilarityIndex
+        
+        with self._lock:
+            if scope not in self._semantic_indexes:
+                rows = self._conn.execute(
+                    "SELECT key, embedding FROM responses "
+                    "WHERE scope = ? AND embedding IS NOT NULL AND (expires_at IS NULL OR expires_at > ?)",
+                    (scope, now)
+                ).fetchall()
+                if not rows:
+                    return None
+                keys = [row[0] for row in rows]
+                vectors = [np.frombuffer(row[1], dtype=np.float32) for row in rows]
+                self._semantic_indexes[scope] = (keys, set(keys), SimilarityIndex(vectors, metric="cosine"))
+            keys, _, index = self._semantic_indexes[scope]
+            
+            matches = index.search(embedding, top_k=1)
+            if not matches or matches[0]["score"] < self.semantic_threshold:
+                return None
+            return self._get_exact(keys[matches[0]["index"]], now)
+    
+    def _remember(self, key: str, response: Dict[str, Any], expires_at: Optional[float]):
+        self._memory[key] = (response, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+    
+    def put(self,
+            prompt: str,
+            provider: str,
+            model: str,
+            response: Dict[str, Any],
+            system_prompt: Optional[str] = None,
+            temperature: float = 0.0,
+            max_tokens: int = 1000,
+            embedding: Optional[List[float]] = None):
+        """
+        Cache the response of a prompt
+        
+        Args:
+            prompt: The user prompt
+            provider: The provider name
+            model: The model name
+            response: Response from the model
+            system_prompt: Optional system prompt
+            temperature: Temperature for generation
+            max_tokens: Maximum tokens to generate
+            embedding: Embedding of the prompt returned by lookup, computed here when not given
+        """
+        scope = self._scope(provider, model, system_prompt, temperature, max_tokens)
+        key = self._key(scope, prompt)
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        
+        vector = None
+        if self.embedding_service is not None:
+            if embedding is None:
+                embedding = self.embedding_service.generate_embedding(self.normalize_prompt(prompt))
+            if embedding is not None:
+                vector = np.asarray(embedding, dtype=np.float32)
+        
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, scope, response, embedding, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (key, scope, json.dumps(response), vector.tobytes() if vector is not None else None, expires_at)
+            )
+            self._conn.commit()
+            self._remember(key, response, expires_at)
+            if vector is not None:
+                self._index_prompt(scope, key, vector)
+    
+    def _index_prompt(self, scope: str, key: str, vector: np.ndarray):
+        # Indexes not built yet read the prompt from disk when they are
+        if scope not in self._semantic_indexes:
+            return
+        keys, indexed, index = self._semantic_indexes[scope]
+        if key in indexed:
+            # The same prompt has the same embedding
+            return
+        if len(index) and index.matrix.shape[1] != vector.shape[0]:
+            # The embedding model changed, build the index again with the new vectors
+            del self._semantic_indexes[scope]
+            return
+        index.add([vector])
+        keys.append(key)
+        indexed.add(key)
+    
+    def purge_expired(self) -> int:
+        """
+        Remove expired responses from disk
+        
+        Returns:
+            Number of responses removed
+        """
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                                        (time.time(),))
+            self._conn.commit()
+            self._semantic_indexes.clear()
+            return cursor.rowcount
+    
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._memory.clear()
+            self._semantic_indexes.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hits, semantic hits, misses, hit rate and number of cached responses
+        """
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "entries": self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            }
@@ -0,0 +1,275 @@
+import re
+from collections import deque
+from typing import List, Optional, Callable, Iterable, Iterator, Tuple, Union
+
+class TextChunker:
+    """Linear-time text chunker measuring chunks in characters or in tokens of a tokenizer
+    
+    Text is scanned once into pieces, a word and the whitespace after it, and pieces are
+    packed greedily into chunks. When a chunk is full it is cut at the strongest boundary
+    it contains past min_fill of its size: code block or section, paragraph, sentence, line,
+    space, and only as a last resort inside a run without whitespace such as base64.
+    """
+    
+    # Boundary strength after a piece
+    HARD = 0
+    SPACE = 1
+    LINE = 2
+    SENTENCE = 3
+    PARAGRAPH = 4
+    BLOCK = 5
+    
+    # Separator between the segments of a stream, like extract_text joins pages
+    SEPARATOR = "\n\n"
+    
+    _SENTENCE_END = re.compile(r"[.!?][\"')\]]*$")
+    # Lines starting a code block or markdown section
+    _BLOCK_START = re.compile(r"(?:def |class |async def |function |export |@|```|#{1,6} )")
+    
+    def __init__(self,
+                 chunk_size: int = 1000,
+                 overlap: int = 100,
+                 length_function: Optional[Callable[[List[str]], List[int]]] = None,
+                 min_fill: float = 0.5,
+                 batch_size: int = 2048):
+        """
+        Initialize the chunker
+        
+        Args:
+            chunk_size: Maximum size of each chunk
+            overlap: Size of the text repeated at the start of the next chunk
+            length_function: Batched length, e.g. the number of tokens of each text, characters by default
+            min_fill: Fraction of chunk_size a chunk must reach before it may be cut at a stronger boundary
+            batch_size: Number of pieces measured per length_function call
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if not 0 <= overlap < chunk_size:
+            raise ValueError("overlap must be at least 0 and smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.length_function = length_function
+        self.min_fill = min_fill
+        self.batch_size = batch_size
+        # No run of characters longer than a chunk, a token is at least one character
+        self._piece = re.compile(r"\S{1,%d}" % chunk_size)
+    
+    def split(self, text: str, return_offsets: bool = False) -> List[Union[str, Tuple[int, int]]]:
+        """
+        Split text into chunks
+        
+        Args:
+            text: Text to split
+            return_offsets: Whether to return (start, end) offsets into text instead of copies of the chunks
+        
+        Returns:
+            List of chunks or offsets
+        """
+        return list(self.iter_chunks([text], return_offsets=return_offsets))
+    
+    def iter_chunks(self,
+                    segments: Iterable[str],
+                    return_offsets: bool = False) -> Iterator[Union[str, Tuple[int, int]]]:
+        """
+        Split a stream of text into chunks, holding about one chunk and one batch of pieces in memory
+        
+        Args:
+            segments: Consecutive pieces of text, joined by SEPARATOR
+            return_offsets: Whether to yield (start, end) offsets into the joined text instead of chunks
+        
+        Yields:
+            Chunks or offsets
+        """
+        stream = _ChunkStream(self)
+        for i, segment in enumerate(segments):
+            if i > 0:
+                stream.append_text(self.SEPARATOR)
+            start = stream.append_text(segment)
+            
+            batch = []
+            for match in self._piece.finditer(segment):
+                batch.append((start + match.start(), start + match.end()))
+                if len(batch) >= self.batch_size:
+                    yield from stream.chunks(stream.add_pieces(batch), return_offsets)
+                    batch = []
+            if batch:
+                yield from stream.chunks(stream.add_pieces(batch), return_offsets)
+        
+        yield from stream.chunks(stream.finish(), return_offsets)
+    
+    def _measure(self, texts: List[str]) -> List[int]:
+        if self.length_function is None:
+            return [len(text) for text in texts]
+        lengths = []
+        for i in range(0, len(texts), self.batch_size):
+            lengths.extend(self.length_function(texts[i:i + self.batch_size]))
+        return lengths
+
+
+class _ChunkStream:
+    """Packing state of TextChunker.iter_chunks, all offsets are into the joined stream"""
+    
+    def __init__(self, chunker: TextChunker):
+        self.chunker = chunker
+        self.limit = chunker.chunk_size
+        self.min_size = chunker.min_fill * chunker.chunk_size
+        # Texts still referenced by unemitted pieces: (start offset, text)
+        self.texts: deque = deque()
+        self.length = 0
+        # Pieces as [start, content end, level], pieces[i] has absolute index base + i
+        self.pieces: List[list] = []
+        # Prefix sums of the piece lengths, cum[i] is the size of the pieces before base + i
+        self.cum: List[int] = [0]
+        self.base = 0
+        # Absolute index of the first piece of the current chunk
+        self.first = 0
+        # Latest absolute index of each boundary level within the current chunk
+        self.best = {}
+        # The last piece waits for its successor, which decides the boundary after it
+        self.pending: Optional[list] = None
+        self.pending_length = 0
+        self.last_emitted = -1
+    
+    def append_text(self, text: str) -> int:
+        start = self.length
+        self.texts.append((start, text))
+        self.length += len(text)
+        return start
+    
+    def text(self, start: int, end: int) -> str:
+        parts = []
+        for offset, text in self.texts:
+            if offset >= end:
+                break
+            if offset + len(text) > start:
+                parts.append(text[max(start - offset, 0):end - offset])
+        return parts[0] if len(parts) == 1 else "".join(parts)
+    
+    def chunks(self, offsets: List[Tuple[int, int]], return_offsets: bool) -> Iterator[Union[str, Tuple[int, int]]]:
+        # Offsets first, then the texts they no longer need are released
+        texts = offsets if return_offsets else [self.text(start, end) for start, end in offsets]
+        self._release()
+        return iter(texts)
+    
+    def add_pieces(self, spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        spans, lengths = self._fit(spans)
+        emitted = []
+        for (start, end), length in zip(spans, lengths, strict=True):
+            if self.pending is not None:
+                self.pending[2] = self._boundary(self.pending, start)
+                if self.chunker.length_function is None:
+                    # Characters count the whitespace up to the next piece too
+                    self.pending_length = start - self.pending[0]
+                self._add(self.pending, self.pending_length, emitted)
+            self.pending = [start, end, TextChunker.HARD]
+            self.pending_length = length
+        return emitted
+    
+    def finish(self) -> List[Tuple[int, int]]:
+        emitted = []
+        if self.pending is not None:
+            self.pending[2] = TextChunker.PARAGRAPH
+            self._add(self.pending, self.pending_length, emitted)
+            self.pending = None
+        
+        last = self.base + len(self.pieces) - 1
+        if last >= self.first and last > self.last_emitted:
+            self._emit(self.first, last, emitted)
+        elif self.last_emitted < 0:
+            # Nothing but whitespace
+            emitted.append((0, self.length))
+        return emitted
+    
+    def _fit(self, spans: List[Tuple[int, int]]) -> Tuple[List[Tuple[int, int]], List[int]]:
+        # Measure the pieces, splitting the rare ones longer than a chunk, e.g. runs of
+        # multi-byte characters that a byte-level tokenizer turns into several tokens each
+        if self.chunker.length_function is None:
+            # Characters, which the piece pattern already keeps within a chunk
+            return spans, [end - start for start, end in spans]
+        lengths = self.chunker._measure([self.text(start, end) for start, end in spans])
+        if all(length <= self.limit for length in lengths):
+            return spans, lengths
+        
+        fitted_spans, fitted_lengths = [], []
+        for (start, end), length in zip(spans, lengths, strict=True):
+            if length <= self.limit or end - start == 1:
+                fitted_spans.append((start, end))
+                fitted_lengths.append(length)
+                continue
+            parts = -(-length // self.limit) + 1
+            step = -(-(end - start) // parts)
+            sub_spans, sub_lengths = self._fit([(s, min(s + step, end)) for s in range(start, end, step)])
+            fitted_spans.extend(sub_spans)
+            fitted_lengths.extend(sub_lengths)
+        return fitted_spans, fitted_lengths
+    
+    def _boundary(self, piece: list, next_start: int) -> int:
+        whitespace = self.text(piece[1], next_start)
+        if not whitespace:
+            return TextChunker.HARD
+        newlines = whitespace.count("\n")
+        if newlines and TextChunker._BLOCK_START.match(self.text(next_start, next_start + 10)):
+            # The next line starts a function, class or section
+            return TextChunker.BLOCK
+        if newlines >= 2:
+            return TextChunker.PARAGRAPH
+        if TextChunker._SENTENCE_END.search(self.text(max(piece[0], piece[1] - 4), piece[1])):
+            return TextChunker.SENTENCE
+        return TextChunker.LINE if newlines else TextChunker.SPACE
+    
+    def _cum(self, index: int) -> int:
+        return self.cum[index - self.base]
+    
+    def _piece(self, index: int) -> list:
+        return self.pieces[index - self.base]
+    
+    def _add(self, piece: list, length: int, emitted: List[Tuple[int, int]]):
+        self.pieces.append(piece)
+        self.cum.append(self.cum[-1] + length)
+        j = self.base + len(self.pieces) - 1
+        
+        while True:
+            if self._cum(j + 1) - self._cum(self.first) <= self.limit:
+                self.best[piece[2]] = j
+                return
+            
+            if j == self.first:
+                # A single piece larger than a chunk
+                cut = j
+            else:
+                cut = j - 1
+                for level in range(TextChunker.BLOCK, TextChunker.HARD - 1, -1):
+                    index = self.best.get(level)
+                    if index is not None and self._cum(index + 1) - self._cum(self.first) >= self.min_size:
+                        cut = index
+                        break
+            self._emit(self.first, cut, emitted)
+            
+            # Start the next chunk overlap back, always past the start of this one
+            start = cut + 1
+            while start - 1 > self.first and self._cum(cut + 1) - self._cum(start - 1) <= self.chunker.overlap:
+                start -= 1
+            self.first = start
+            self.best = {self._piece(i)[2]: i for i in range(start, j)}
+            if start > j:
+                return
+    
+    def _emit(self, first: int, last: int, emitted: List[Tuple[int, int]]):
+        emitted.append((self._piece(first)[0], self._piece(last)[1]))
+        self.last_emitted = last
+    
+    def _release(self):
+        # Drop the pieces before the current chunk and the texts no piece points into
+        drop = self.first - self.base
+        if drop > 0 and drop >= len(self.pieces) // 2:
+            del self.pieces[:drop]
+            del self.cum[:drop]
+            self.base = self.first
+        if self.pieces and self.first - self.base < len(self.pieces):
+            keep_from = self._piece(self.first)[0]
+        elif self.pending is not None:
+            keep_from = self.pending[0]
+        else:
+            keep_from = self.length
+        while len(self.texts) > 1 and self.texts[0][0] + len(self.texts[0][1]) <= keep_from:
+            self.texts.popleft()